@@ -0,0 +1,42 @@
+from typing import Dict, List, Optional
+
+from pydantic import ValidationError
+
+
+def validate_bulk_items(items: List[dict], model, ordered: bool):
+    """Validate bulk items one by one; returns ([(index, model)], results)."""
+    valid, results = [], [None] * len(items)
+    for index, raw in enumerate(items):
+        try:
+            valid.append((index, model(**raw)))
+        except ValidationError as e:
+            errors = [{"loc": list(err["loc"]), "msg": err["msg"]} for err in e.errors()]
+            results[index] = {"index": index, "status": "invalid", "errors": errors}
+            if ordered:
+                break
+    return valid, results
+
+
+def finish_bulk(results: list, sent: List[int], write_errors: Dict[int, str], ordered: bool,
+                status: str, ids: Dict[int, str], missing: Optional[set] = None):
+    """Fill in results for the items sent to the database, in request order."""
+    first_error = min(write_errors) if write_errors else None
+    for position, index in enumerate(sent):
+        result = {"index": index, "id": ids[index]}
+        if position in write_errors:
+            result.update(status="failed", errors=[{"msg": write_errors[position]}])
+        elif ordered and first_error is not None and position > first_error:
+            result["status"] = "skipped"
+        elif missing is not None and ids[index] in missing:
+            result["status"] = "not_found"
+        else:
+            result["status"] = status
+        results[index] = result
+    for index, result in enumerate(results):
+        if result is None:
+            results[index] = {"index": index, "status": "skipped"}
+
+    summary = {}
+    for result in results:
+        summary[result["status"]] = summary.get(result["status"], 0) + 1
+    return {"success": summary.get(status, 0) == len(results), "summary": summary, "results": results}
@@ -0,0 +1,152 @@
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Hashable, Iterable, Optional, Tuple
+import asyncio
+import threading
+import time
+
+
+_MISSING = object()
+
+
+class SingleFlight:
+    """Runs concurrent calls that share a key once and gives every caller the result.
+
+    The call runs in its own task, so a caller that is cancelled stops
+    waiting without cancelling the work for the others; the task itself is
+    cancelled only once nobody is waiting for it. Exceptions reach every
+    caller and are not remembered: the next call after a failure retries.
+    """
+
+    def __init__(self):
+        self._calls: Dict[Hashable, list] = {}  # key -> [task, waiters]
+        self.coalesced = 0
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[Any]]) -> Any:
+        call = self._calls.get(key)
+        if call is None:
+            task = asyncio.ensure_future(fn())
+            call = self._calls[key] = [task, 0]
+            task.add_done_callback(lambda done: self._finished(key, call, done))
+        else:
+            self.coalesced += 1
+        task = call[0]
+        call[1] += 1
+        try:
+            return await asyncio.shield(task)
+        finally:
+            call[1] -= 1
+            if call[1] == 0 and not task.done():
+                # Forget the call first so a caller arriving before the task
+                # has wound down starts a new one instead of joining it
+                if self._calls.get(key) is call:
+                    del self._calls[key]
+                task.cancel()
+
+    def _finished(self, key: Hashable, call: list, task: asyncio.Future) -> None:
+        if self._calls.get(key) is call:
+            del self._calls[key]
+        if not task.cancelled():
+            task.exception()  # retrieved here in case every caller has gone
+
+    def __len__(self) -> int:
+        return len(self._calls)
+
+
+class TTLCache:
+    """Size-bounded LRU cache whose entries also expire after ``ttl`` seconds.
+
+    Keys are tuples whose first element is a namespace (usually the collection
+    name).  Every entry is tagged with one or more namespaces so that a write to
+    a collection can drop everything derived from it with ``invalidate``.
+    """
+
+    def __init__(self, maxsize: int = 256, ttl: float = 300.0):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._entries: "OrderedDict[Hashable, Tuple[float, Any, Tuple[str, ...]]]" = OrderedDict()
+        self._versions: Dict[str, int] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.flights = SingleFlight()
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        with self._lock:
+            entry = self._entries.get(key, _MISSING)
+            if entry is _MISSING:
+                self.misses += 1
+                return default
+            expires_at, value, _ = entry
+            if expires_at <= time.monotonic():
+                del self._entries[key]
+                self.misses += 1
+                return default
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key: Hashable, value: Any, tags: Optional[Iterable[str]] = None,
+            versions: Optional[Dict[str, int]] = None) -> bool:
+        """Store ``value`` unless one of its namespaces changed since ``versions``.
+
+        Readers snapshot ``versions_for(tags)`` before hitting the database and
+        pass it back here, so a result loaded before a concurrent write is never
+        cached after that write's invalidation.
+        """
+        tags = tuple(tags) if tags is not None else (key[0],)
+        with self._lock:
+            if versions is not None and any(
+                self._versions.get(tag, 0) != version for tag, version in versions.items()
+            ):
+                return False
+            self._entries[key] = (time.monotonic() + self.ttl, value, tags)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+            return True
+
+    async def get_or_load(self, key: Hashable, loader: Callable[[], Awaitable[Any]],
+                          tags: Optional[Iterable[str]] = None) -> Any:
+        """The cached value for ``key``, else ``loader()`` stored under ``tags``.
+
+        Concurrent misses for the same key share one ``loader()`` call, as
+        long as none of the tags was invalidated in between; a caller
+        arriving after an invalidation starts a fresh load.
+        """
+        value = self.get(key)
+        if value is not None:
+            return value
+        tags = tuple(tags) if tags is not None else (key[0],)
+        versions = self.versions_for(tags)
+
+        async def load():
+            loaded = await loader()
+            self.set(key, loaded, tags=tags, versions=versions)
+            return loaded
+
+        return await self.flights.do((key, tuple(sorted(versions.items()))), load)
+
+    def version(self, namespace: str) -> int:
+        with self._lock:
+            return self._versions.get(namespace, 0)
+
+    def versions_for(self, tags: Iterable[str]) -> Dict[str, int]:
+        with self._lock:
+            versions = {tag: self._versions.get(tag, 0) for tag in tags}
+            versions["*"] = self._versions.get("*", 0)
+            return versions
+
+    def invalidate(self, namespace: str) -> None:
+        with self._lock:
+            self._versions[namespace] = self._versions.get(namespace, 0) + 1
+            stale = [key for key, (_, _, tags) in self._entries.items() if namespace in tags]
+            for key in stale:
+                del self._entries[key]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._versions["*"] = self._versions.get("*", 0) + 1
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
@@ -1,177 +1,754 @@
-from datetime import datetime
-from typing import Optional, List
-from motor.motor_asyncio import AsyncIOMotorDatabase
+from datetime import date, datetime, timezone
+from typing import Optional, List, Set, Tuple, Dict
+from motor.motor_asyncio import AsyncIOMotorDatabase, AsyncIOMotorCollection
+from pymongo import DeleteOne, ReplaceOne, ReturnDocument, UpdateOne
+from pymongo.errors import BulkWriteError
+import asyncio
+import base64
+import json
 import logging
+import time
+import uuid
+
+from cache import TTLCache
+from invalidation import InvalidationBus
+from ingestion import WriteBehindWriter
+from search import SEARCH_FIELDS, SearchIndex
+from models import PortfolioItem, Service, Testimonial
 
 logger = logging.getLogger(__name__)
 
+# Booking statuses that take a date off the public calendar
+AVAILABILITY_STATUSES = ("booked", "quoted")
+LEAD_COLLECTIONS = ("contact_messages", "booking_requests")
+# Settings document holding the version bumped by every settings write
+SETTINGS_VERSION_KEY = "_version"
+# Fields public catalog reads may select with ?fields=
+PUBLIC_FIELDS = {
+    "portfolio": list(PortfolioItem.model_fields),
+    "services": list(Service.model_fields),
+    "testimonials": list(Testimonial.model_fields),
+}
+
+
+# Keyset pagination cursors: an opaque token holding the (created_at, id) of
+# the last document on the previous page.
+def encode_cursor(doc: dict) -> str:
+    raw = json.dumps([doc["created_at"].isoformat(), doc.get("id", "")])
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, str]:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        created_at, doc_id = json.loads(base64.urlsafe_b64decode(padded))
+        return datetime.fromisoformat(created_at), str(doc_id)
+    except (ValueError, TypeError) as e:
+        raise ValueError(f"Invalid cursor: {cursor!r}") from e
+
+
+def day_key(value) -> Optional[str]:
+    """UTC calendar day of an event date as YYYY-MM-DD (the availability _id)."""
+    if not isinstance(value, datetime):
+        return None
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc)
+    return value.date().isoformat()
+
+
+def catalog_projection(collection: str, fields: Optional[Tuple[str, ...]] = None,
+                       lang: Optional[str] = None) -> dict:
+    """Projection for a public catalog read.
+
+    ``fields`` limits documents to those fields plus id. ``lang`` keeps one
+    language of each ``field`` / ``field_en`` pair with the same rule as
+    responses.localize: "he" drops the English fields, "en" drops the Hebrew
+    field whenever its English value is present.
+    """
+    projection = {"_id": 0}
+    if fields is None and lang is None:
+        return projection
+    known = PUBLIC_FIELDS[collection]
+    for field in dict.fromkeys(["id", *fields] if fields else known):
+        if field.endswith("_en") and field[:-3] in known:
+            # Otherwise handled together with the Hebrew field below
+            if lang is None or (lang == "en" and fields):
+                projection[field] = 1
+            continue
+        translated = f"{field}_en"
+        if lang == "en" and translated in known:
+            projection[translated] = 1
+            projection[field] = {"$cond": [
+                {"$eq": [{"$ifNull": [f"${translated}", None]}, None]}, f"${field}", "$$REMOVE",
+            ]}
+        else:
+            projection[field] = 1
+    return projection
+
+
+class VersionConflict(Exception):
+    """An If-Match version did not match the document's current version."""
+
+    def __init__(self, current: int):
+        super().__init__(f"Document is at version {current}")
+        self.current = current
+
+
+def version_filter(item_id: str, expected_version: Optional[int]) -> dict:
+    query = {"id": item_id}
+    if expected_version is not None:
+        # Documents written before versioning have no field and count as 0
+        query["version"] = {"$in": [0, None]} if expected_version == 0 else expected_version
+    return query
+
+
+def counter_key(value) -> str:
+    """Free text (event types) as a field name: no '.', no leading '$'."""
+    if value is None or value == "":
+        return "unknown"
+    return str(value).replace(".", "\uff0e").replace("$", "\uff04")
+
+
+def decode_counter_key(key: str) -> str:
+    return key.replace("\uff0e", ".").replace("\uff04", "$")
+
+
+def bulk_write_errors(error: BulkWriteError) -> Dict[int, str]:
+    return {e["index"]: e.get("errmsg", "Write failed") for e in error.details.get("writeErrors", [])}
+
+
 class DatabaseService:
-    def __init__(self, db: AsyncIOMotorDatabase):
+    def __init__(self, db: AsyncIOMotorDatabase, cache: Optional[TTLCache] = None,
+                 bus: Optional[InvalidationBus] = None, write_behind: Optional[WriteBehindWriter] = None,
+                 read_db: Optional[AsyncIOMotorDatabase] = None, read_after_write_window: float = 0.0):
+        # Writes and admin reads use ``db`` (primary); public reads use
+        # ``read_db``, which may be a secondary-preferring client. A
+        # namespace written within ``read_after_write_window`` seconds is
+        # read from the primary so a lagging secondary cannot refill the
+        # cache with data older than the write.
         self.db = db
+        self.read_db = read_db if read_db is not None else db
+        self.read_after_write_window = read_after_write_window
+        self._written_at: Dict[str, float] = {}
+        # Read-through cache for the public catalog (portfolio, services,
+        # testimonials). Cached lists are shared between callers: treat them
+        # as read-only.
+        self.cache = cache if cache is not None else TTLCache()
+        # Tells the other workers to drop what this worker invalidates
+        self.bus = bus
+        # Optional batched ingestion of contact messages and booking requests
+        self.write_behind = write_behind
+        # Public catalog search, kept in step with the writes below
+        self.search = SearchIndex()
+        self._search_lock = asyncio.Lock()
+        # Ids changed elsewhere, reindexed by one task per collection
+        self._pending_reindex: Dict[str, Set[str]] = {}
+        self._reindex_tasks: Dict[str, asyncio.Task] = {}
+        # Settings are read by every page, so their snapshot has a slot of its
+        # own instead of competing for room in the catalog cache:
+        # (cache versions it was loaded at, expiry, snapshot)
+        self._settings_snapshot: Optional[Tuple[Dict[str, int], float, dict]] = None
+        if bus is not None:
+            bus.subscribe(self._on_bus_invalidation)
+        if write_behind is not None:
+            # Counters follow what the writer actually stored, batch by batch
+            write_behind.subscribe(self._record_leads)
+
+    async def _insert_lead(self, collection: str, doc: dict):
+        if self.write_behind is not None:
+            await self.write_behind.submit(collection, doc)
+        else:
+            await self.db[collection].insert_one(doc)
+            await self._record_leads(collection, [doc])
+
+    def _mark_written(self, namespace: str):
+        self._written_at[namespace] = time.monotonic()
+
+    def _on_bus_invalidation(self, namespace: str, ids: Optional[List[str]]):
+        self._mark_written(namespace)
+        if namespace not in SEARCH_FIELDS:
+            return
+        if ids is None:
+            self.search.mark_dirty(namespace)
+            return
+        # A change stream also delivers this worker's own writes; reindexing
+        # those ids again is a cheap lookup by id.
+        self._pending_reindex.setdefault(namespace, set()).update(ids)
+        if namespace not in self._reindex_tasks:
+            self._reindex_tasks[namespace] = asyncio.get_running_loop().create_task(self._drain_reindex(namespace))
+
+    async def _drain_reindex(self, collection: str):
+        try:
+            while self._pending_reindex.get(collection):
+                ids = list(self._pending_reindex.pop(collection))
+                await self._reindex(collection, ids)
+        finally:
+            self._reindex_tasks.pop(collection, None)
+
+    def _reader(self, namespace: str) -> AsyncIOMotorDatabase:
+        """Database for a public read of ``namespace``."""
+        written = self._written_at.get(namespace)
+        if written is not None and time.monotonic() - written < self.read_after_write_window:
+            return self.db
+        return self.read_db
+
+    async def _invalidate(self, namespace: str, ids: Optional[List[str]] = None):
+        self._mark_written(namespace)
+        self.cache.invalidate(namespace)
+        if namespace in SEARCH_FIELDS:
+            await self._reindex(namespace, ids)
+        if self.bus is not None:
+            try:
+                await self.bus.publish(namespace, ids)
+            except Exception as e:
+                logger.error(f"Failed to publish invalidation for {namespace}: {e}")
+
+    async def _reindex(self, collection: str, ids: Optional[List[str]]):
+        """Bring the search index up to date after a write to ``ids`` (None: unknown)."""
+        if ids is None:
+            self.search.mark_dirty(collection)
+            return
+        # Serialized so a slower read of an older write never lands last
+        async with self._search_lock:
+            if collection in self.search.dirty:
+                return  # reloaded in full by the next search anyway
+            try:
+                docs = await self.db[collection].find({"id": {"$in": ids}}, {"_id": 0}).to_list(length=None)
+                self.search.update(collection, ids, docs)
+            except Exception as e:
+                logger.error(f"Failed to reindex {collection} for search: {e}")
+                self.search.mark_dirty(collection)
+
+    async def search_catalog(self, query: str, collections: Optional[List[str]] = None, limit: int = 20):
+        for collection in collections or SEARCH_FIELDS:
+            if collection in self.search.dirty:
+                async with self._search_lock:
+                    if collection in self.search.dirty:
+                        generation = self.search.generation[collection]
+                        docs = await self._reader(collection)[collection].find({}, {"_id": 0}).to_list(length=None)
+                        self.search.load(collection, docs, generation)
+        return self.search.search(query, collections, limit)
+
+    async def _cached(self, key: tuple, loader):
+        return await self.cache.get_or_load(key, loader)
+
+    async def _update_versioned(self, collection: str, item_id: str, update_data: dict,
+                                expected_version: Optional[int] = None,
+                                return_document: bool = ReturnDocument.AFTER) -> Optional[dict]:
+        """$set ``update_data`` and bump ``version`` in one find_one_and_update.
+
+        Returns the document (after the update by default), None when
+        ``item_id`` does not exist, and raises VersionConflict when it
+        exists at a version other than ``expected_version``.
+        """
+        target = self.db[collection]
+        doc = await target.find_one_and_update(
+            version_filter(item_id, expected_version),
+            {"$set": update_data, "$inc": {"version": 1}},
+            projection={"_id": 0},
+            return_document=return_document,
+        )
+        if doc is None and expected_version is not None:
+            # Only on the failure path: tell a missing document from a stale version
+            current = await target.find_one({"id": item_id}, {"_id": 0, "version": 1})
+            if current is not None:
+                raise VersionConflict(current.get("version", 0))
+        return doc
+
+    async def insert_documents(self, collection: str, docs: List[dict]):
+        """Insert many documents in one round trip, stamping ids and timestamps."""
+        now = datetime.utcnow()
+        for doc in docs:
+            doc.setdefault("id", str(uuid.uuid4()))
+            doc.setdefault("version", 1)
+            doc["created_at"] = now
+            doc["updated_at"] = now
+        await self.db[collection].insert_many(docs)
+        await self._invalidate(collection, [doc["id"] for doc in docs])
+        return [doc["id"] for doc in docs]
 
     # Portfolio operations
-    async def get_portfolio_items(self, category: Optional[str] = None, featured: Optional[bool] = None):
+    async def get_portfolio_items(self, category: Optional[str] = None, featured: Optional[bool] = None,
+                                  fields: Optional[Tuple[str, ...]] = None, lang: Optional[str] = None):
         query = {}
         if category and category != "All":
             query["category"] = category
         if featured is not None:
             query["featured"] = featured
-        
-        cursor = self.db.portfolio.find(query, {"_id": 0}).sort("order", 1)
-        items = await cursor.to_list(length=None)
-        return items
+
+        async def load():
+            projection = catalog_projection("portfolio", fields, lang)
+            cursor = self._reader("portfolio").portfolio.find(query, projection).sort("order", 1)
+            return await cursor.to_list(length=None)
+
+        return await self._cached(("portfolio", "items", query.get("category"), featured, fields, lang), load)
+
+    async def get_portfolio_item(self, item_id: str):
+        return await self.db.portfolio.find_one({"id": item_id}, {"_id": 0})
 
     async def create_portfolio_item(self, item_data: dict):
+        item_data.setdefault("id", str(uuid.uuid4()))
+        item_data["version"] = 1
         item_data["created_at"] = datetime.utcnow()
         item_data["updated_at"] = datetime.utcnow()
-        result = await self.db.portfolio.insert_one(item_data)
-        return result.inserted_id
+        await self.db.portfolio.insert_one(item_data)
+        await self._invalidate("portfolio", [item_data["id"]])
+        return item_data["id"]
 
-    async def update_portfolio_item(self, item_id: str, update_data: dict):
+    async def update_portfolio_item(self, item_id: str, update_data: dict, expected_version: Optional[int] = None):
         update_data["updated_at"] = datetime.utcnow()
-        result = await self.db.portfolio.update_one(
-            {"id": item_id}, 
-            {"$set": update_data}
-        )
-        return result.modified_count > 0
+        item = await self._update_versioned("portfolio", item_id, update_data, expected_version)
+        if item is not None:
+            await self._invalidate("portfolio", [item_id])
+        return item
 
     async def delete_portfolio_item(self, item_id: str):
         result = await self.db.portfolio.delete_one({"id": item_id})
+        await self._invalidate("portfolio", [item_id])
         return result.deleted_count > 0
 
+    async def bulk_create_portfolio_items(self, items: List[dict], ordered: bool = True) -> Dict[int, str]:
+        """Insert ``items`` with one insert_many; returns {index: error} for failed items."""
+        now = datetime.utcnow()
+        for item in items:
+            item.setdefault("id", str(uuid.uuid4()))
+            item["version"] = 1
+            item["created_at"] = now
+            item["updated_at"] = now
+        try:
+            await self.db.portfolio.insert_many(items, ordered=ordered)
+            errors = {}
+        except BulkWriteError as e:
+            errors = bulk_write_errors(e)
+        await self._invalidate("portfolio", [item["id"] for item in items])
+        return errors
+
+    async def bulk_update_portfolio_items(self, updates: List[Tuple[str, dict]], ordered: bool = True):
+        """Apply (id, fields) updates with one bulk_write.
+
+        Returns ({index: error}, ids that exist); ids absent from the second
+        value were not found.
+        """
+        now = datetime.utcnow()
+        ids = [item_id for item_id, _ in updates]
+        requests = [
+            UpdateOne({"id": item_id}, {"$set": {**fields, "updated_at": now}, "$inc": {"version": 1}})
+            for item_id, fields in updates
+        ]
+        try:
+            await self.db.portfolio.bulk_write(requests, ordered=ordered)
+            errors = {}
+        except BulkWriteError as e:
+            errors = bulk_write_errors(e)
+        await self._invalidate("portfolio", ids)
+        existing = await self.db.portfolio.distinct("id", {"id": {"$in": ids}})
+        return errors, set(existing)
+
+    async def bulk_delete_portfolio_items(self, ids: List[str], ordered: bool = True):
+        """Delete ``ids`` with one bulk_write; returns ({index: error}, ids that existed)."""
+        existing = set(await self.db.portfolio.distinct("id", {"id": {"$in": ids}}))
+        try:
+            await self.db.portfolio.bulk_write([DeleteOne({"id": item_id}) for item_id in ids], ordered=ordered)
+            errors = {}
+        except BulkWriteError as e:
+            errors = bulk_write_errors(e)
+        await self._invalidate("portfolio", ids)
+        return errors, existing
+
     # Services operations
-    async def get_services(self, active_only: bool = True):
+    async def get_services(self, active_only: bool = True, fields: Optional[Tuple[str, ...]] = None,
+                           lang: Optional[str] = None):
         query = {"active": True} if active_only else {}
-        cursor = self.db.services.find(query, {"_id": 0}).sort("order", 1)
-        services = await cursor.to_list(length=None)
-        return services
+
+        async def load():
+            projection = catalog_projection("services", fields, lang)
+            cursor = self._reader("services").services.find(query, projection).sort("order", 1)
+            return await cursor.to_list(length=None)
+
+        return await self._cached(("services", "items", active_only, fields, lang), load)
 
     async def create_service(self, service_data: dict):
+        service_data.setdefault("id", str(uuid.uuid4()))
+        service_data["version"] = 1
         service_data["created_at"] = datetime.utcnow()
         service_data["updated_at"] = datetime.utcnow()
-        result = await self.db.services.insert_one(service_data)
-        return result.inserted_id
+        await self.db.services.insert_one(service_data)
+        await self._invalidate("services", [service_data["id"]])
+        return service_data["id"]
 
-    async def update_service(self, service_id: str, update_data: dict):
+    async def update_service(self, service_id: str, update_data: dict, expected_version: Optional[int] = None):
         update_data["updated_at"] = datetime.utcnow()
-        result = await self.db.services.update_one(
-            {"id": service_id}, 
-            {"$set": update_data}
-        )
-        return result.modified_count > 0
+        service = await self._update_versioned("services", service_id, update_data, expected_version)
+        if service is not None:
+            await self._invalidate("services", [service_id])
+        return service
 
     async def delete_service(self, service_id: str):
         result = await self.db.services.delete_one({"id": service_id})
+        await self._invalidate("services", [service_id])
         return result.deleted_count > 0
 
     # Testimonials operations
-    async def get_testimonials(self, approved_only: bool = True, featured: Optional[bool] = None):
+    async def get_testimonials(self, approved_only: bool = True, featured: Optional[bool] = None,
+                               fields: Optional[Tuple[str, ...]] = None, lang: Optional[str] = None):
         query = {}
         if approved_only:
             query["approved"] = True
         if featured is not None:
             query["featured"] = featured
-        
-        cursor = self.db.testimonials.find(query, {"_id": 0}).sort("created_at", -1)
-        testimonials = await cursor.to_list(length=None)
-        return testimonials
+
+        async def load():
+            projection = catalog_projection("testimonials", fields, lang)
+            cursor = self._reader("testimonials").testimonials.find(query, projection).sort("created_at", -1)
+            return await cursor.to_list(length=None)
+
+        return await self._cached(("testimonials", "items", approved_only, featured, fields, lang), load)
 
     async def create_testimonial(self, testimonial_data: dict):
+        testimonial_data.setdefault("id", str(uuid.uuid4()))
+        testimonial_data["version"] = 1
         testimonial_data["created_at"] = datetime.utcnow()
         testimonial_data["updated_at"] = datetime.utcnow()
-        result = await self.db.testimonials.insert_one(testimonial_data)
-        return result.inserted_id
+        await self.db.testimonials.insert_one(testimonial_data)
+        await self._invalidate("testimonials", [testimonial_data["id"]])
+        return testimonial_data["id"]
 
-    async def update_testimonial(self, testimonial_id: str, update_data: dict):
+    async def update_testimonial(self, testimonial_id: str, update_data: dict,
+                                 expected_version: Optional[int] = None):
         update_data["updated_at"] = datetime.utcnow()
-        result = await self.db.testimonials.update_one(
-            {"id": testimonial_id}, 
-            {"$set": update_data}
-        )
-        return result.modified_count > 0
+        testimonial = await self._update_versioned("testimonials", testimonial_id, update_data, expected_version)
+        if testimonial is not None:
+            await self._invalidate("testimonials", [testimonial_id])
+        return testimonial
 
     async def delete_testimonial(self, testimonial_id: str):
         result = await self.db.testimonials.delete_one({"id": testimonial_id})
+        await self._invalidate("testimonials", [testimonial_id])
         return result.deleted_count > 0
 
     # Contact & Booking operations
+    async def _paginate(self, collection: AsyncIOMotorCollection, query: dict,
+                        limit: int, after: Optional[str] = None):
+        """Newest-first keyset page over (created_at, id); returns (items, next_cursor)."""
+        if after:
+            created_at, doc_id = decode_cursor(after)
+            query = {"$and": [query, {"$or": [
+                {"created_at": {"$lt": created_at}},
+                {"created_at": created_at, "id": {"$lt": doc_id}},
+            ]}]}
+
+        cursor = collection.find(query, {"_id": 0}).sort([("created_at", -1), ("id", -1)]).limit(limit + 1)
+        items = await cursor.to_list(length=limit + 1)
+        next_cursor = encode_cursor(items[limit - 1]) if len(items) > limit else None
+        return items[:limit], next_cursor
+
+    async def _iter_leads(self, collection: AsyncIOMotorCollection, status: Optional[str],
+                          created_from: Optional[datetime], created_to: Optional[datetime]):
+        """Stream matching documents newest-first without materializing the result."""
+        query = {}
+        if status:
+            query["status"] = status
+        if created_from or created_to:
+            query["created_at"] = {}
+            if created_from:
+                query["created_at"]["$gte"] = created_from
+            if created_to:
+                query["created_at"]["$lt"] = created_to
+
+        cursor = collection.find(query, {"_id": 0}).sort("created_at", -1).batch_size(500)
+        async for doc in cursor:
+            yield doc
+
     async def create_contact_message(self, message_data: dict):
+        message_data.setdefault("id", str(uuid.uuid4()))
+        message_data.setdefault("status", "new")
+        message_data["version"] = 1
         message_data["created_at"] = datetime.utcnow()
         message_data["updated_at"] = datetime.utcnow()
-        result = await self.db.contact_messages.insert_one(message_data)
-        return result.inserted_id
+        await self._insert_lead("contact_messages", message_data)
+        return message_data["id"]
 
-    async def get_contact_messages(self, status: Optional[str] = None):
+    async def get_contact_messages(self, status: Optional[str] = None, limit: int = 50,
+                                   after: Optional[str] = None):
         query = {}
         if status:
             query["status"] = status
-        
-        cursor = self.db.contact_messages.find(query, {"_id": 0}).sort("created_at", -1)
-        messages = await cursor.to_list(length=None)
-        return messages
-
-    async def update_message_status(self, message_id: str, status: str):
-        result = await self.db.contact_messages.update_one(
-            {"id": message_id},
-            {"$set": {"status": status, "updated_at": datetime.utcnow()}}
-        )
-        return result.modified_count > 0
+
+        return await self._paginate(self.db.contact_messages, query, limit, after)
+
+    async def count_contact_messages(self, status: Optional[str] = None):
+        query = {"status": status} if status else {}
+        return await self.db.contact_messages.count_documents(query)
+
+    def iter_contact_messages(self, status: Optional[str] = None, created_from: Optional[datetime] = None,
+                              created_to: Optional[datetime] = None):
+        return self._iter_leads(self.db.contact_messages, status, created_from, created_to)
+
+    async def _update_lead_status(self, collection: str, lead_id: str, status: str,
+                                  expected_version: Optional[int]) -> Tuple[Optional[dict], Optional[dict]]:
+        """Set ``status``; returns the lead (before, after) the update, or (None, None)."""
+        changes = {"status": status, "updated_at": datetime.utcnow()}
+        # The previous status is needed for the counters, so ask for the
+        # document before the update and derive the updated one from it
+        before = await self._update_versioned(collection, lead_id, changes, expected_version,
+                                              return_document=ReturnDocument.BEFORE)
+        if before is None:
+            return None, None
+        return before, {**before, **changes, "version": before.get("version", 0) + 1}
+
+    async def update_message_status(self, message_id: str, status: str, expected_version: Optional[int] = None):
+        before, message = await self._update_lead_status("contact_messages", message_id, status, expected_version)
+        if before is not None:
+            await self._record_status_change("contact_messages", before, status)
+        return message
 
     async def create_booking_request(self, booking_data: dict):
+        booking_data.setdefault("id", str(uuid.uuid4()))
+        booking_data.setdefault("status", "new")
+        booking_data["version"] = 1
         booking_data["created_at"] = datetime.utcnow()
         booking_data["updated_at"] = datetime.utcnow()
-        result = await self.db.booking_requests.insert_one(booking_data)
-        return result.inserted_id
+        await self._insert_lead("booking_requests", booking_data)
+        return booking_data["id"]
 
-    async def get_booking_requests(self, status: Optional[str] = None):
+    async def get_booking_requests(self, status: Optional[str] = None, limit: int = 50,
+                                   after: Optional[str] = None):
         query = {}
         if status:
             query["status"] = status
-        
-        cursor = self.db.booking_requests.find(query, {"_id": 0}).sort("created_at", -1)
-        bookings = await cursor.to_list(length=None)
-        return bookings
-
-    async def update_booking_status(self, booking_id: str, status: str):
-        result = await self.db.booking_requests.update_one(
-            {"id": booking_id},
-            {"$set": {"status": status, "updated_at": datetime.utcnow()}}
+
+        return await self._paginate(self.db.booking_requests, query, limit, after)
+
+    async def count_booking_requests(self, status: Optional[str] = None):
+        query = {"status": status} if status else {}
+        return await self.db.booking_requests.count_documents(query)
+
+    def iter_booking_requests(self, status: Optional[str] = None, created_from: Optional[datetime] = None,
+                              created_to: Optional[datetime] = None):
+        return self._iter_leads(self.db.booking_requests, status, created_from, created_to)
+
+    async def update_booking_status(self, booking_id: str, status: str, expected_version: Optional[int] = None):
+        # The previous status comes back atomically with the update, so
+        # concurrent changes still move the availability counts correctly
+        before, booking = await self._update_lead_status("booking_requests", booking_id, status, expected_version)
+        if before is not None:
+            await self._record_status_change("booking_requests", before, status)
+        return booking
+
+    # Dashboard counters: one lead_stats document per collection, changed with
+    # a single $inc per write so it never needs a scan to read. The lead is
+    # already stored when they are updated, so a failed counter write is
+    # logged rather than failing the request; rebuild-stats repairs them.
+    async def _record_leads(self, collection: str, docs: List[dict]):
+        """Count newly stored leads and put new bookings on the calendar."""
+        try:
+            await self._count_leads(collection, docs)
+            if collection == "booking_requests":
+                for doc in docs:
+                    await self._adjust_availability(doc.get("event_date"), doc.get("status"), 1)
+        except Exception as e:
+            logger.error(f"Failed to update counters for {len(docs)} new {collection}: {e}")
+
+    async def _record_status_change(self, collection: str, before: dict, status: str):
+        old = before.get("status")
+        if old == status:
+            return
+        try:
+            if collection == "booking_requests":
+                await self._adjust_availability(before.get("event_date"), old, -1)
+                await self._adjust_availability(before.get("event_date"), status, 1)
+            await self._move_lead_status(collection, old, status)
+        except Exception as e:
+            logger.error(f"Failed to update counters for {collection} {before.get('id')}: {e}")
+
+    async def _count_leads(self, collection: str, docs: List[dict]):
+        increments: Dict[str, int] = {"total": len(docs)}
+        for doc in docs:
+            for field in (
+                f"status.{counter_key(doc.get('status'))}",
+                f"event_type.{counter_key(doc.get('event_type'))}",
+                f"month.{doc['created_at']:%Y-%m}",
+            ):
+                increments[field] = increments.get(field, 0) + 1
+        await self.db.lead_stats.update_one({"_id": collection}, {"$inc": increments}, upsert=True)
+
+    async def _move_lead_status(self, collection: str, old: Optional[str], new: str):
+        if old == new:
+            return
+        await self.db.lead_stats.update_one({"_id": collection}, {"$inc": {
+            f"status.{counter_key(old)}": -1,
+            f"status.{counter_key(new)}": 1,
+        }}, upsert=True)
+
+    async def get_lead_stats(self) -> Dict[str, dict]:
+        """Counters per lead collection: total and counts by status, event_type and month."""
+        stats = {}
+        async for doc in self.db.lead_stats.find({"_id": {"$in": list(LEAD_COLLECTIONS)}}):
+            stats[doc["_id"]] = {
+                "total": doc.get("total", 0),
+                **{dimension: {decode_counter_key(key): count for key, count in doc.get(dimension, {}).items() if count}
+                   for dimension in ("status", "event_type", "month")},
+            }
+        return stats
+
+    # Availability calendar: one document per day counting booked / quoted requests
+    async def _adjust_availability(self, event_date, status: Optional[str], delta: int):
+        day = day_key(event_date)
+        if day is None or status not in AVAILABILITY_STATUSES:
+            return
+        await self.db.availability.update_one({"_id": day}, {"$inc": {status: delta}}, upsert=True)
+        self._mark_written("availability")
+
+    async def get_availability(self, start: date, end: date) -> Dict[str, Dict[str, int]]:
+        """{day: {"booked": n, "quoted": n}} for days in [start, end] with any such booking."""
+        cursor = self._reader("availability").availability.find(
+            {"_id": {"$gte": start.isoformat(), "$lte": end.isoformat()}}
         )
-        return result.modified_count > 0
+        days = {}
+        async for doc in cursor:
+            counts = {status: doc.get(status, 0) for status in AVAILABILITY_STATUSES}
+            if any(counts.values()):
+                days[doc["_id"]] = counts
+        return days
 
     # Settings operations
+    async def get_settings_snapshot(self) -> dict:
+        """{"version": n, "values": {key: value}}, kept in memory until settings change.
+
+        The snapshot is shared between callers and must not be modified.
+        """
+        versions = self.cache.versions_for(("settings",))
+        slot = self._settings_snapshot
+        if slot is not None and slot[0] == versions and slot[1] > time.monotonic():
+            return slot[2]
+
+        async def load():
+            cursor = self._reader("settings").settings.find({}, {"_id": 0})
+            version, values = 0, {}
+            async for setting in cursor:
+                if setting["key"] == SETTINGS_VERSION_KEY:
+                    version = setting.get("version", 0)
+                else:
+                    values[setting["key"]] = setting["value"]
+            snapshot = {"version": version, "values": values}
+            # A write that landed while this was loading keeps it out of the slot
+            if self.cache.versions_for(("settings",)) == versions:
+                self._settings_snapshot = (versions, time.monotonic() + self.cache.ttl, snapshot)
+            return snapshot
+
+        return await self.cache.flights.do(("settings", "snapshot", tuple(sorted(versions.items()))), load)
+
     async def get_all_settings(self):
-        cursor = self.db.settings.find({}, {"_id": 0})
-        settings = await cursor.to_list(length=None)
-        return {setting["key"]: setting["value"] for setting in settings}
+        return (await self.get_settings_snapshot())["values"]
 
     async def get_setting(self, key: str):
-        setting = await self.db.settings.find_one({"key": key}, {"_id": 0})
-        return setting["value"] if setting else None
+        return (await self.get_settings_snapshot())["values"].get(key)
 
     async def update_setting(self, key: str, value: dict):
-        result = await self.db.settings.update_one(
-            {"key": key},
-            {
-                "$set": {
-                    "value": value,
-                    "updated_at": datetime.utcnow()
-                }
-            },
-            upsert=True
-        )
-        return True
+        return await self.update_settings({key: value})
+
+    async def update_settings(self, values: Dict[str, dict], expected_version: Optional[int] = None) -> int:
+        """Bump the settings version and upsert several settings in one ordered bulk_write.
+
+        The bump comes first and only matches ``expected_version``; at any
+        other version its upsert collides with the existing version document
+        on the unique key index, which stops the ordered batch before any
+        value is written and raises VersionConflict. Without
+        ``expected_version`` the current version is read and the write is
+        retried until nobody else wrote in between. Returns the version this
+        write produced.
+        """
+        if expected_version is None:
+            while True:
+                try:
+                    return await self.update_settings(values, await self._settings_version())
+                except VersionConflict:
+                    continue
+
+        now = datetime.utcnow()
+        # Settings written before versioning have no version document and count as 0
+        match = {"key": SETTINGS_VERSION_KEY, "version": {"$in": [0, None]} if expected_version == 0 else expected_version}
+        operations = [UpdateOne(match, {"$inc": {"version": 1}, "$set": {"updated_at": now}}, upsert=True)]
+        operations += [
+            UpdateOne({"key": key}, {"$set": {"value": value, "updated_at": now}}, upsert=True)
+            for key, value in values.items()
+        ]
+        conflict = False
+        try:
+            await self.db.settings.bulk_write(operations, ordered=True)
+        except BulkWriteError as e:
+            conflict = any(error["index"] == 0 and error.get("code") == 11000
+                           for error in e.details.get("writeErrors", []))
+            if conflict:
+                raise VersionConflict(await self._settings_version())
+            raise
+        finally:
+            if not conflict:
+                await self._invalidate("settings")
+        return expected_version + 1
+
+    async def _settings_version(self) -> int:
+        doc = await self.db.settings.find_one({"key": SETTINGS_VERSION_KEY})
+        return doc.get("version", 0) if doc else 0
+
+
+async def rebuild_availability(db_service: DatabaseService):
+    """Recompute the availability calendar from booking_requests."""
+    db = db_service.db
+    pipeline = [
+        {"$match": {"status": {"$in": list(AVAILABILITY_STATUSES)}, "event_date": {"$type": "date"}}},
+        {"$group": {
+            "_id": {"day": {"$dateToString": {"format": "%Y-%m-%d", "date": "$event_date"}}, "status": "$status"},
+            "count": {"$sum": 1},
+        }},
+    ]
+    days: Dict[str, Dict[str, int]] = {}
+    async for row in db.booking_requests.aggregate(pipeline):
+        counts = days.setdefault(row["_id"]["day"], {status: 0 for status in AVAILABILITY_STATUSES})
+        counts[row["_id"]["status"]] = row["count"]
+
+    if days:
+        await db.availability.bulk_write([ReplaceOne({"_id": day}, counts, upsert=True) for day, counts in days.items()])
+    await db.availability.delete_many({"_id": {"$nin": list(days)}})
+    logger.info(f"Availability calendar rebuilt: {len(days)} days with bookings")
+
+
+async def rebuild_lead_stats(db_service: DatabaseService):
+    """Recompute the dashboard counters from contact_messages and booking_requests."""
+    db = db_service.db
+    for collection in LEAD_COLLECTIONS:
+        pipeline = [{"$facet": {
+            "total": [{"$count": "count"}],
+            "status": [{"$group": {"_id": "$status", "count": {"$sum": 1}}}],
+            "event_type": [{"$group": {"_id": "$event_type", "count": {"$sum": 1}}}],
+            "month": [
+                {"$match": {"created_at": {"$type": "date"}}},
+                {"$group": {"_id": {"$dateToString": {"format": "%Y-%m", "date": "$created_at"}}, "count": {"$sum": 1}}},
+            ],
+        }}]
+        result = (await db[collection].aggregate(pipeline).to_list(length=1))[0]
+        doc = {"total": result["total"][0]["count"] if result["total"] else 0}
+        for dimension in ("status", "event_type", "month"):
+            doc[dimension] = {counter_key(row["_id"]): row["count"] for row in result[dimension]}
+        await db.lead_stats.replace_one({"_id": collection}, doc, upsert=True)
+    logger.info("Dashboard counters rebuilt")
 
 
 # Data seeding function
 async def seed_initial_data(db_service: DatabaseService):
-    """Seed the database with initial data from mock.js"""
-    
-    # Check if data already exists
-    existing_portfolio = await db_service.get_portfolio_items()
-    if existing_portfolio:
-        logger.info("Database already seeded, skipping...")
-        return
+    """Seed the database with initial data from mock.js
+
+    Each collection is seeded only while it is empty, so a run interrupted
+    part way (or a database seeded before migrations existed) picks up the
+    collections still missing without duplicating the others.
+    """
+    db = db_service.db
+
+    async def seed(collection: str, docs: List[dict]):
+        if await db[collection].find_one({}, {"_id": 1}):
+            logger.info(f"{collection} already seeded, skipping...")
+            return
+        await db_service.insert_documents(collection, docs)
 
     logger.info("Seeding database with initial data...")
 
@@ -239,8 +816,7 @@ async def seed_initial_data(db_service: DatabaseService):
         }
     ]
 
-    for item in portfolio_items:
-        await db_service.create_portfolio_item(item)
+    await seed("portfolio", portfolio_items)
 
     # Services data
     services = [
@@ -285,8 +861,7 @@ async def seed_initial_data(db_service: DatabaseService):
         }
     ]
 
-    for service in services:
-        await db_service.create_service(service)
+    await seed("services", services)
 
     # Testimonials data
     testimonials = [
@@ -328,8 +903,7 @@ async def seed_initial_data(db_service: DatabaseService):
         }
     ]
 
-    for testimonial in testimonials:
-        await db_service.create_testimonial(testimonial)
+    await seed("testimonials", testimonials)
 
     # Settings data
     photographer_info = {
@@ -357,8 +931,13 @@ async def seed_initial_data(db_service: DatabaseService):
         "facebook": "YedidyaMalkaPhotography"
     }
 
-    await db_service.update_setting("photographer_info", photographer_info)
-    await db_service.update_setting("contact_info", contact_info)
-    await db_service.update_setting("social_media", social_media)
+    if await db.settings.find_one({"key": {"$ne": SETTINGS_VERSION_KEY}}, {"_id": 1}):
+        logger.info("settings already seeded, skipping...")
+        return
+    await db_service.update_settings({
+        "photographer_info": photographer_info,
+        "contact_info": contact_info,
+        "social_media": social_media,
+    })
 
     logger.info("Database seeded successfully!")
\ No newline at end of file
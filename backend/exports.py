@@ -0,0 +1,62 @@
+from typing import AsyncIterator, List
+from datetime import datetime
+import csv
+import io
+
+import orjson
+
+# Column order of the spreadsheet exports
+MESSAGE_COLUMNS = [
+    "id", "name", "phone", "email", "event_type", "event_date", "message",
+    "status", "created_at", "updated_at",
+]
+BOOKING_COLUMNS = [
+    "id", "name", "phone", "email", "event_type", "event_date", "guest_count",
+    "budget", "venue", "additional_info", "status", "created_at", "updated_at",
+]
+
+# Rows are flushed to the client in chunks of this many documents
+CHUNK_ROWS = 200
+# Text starting with one of these is run as a formula by spreadsheet apps;
+# form fields are public input, so such cells are prefixed with a quote.
+FORMULA_PREFIXES = ("=", "+", "-", "@", "\t", "\r")
+
+
+def _cell(value) -> str:
+    if value is None:
+        return ""
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if isinstance(value, (list, dict)):
+        return orjson.dumps(value).decode()
+    if isinstance(value, str) and value.startswith(FORMULA_PREFIXES):
+        return "'" + value
+    return str(value)
+
+
+async def csv_stream(docs: AsyncIterator[dict], columns: List[str]) -> AsyncIterator[bytes]:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    # BOM so spreadsheet apps detect UTF-8 and render the Hebrew text
+    buffer.write("\ufeff")
+    writer.writerow(columns)
+    rows = 0
+    async for doc in docs:
+        writer.writerow([_cell(doc.get(column)) for column in columns])
+        rows += 1
+        if rows % CHUNK_ROWS == 0:
+            yield buffer.getvalue().encode()
+            buffer.seek(0)
+            buffer.truncate()
+    yield buffer.getvalue().encode()
+
+
+async def ndjson_stream(docs: AsyncIterator[dict]) -> AsyncIterator[bytes]:
+    chunk = []
+    async for doc in docs:
+        chunk.append(orjson.dumps(doc))
+        if len(chunk) == CHUNK_ROWS:
+            yield b"\n".join(chunk) + b"\n"
+            chunk = []
+    if chunk:
+        yield b"\n".join(chunk) + b"\n"
@@ -0,0 +1,251 @@
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Dict, Optional
+from urllib.parse import urlsplit
+import asyncio
+import logging
+import os
+import re
+import time
+import uuid
+
+import requests
+from PIL import Image, ImageOps
+
+logger = logging.getLogger(__name__)
+
+FORMATS = {"webp": "WEBP", "jpeg": "JPEG", "png": "PNG"}
+MEDIA_TYPES = {"webp": "image/webp", "jpeg": "image/jpeg", "png": "image/png"}
+# Requested widths and qualities are snapped to these steps so the number of
+# distinct variants per image stays small.
+WIDTHS = (160, 320, 480, 640, 800, 1024, 1280, 1600, 1920, 2560)
+QUALITY_STEP = 5
+
+_SAFE_ID = re.compile(r"^[A-Za-z0-9_-]{1,64}$")
+
+MAX_IMAGE_BYTES = 25 * 1024 * 1024
+# Hosts remote originals may be imported from; item image URLs are client
+# supplied, so anything else is never fetched.
+IMPORT_HOSTS = frozenset(
+    host.strip().lower()
+    for host in os.environ.get('IMAGE_IMPORT_HOSTS', 'images.unsplash.com').split(",")
+    if host.strip()
+)
+
+
+# Workers share the variant directory, each with its own index of it. Adding
+# a variant rebuilds the index from the directory when it is older than this,
+# so files written by the other workers count against the same budget.
+RESCAN_SECONDS = 30.0
+
+
+def snap_width(width: int) -> int:
+    return next((w for w in WIDTHS if w >= width), WIDTHS[-1])
+
+
+def snap_quality(quality: int) -> int:
+    return min(95, max(QUALITY_STEP, round(quality / QUALITY_STEP) * QUALITY_STEP))
+
+
+def _render_variant(source: str, target: str, width: int, fmt: str, quality: int) -> int:
+    """Resize and re-encode ``source`` into ``target``; runs in a worker process."""
+    with Image.open(source) as img:
+        img = ImageOps.exif_transpose(img)
+        if img.width > width:
+            height = max(1, round(img.height * width / img.width))
+            img = img.resize((width, height), Image.LANCZOS)
+        if fmt == "jpeg" and img.mode not in ("RGB", "L"):
+            img = img.convert("RGB")
+        tmp = f"{target}.{uuid.uuid4().hex}.tmp"
+        img.save(tmp, format=FORMATS[fmt], quality=quality, optimize=True)
+    os.replace(tmp, target)
+    return os.path.getsize(target)
+
+
+def _verify_image(path: str) -> None:
+    with Image.open(path) as img:
+        img.verify()
+
+
+class VariantCache:
+    """LRU index over the variant files on disk, bounded by total bytes.
+
+    Recency is the file mtime, touched on every hit, so the workers sharing
+    the directory agree on which variants are cold.
+    """
+
+    def __init__(self, directory: Path, max_bytes: int):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        directory.mkdir(parents=True, exist_ok=True)
+        for path in directory.glob("*.tmp"):
+            path.unlink(missing_ok=True)
+        self._rescan()
+        self._evict()
+
+    def _rescan(self) -> None:
+        """Rebuild the index from the files in the directory, oldest first."""
+        entries = []
+        for entry in os.scandir(self.directory):
+            if entry.name.endswith(".tmp"):
+                continue
+            try:
+                stat = entry.stat()
+            except FileNotFoundError:
+                continue  # evicted by another worker meanwhile
+            entries.append((stat.st_mtime, entry.name, stat.st_size))
+        entries.sort()
+        self._files: "OrderedDict[str, int]" = OrderedDict((name, size) for _, name, size in entries)
+        self.total_bytes = sum(self._files.values())
+        self._scanned_at = time.monotonic()
+
+    def lookup(self, name: str) -> Optional[Path]:
+        path = self.directory / name
+        try:
+            os.utime(path)
+        except FileNotFoundError:
+            if name in self._files:
+                self.total_bytes -= self._files.pop(name)
+            return None
+        if name in self._files:
+            self._files.move_to_end(name)
+        return path
+
+    def add(self, name: str, size: int) -> None:
+        if time.monotonic() - self._scanned_at > RESCAN_SECONDS:
+            self._rescan()
+        self.total_bytes += size - self._files.get(name, 0)
+        self._files[name] = size
+        self._files.move_to_end(name)
+        self._evict(keep=name)
+
+    def discard_prefix(self, prefix: str) -> None:
+        """Delete every variant named ``prefix``*, including other workers' ones."""
+        for path in self.directory.glob(f"{prefix}*"):
+            if path.name in self._files:
+                self.total_bytes -= self._files.pop(path.name)
+            path.unlink(missing_ok=True)
+
+    def _evict(self, keep: Optional[str] = None) -> None:
+        while self.total_bytes > self.max_bytes and self._files:
+            name, size = next(iter(self._files.items()))
+            if name == keep:
+                break
+            del self._files[name]
+            self.total_bytes -= size
+            (self.directory / name).unlink(missing_ok=True)
+
+
+class ImageStore:
+    """Locally stored portfolio originals plus a disk cache of resized variants."""
+
+    def __init__(self, root: Path, cache_bytes: int = 512 * 1024 * 1024, workers: Optional[int] = None):
+        self.originals = root / "originals"
+        self.originals.mkdir(parents=True, exist_ok=True)
+        self.variants = VariantCache(root / "variants", cache_bytes)
+        self.workers = workers
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._pending: Dict[str, asyncio.Future] = {}
+        self._imports: Dict[str, asyncio.Future] = {}
+
+    @property
+    def pool(self) -> ProcessPoolExecutor:
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor(max_workers=self.workers)
+        return self._pool
+
+    def shutdown(self) -> None:
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+
+    def original_path(self, item_id: str) -> Path:
+        if not _SAFE_ID.match(item_id):
+            raise ValueError(f"Invalid image id: {item_id!r}")
+        return self.originals / item_id
+
+    def has_original(self, item_id: str) -> bool:
+        return self.original_path(item_id).exists()
+
+    async def save_original(self, item_id: str, data: bytes) -> None:
+        path = self.original_path(item_id)
+        tmp = path.with_name(f"{path.name}.{uuid.uuid4().hex}.tmp")
+        await asyncio.to_thread(tmp.write_bytes, data)
+        try:
+            await asyncio.to_thread(_verify_image, str(tmp))
+        except Exception as e:
+            tmp.unlink(missing_ok=True)
+            raise ValueError("Uploaded file is not a supported image") from e
+        os.replace(tmp, path)
+        self.variants.discard_prefix(f"{item_id}.")
+
+    def delete(self, item_id: str) -> None:
+        """Remove the original and the variants of a deleted portfolio item."""
+        if not _SAFE_ID.match(item_id):
+            return  # never stored under this id
+        try:
+            self.original_path(item_id).unlink(missing_ok=True)
+            self.variants.discard_prefix(f"{item_id}.")
+        except OSError as e:
+            logger.error(f"Failed to remove images of portfolio item {item_id}: {e}")
+
+    @staticmethod
+    def can_import(url: str) -> bool:
+        parts = urlsplit(url)
+        return parts.scheme in ("http", "https") and (parts.hostname or "").lower() in IMPORT_HOSTS
+
+    async def import_original(self, item_id: str, url: str) -> None:
+        """Download a remote original (e.g. the seeded Unsplash URLs) once."""
+        pending = self._imports.get(item_id)
+        if pending is None:
+            pending = asyncio.ensure_future(self._download(item_id, url))
+            self._imports[item_id] = pending
+            pending.add_done_callback(lambda _: self._imports.pop(item_id, None))
+        await asyncio.shield(pending)
+
+    async def _download(self, item_id: str, url: str) -> None:
+        if not self.can_import(url):
+            raise ValueError("Image URL is not on an allowed host")
+
+        def fetch():
+            # Redirects could lead off the allowed hosts, so they are not followed
+            with requests.get(url, timeout=30, stream=True, allow_redirects=False) as response:
+                if response.status_code != 200:
+                    raise requests.HTTPError(f"Image download returned {response.status_code}")
+                if int(response.headers.get("content-length") or 0) > MAX_IMAGE_BYTES:
+                    raise ValueError("Remote image is too large")
+                chunks, size = [], 0
+                for chunk in response.iter_content(64 * 1024):
+                    size += len(chunk)
+                    if size > MAX_IMAGE_BYTES:
+                        raise ValueError("Remote image is too large")
+                    chunks.append(chunk)
+                return b"".join(chunks)
+
+        await self.save_original(item_id, await asyncio.to_thread(fetch))
+        logger.info(f"Imported original image for portfolio item {item_id}")
+
+    async def get_variant(self, item_id: str, width: int, fmt: str, quality: int) -> Path:
+        source = self.original_path(item_id)
+        # The original's mtime is part of the name, so replacing an original
+        # never serves variants rendered from the previous file.
+        version = source.stat().st_mtime_ns
+        name = f"{item_id}.{version}.w{width}q{quality}.{fmt}"
+
+        cached = self.variants.lookup(name)
+        if cached is not None:
+            return cached
+
+        pending = self._pending.get(name)
+        if pending is None:
+            loop = asyncio.get_running_loop()
+            target = self.variants.directory / name
+            pending = asyncio.ensure_future(loop.run_in_executor(
+                self.pool, _render_variant, str(source), str(target), width, fmt, quality,
+            ))
+            self._pending[name] = pending
+            pending.add_done_callback(lambda _: self._pending.pop(name, None))
+        size = await asyncio.shield(pending)
+        self.variants.add(name, size)
+        return self.variants.directory / name
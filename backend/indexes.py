@@ -0,0 +1,75 @@
+from typing import Dict, List
+from motor.motor_asyncio import AsyncIOMotorDatabase
+from pymongo import IndexModel
+from pymongo.errors import OperationFailure
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Documents created before ids were assigned on insert have no "id" field;
+# they are left out of the unique index instead of colliding on null.
+_HAS_ID = {"id": {"$exists": True}}
+
+# Declared indexes per collection: name -> key spec and options.
+INDEXES: Dict[str, List[dict]] = {
+    "portfolio": [
+        {"name": "id_unique", "keys": [("id", 1)], "unique": True, "partialFilterExpression": _HAS_ID},
+        {"name": "category_featured_order", "keys": [("category", 1), ("featured", 1), ("order", 1)]},
+    ],
+    "services": [
+        {"name": "id_unique", "keys": [("id", 1)], "unique": True, "partialFilterExpression": _HAS_ID},
+        {"name": "active_order", "keys": [("active", 1), ("order", 1)]},
+    ],
+    "testimonials": [
+        {"name": "id_unique", "keys": [("id", 1)], "unique": True, "partialFilterExpression": _HAS_ID},
+        {"name": "approved_featured_created", "keys": [("approved", 1), ("featured", 1), ("created_at", -1)]},
+    ],
+    "contact_messages": [
+        {"name": "id_unique", "keys": [("id", 1)], "unique": True, "partialFilterExpression": _HAS_ID},
+        {"name": "status_created_id", "keys": [("status", 1), ("created_at", -1), ("id", -1)]},
+        {"name": "created_id", "keys": [("created_at", -1), ("id", -1)]},
+    ],
+    "booking_requests": [
+        {"name": "id_unique", "keys": [("id", 1)], "unique": True, "partialFilterExpression": _HAS_ID},
+        {"name": "status_created_id", "keys": [("status", 1), ("created_at", -1), ("id", -1)]},
+        {"name": "created_id", "keys": [("created_at", -1), ("id", -1)]},
+    ],
+    "settings": [
+        {"name": "key_unique", "keys": [("key", 1)], "unique": True},
+    ],
+}
+
+
+def _options(spec: dict) -> dict:
+    return {k: v for k, v in spec.items() if k not in ("name", "keys")}
+
+
+async def ensure_indexes(db: AsyncIOMotorDatabase) -> None:
+    """Create every declared index; already existing identical indexes are a no-op."""
+    for collection, specs in INDEXES.items():
+        for spec in specs:
+            model = IndexModel(spec["keys"], name=spec["name"], **_options(spec))
+            try:
+                await db[collection].create_indexes([model])
+            except OperationFailure as e:
+                # An index with the same name or keys but other options exists;
+                # verify_indexes reports it, dropping it is left to an operator.
+                logger.error(f"Could not create index {collection}.{spec['name']}: {e}")
+
+
+async def verify_indexes(db: AsyncIOMotorDatabase) -> List[str]:
+    """Compare live indexes with INDEXES and describe every missing or differing one."""
+    problems = []
+    for collection, specs in INDEXES.items():
+        existing = await db[collection].index_information()
+        for spec in specs:
+            info = existing.get(spec["name"])
+            if info is None:
+                problems.append(f"{collection}.{spec['name']}: missing")
+                continue
+            if [tuple(k) for k in info["key"]] != [tuple(k) for k in spec["keys"]]:
+                problems.append(f"{collection}.{spec['name']}: keys {info['key']} != declared {spec['keys']}")
+            for option, value in _options(spec).items():
+                if info.get(option) != value:
+                    problems.append(f"{collection}.{spec['name']}: {option}={info.get(option)!r}, declared {value!r}")
+    return problems
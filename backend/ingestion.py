@@ -0,0 +1,130 @@
+from typing import Awaitable, Callable, Dict, List
+from motor.motor_asyncio import AsyncIOMotorDatabase
+from pymongo.errors import BulkWriteError
+import asyncio
+import logging
+
+logger = logging.getLogger(__name__)
+
+FLUSH_RETRIES = 3
+
+
+class IngestionQueueFull(Exception):
+    """The write-behind queue stayed full for longer than the submit timeout."""
+
+
+class WriteBehindWriter:
+    """Buffers inserts per collection and writes them with insert_many.
+
+    A batch is flushed when it reaches ``batch_size`` documents or
+    ``flush_interval`` seconds after its first document arrived. When a
+    queue is full, ``submit`` waits up to ``submit_timeout`` for room and
+    then raises IngestionQueueFull so callers can shed load. Subscribers
+    are called with the documents of every batch once they are stored.
+    """
+
+    def __init__(self, db: AsyncIOMotorDatabase, max_size: int = 1000, batch_size: int = 100,
+                 flush_interval: float = 0.2, submit_timeout: float = 0.05):
+        self.db = db
+        self.max_size = max_size
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.submit_timeout = submit_timeout
+        self._queues: Dict[str, asyncio.Queue] = {}
+        self._tasks: Dict[str, asyncio.Task] = {}
+        self._closed = False
+        self._listeners: List[Callable[[str, List[dict]], Awaitable[None]]] = []
+
+    def subscribe(self, listener: Callable[[str, List[dict]], Awaitable[None]]) -> None:
+        """Await ``listener(collection, docs)`` after ``docs`` were written."""
+        self._listeners.append(listener)
+
+    async def _written(self, collection: str, docs: List[dict]) -> None:
+        if not docs:
+            return
+        for listener in self._listeners:
+            try:
+                await listener(collection, docs)
+            except Exception as e:
+                logger.error(f"Write-behind listener failed for {collection}: {e}")
+
+    def _queue(self, collection: str) -> asyncio.Queue:
+        queue = self._queues.get(collection)
+        if queue is None:
+            queue = self._queues[collection] = asyncio.Queue(maxsize=self.max_size)
+            self._tasks[collection] = asyncio.create_task(self._flush_loop(collection, queue))
+        return queue
+
+    async def submit(self, collection: str, doc: dict) -> None:
+        if self._closed:
+            # Draining for shutdown: write through instead of dropping
+            await self.db[collection].insert_one(doc)
+            await self._written(collection, [doc])
+            return
+        try:
+            await asyncio.wait_for(self._queue(collection).put(doc), self.submit_timeout)
+        except asyncio.TimeoutError:
+            raise IngestionQueueFull(f"Write-behind queue for {collection} is full")
+
+    async def stop(self, timeout: float = 10.0) -> None:
+        """Flush everything still queued, then stop the flush tasks."""
+        self._closed = True
+        try:
+            await asyncio.wait_for(
+                asyncio.gather(*(queue.join() for queue in self._queues.values())), timeout
+            )
+        except asyncio.TimeoutError:
+            pending = sum(queue.qsize() for queue in self._queues.values())
+            logger.error(f"Write-behind drain timed out with {pending} documents unwritten")
+        for task in self._tasks.values():
+            task.cancel()
+        await asyncio.gather(*self._tasks.values(), return_exceptions=True)
+
+    async def _next_batch(self, queue: asyncio.Queue) -> List[dict]:
+        loop = asyncio.get_running_loop()
+        batch = [await queue.get()]
+        deadline = loop.time() + self.flush_interval
+        while len(batch) < self.batch_size:
+            if not queue.empty():
+                batch.append(queue.get_nowait())
+                continue
+            remaining = deadline - loop.time()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(queue.get(), remaining))
+            except asyncio.TimeoutError:
+                break
+        return batch
+
+    async def _flush_loop(self, collection: str, queue: asyncio.Queue) -> None:
+        while True:
+            batch = await self._next_batch(queue)
+            try:
+                await self._write(collection, batch)
+            finally:
+                for _ in batch:
+                    queue.task_done()
+
+    async def _write(self, collection: str, batch: List[dict]) -> None:
+        pending = batch
+        for attempt in range(1, FLUSH_RETRIES + 1):
+            try:
+                await self.db[collection].insert_many(pending, ordered=False)
+                await self._written(collection, pending)
+                return
+            except BulkWriteError as e:
+                # Keep retrying only the documents that were not written;
+                # duplicate keys mean an earlier attempt already stored them.
+                failed = {err["index"] for err in e.details.get("writeErrors", []) if err.get("code") != 11000}
+                await self._written(collection, [doc for index, doc in enumerate(pending) if index not in failed])
+                pending = [doc for index, doc in enumerate(pending) if index in failed]
+                if not pending:
+                    return
+                error = e
+            except Exception as e:
+                error = e
+            logger.warning(f"Write-behind flush to {collection} failed (attempt {attempt}): {error}")
+            await asyncio.sleep(0.1 * 2 ** attempt)
+        ids = [doc.get("id") for doc in pending]
+        logger.error(f"Dropped {len(pending)} documents for {collection} after {FLUSH_RETRIES} attempts: {ids}")
@@ -0,0 +1,148 @@
+from typing import Callable, List, Optional
+from datetime import datetime
+from motor.motor_asyncio import AsyncIOMotorDatabase
+from pymongo import CursorType
+from pymongo.errors import CollectionInvalid, OperationFailure
+import asyncio
+import logging
+import uuid
+
+from cache import TTLCache
+
+logger = logging.getLogger(__name__)
+
+# Collections whose writes invalidate cached reads on every worker
+WATCHED_COLLECTIONS = ["portfolio", "services", "testimonials", "settings"]
+
+BUS_COLLECTION = "cache_invalidations"
+BUS_SIZE_BYTES = 1024 * 1024
+# Larger writes are published without ids; listeners then treat the whole
+# namespace as changed
+MAX_PUBLISHED_IDS = 500
+RETRY_SECONDS = 1.0
+
+
+class InvalidationBus:
+    """Propagates cache invalidations between workers through MongoDB.
+
+    ``change_stream`` mode watches the data collections themselves (replica
+    set required), so every write is seen, even ones made outside the API.
+    ``capped`` mode has writers publish the namespace into a capped collection
+    that every worker tails with a tailable await cursor. ``auto`` picks change
+    streams when the server is a replica set member.
+
+    Listeners get the namespace and the ``id`` values of the changed
+    documents, or None when those are not known (deletes seen through a
+    change stream, large writes, reconnects).
+    """
+
+    def __init__(self, db: AsyncIOMotorDatabase, cache: TTLCache, mode: str = "auto"):
+        self.db = db
+        self.cache = cache
+        self.mode = mode
+        self.origin = str(uuid.uuid4())
+        self._listeners: List[Callable[[str, Optional[List[str]]], None]] = []
+        self._task: Optional[asyncio.Task] = None
+
+    def subscribe(self, listener: Callable[[str, Optional[List[str]]], None]) -> None:
+        """Call ``listener(namespace, ids)`` for every invalidation received from the bus."""
+        self._listeners.append(listener)
+
+    async def start(self) -> None:
+        if self.mode == "off":
+            return
+        if self.mode == "auto":
+            hello = await self.db.client.admin.command("hello")
+            self.mode = "change_stream" if hello.get("setName") else "capped"
+        if self.mode == "capped":
+            await self._ensure_capped_collection()
+        logger.info(f"Cache invalidation bus running in {self.mode} mode")
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def publish(self, namespace: str, ids: Optional[List[str]] = None) -> None:
+        # Change streams observe the write itself; nothing to publish
+        if self.mode != "capped":
+            return
+        if ids is not None and len(ids) > MAX_PUBLISHED_IDS:
+            ids = None
+        await self.db[BUS_COLLECTION].insert_one(
+            {"namespace": namespace, "ids": ids, "origin": self.origin, "ts": datetime.utcnow()}
+        )
+
+    def _apply(self, namespace: str, ids: Optional[List[str]] = None) -> None:
+        self.cache.invalidate(namespace)
+        self._notify(namespace, ids)
+
+    def _notify(self, namespace: str, ids: Optional[List[str]] = None) -> None:
+        for listener in self._listeners:
+            try:
+                listener(namespace, ids)
+            except Exception as e:
+                logger.error(f"Invalidation listener failed for {namespace}: {e}")
+
+    async def _run(self) -> None:
+        consume = self._watch_change_stream if self.mode == "change_stream" else self._tail_capped
+        while True:
+            try:
+                await consume()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Cache invalidation bus interrupted: {e}")
+            # Invalidations may have been missed while disconnected
+            self.cache.clear()
+            for namespace in WATCHED_COLLECTIONS:
+                self._notify(namespace)
+            await asyncio.sleep(RETRY_SECONDS)
+
+    async def _watch_change_stream(self) -> None:
+        pipeline = [
+            {"$match": {"ns.coll": {"$in": WATCHED_COLLECTIONS}}},
+            # Only the document's own id is needed from the looked up document
+            {"$project": {"ns": 1, "operationType": 1, "fullDocument.id": 1}},
+        ]
+        async with self.db.watch(pipeline, full_document="updateLookup") as stream:
+            async for change in stream:
+                # Deletes carry only the Mongo _id, and a document deleted
+                # before the lookup comes back without fullDocument
+                doc_id = (change.get("fullDocument") or {}).get("id")
+                self._apply(change["ns"]["coll"], [doc_id] if doc_id is not None else None)
+
+    async def _ensure_capped_collection(self) -> None:
+        try:
+            await self.db.create_collection(BUS_COLLECTION, capped=True, size=BUS_SIZE_BYTES)
+        except (CollectionInvalid, OperationFailure):
+            pass  # already exists
+        # A tailable cursor on an empty capped collection dies immediately
+        if await self.db[BUS_COLLECTION].find_one({}, {"_id": 1}) is None:
+            await self.db[BUS_COLLECTION].insert_one({"namespace": None, "origin": self.origin, "ts": datetime.utcnow()})
+
+    async def _tail_capped(self) -> None:
+        collection = self.db[BUS_COLLECTION]
+        # ObjectIds carry the clock of the publishing worker, so they do not
+        # follow insertion order across workers. Tail from the start in
+        # $natural order instead and skip up to the newest message present now.
+        last = await collection.find_one({}, {"_id": 1}, sort=[("$natural", -1)])
+        caught_up = last is None
+        cursor = collection.find({}, sort=[("$natural", 1)], cursor_type=CursorType.TAILABLE_AWAIT)
+        while cursor.alive:
+            async for message in cursor:
+                if not caught_up:
+                    caught_up = message["_id"] == last["_id"]
+                    continue
+                if message["namespace"] and message["origin"] != self.origin:
+                    self._apply(message["namespace"], message.get("ids"))
+            if not caught_up:
+                # The collection wrapped past our starting point, so the
+                # messages skipped may include new ones; resynchronize
+                raise RuntimeError("Invalidation bus position was overwritten")
+            await asyncio.sleep(0)
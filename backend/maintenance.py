@@ -0,0 +1,36 @@
+"""
+Maintenance commands for data derived from the primary collections.
+
+Usage: python maintenance.py rebuild-stats
+       python maintenance.py rebuild-availability
+"""
+from motor.motor_asyncio import AsyncIOMotorClient
+from dotenv import load_dotenv
+from pathlib import Path
+import argparse
+import asyncio
+import logging
+import os
+
+from database import DatabaseService, rebuild_availability, rebuild_lead_stats
+
+COMMANDS = {
+    "rebuild-stats": rebuild_lead_stats,
+    "rebuild-availability": rebuild_availability,
+}
+
+
+async def main(command: str):
+    load_dotenv(Path(__file__).parent / '.env')
+    client = AsyncIOMotorClient(os.environ['MONGO_URL'])
+    try:
+        await COMMANDS[command](DatabaseService(client[os.environ['DB_NAME']]))
+    finally:
+        client.close()
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("command", choices=sorted(COMMANDS))
+    asyncio.run(main(parser.parse_args().command))
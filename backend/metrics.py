@@ -0,0 +1,173 @@
+from typing import Dict, Optional, Tuple
+from pymongo import monitoring
+from prometheus_client import CONTENT_TYPE_LATEST, CollectorRegistry, Counter, Gauge, Histogram, generate_latest, multiprocess
+from starlette.responses import Response
+import os
+import threading
+import time
+
+# With several uvicorn / gunicorn workers each process keeps its own metrics
+# and a scrape reaches only one of them. Setting PROMETHEUS_MULTIPROC_DIR (an
+# empty directory shared by the workers, set before they start) makes every
+# worker write its samples there and /metrics aggregate all of them.
+MULTIPROC_DIR = os.environ.get('PROMETHEUS_MULTIPROC_DIR')
+
+HTTP_REQUESTS = Counter(
+    "http_requests_total", "HTTP requests", ["method", "route", "status"],
+)
+HTTP_LATENCY = Histogram(
+    "http_request_duration_seconds", "HTTP request latency", ["method", "route", "status"],
+    buckets=(0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10),
+)
+MONGO_COMMAND_LATENCY = Histogram(
+    "mongodb_command_duration_seconds", "MongoDB command latency", ["collection", "command", "outcome"],
+    buckets=(0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5),
+)
+MONGO_POOL_WAIT = Histogram(
+    "mongodb_pool_checkout_wait_seconds", "Time spent waiting for a pooled connection", ["pool", "outcome"],
+    buckets=(0.0001, 0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1, 5),
+)
+MONGO_POOL_IN_USE = Gauge(
+    "mongodb_pool_connections_in_use", "Connections checked out of the pool", ["pool"], multiprocess_mode="livesum",
+)
+MONGO_POOL_WAITING = Gauge(
+    "mongodb_pool_checkouts_waiting", "Operations waiting for a pooled connection", ["pool"], multiprocess_mode="livesum",
+)
+MONGO_POOL_MAX = Gauge(
+    "mongodb_pool_max_connections", "Configured maxPoolSize (per server, summed over workers)", ["pool"], multiprocess_mode="livesum",
+)
+
+
+class CommandMetrics(monitoring.CommandListener):
+    """Records the duration of every MongoDB command per collection and command name."""
+
+    def __init__(self):
+        self._pending: Dict[Tuple[int, object], Tuple[str, str]] = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _collection(event: monitoring.CommandStartedEvent) -> str:
+        target = event.command.get(event.command_name)
+        if event.command_name == "getMore":
+            target = event.command.get("collection")
+        return target if isinstance(target, str) else ""
+
+    def started(self, event):
+        with self._lock:
+            self._pending[(event.request_id, event.connection_id)] = (self._collection(event), event.command_name)
+
+    def _finish(self, event, outcome: str):
+        with self._lock:
+            labels = self._pending.pop((event.request_id, event.connection_id), None)
+        if labels is not None:
+            MONGO_COMMAND_LATENCY.labels(labels[0], labels[1], outcome).observe(event.duration_micros / 1e6)
+
+    def succeeded(self, event):
+        self._finish(event, "success")
+
+    def failed(self, event):
+        self._finish(event, "failure")
+
+
+class PoolMetrics(monitoring.ConnectionPoolListener):
+    """Records connection checkout wait time and connections in use for one client.
+
+    ``pool`` names the route class the client serves (primary, public_read),
+    so saturation shows up per class.
+    """
+
+    def __init__(self, pool: str = "primary", max_size: Optional[int] = None):
+        self.pool = pool
+        if max_size is not None:
+            MONGO_POOL_MAX.labels(pool).set(max_size)
+        # Checkout happens synchronously on the calling thread, so the start
+        # time can be carried in a thread local between the two events.
+        self._local = threading.local()
+
+    def connection_check_out_started(self, event):
+        self._local.started = time.perf_counter()
+        MONGO_POOL_WAITING.labels(self.pool).inc()
+
+    def _observe_wait(self, outcome: str):
+        started = getattr(self._local, "started", None)
+        if started is not None:
+            MONGO_POOL_WAIT.labels(self.pool, outcome).observe(time.perf_counter() - started)
+            MONGO_POOL_WAITING.labels(self.pool).dec()
+            self._local.started = None
+
+    def connection_checked_out(self, event):
+        self._observe_wait("success")
+        MONGO_POOL_IN_USE.labels(self.pool).inc()
+
+    def connection_check_out_failed(self, event):
+        self._observe_wait("failure")
+
+    def connection_checked_in(self, event):
+        MONGO_POOL_IN_USE.labels(self.pool).dec()
+
+    def pool_created(self, event):
+        pass
+
+    def pool_ready(self, event):
+        pass
+
+    def pool_cleared(self, event):
+        pass
+
+    def pool_closed(self, event):
+        pass
+
+    def connection_created(self, event):
+        pass
+
+    def connection_ready(self, event):
+        pass
+
+    def connection_closed(self, event):
+        pass
+
+
+class MetricsMiddleware:
+    """ASGI middleware counting requests and latency per route template and status."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status = 500
+        start = time.perf_counter()
+
+        async def send_wrapper(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            # The router stores the matched route in the scope; label by its
+            # template so /portfolio/{item_id} stays a single series.
+            route = scope.get("route")
+            template = getattr(route, "path", None) or "unmatched"
+            labels = (scope["method"], template, str(status))
+            HTTP_REQUESTS.labels(*labels).inc()
+            HTTP_LATENCY.labels(*labels).observe(time.perf_counter() - start)
+
+
+def metrics_response() -> Response:
+    if MULTIPROC_DIR:
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+        return Response(generate_latest(registry), media_type=CONTENT_TYPE_LATEST)
+    return Response(generate_latest(), media_type=CONTENT_TYPE_LATEST)
+
+
+def mark_process_dead() -> None:
+    """Drop this worker's live gauge samples from the multiprocess directory on exit."""
+    if MULTIPROC_DIR:
+        multiprocess.mark_process_dead(os.getpid())
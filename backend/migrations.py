@@ -0,0 +1,107 @@
+from datetime import datetime, timedelta
+from typing import Awaitable, Callable, List, Tuple
+from pymongo import ReturnDocument
+from pymongo.errors import DuplicateKeyError
+import asyncio
+import logging
+import uuid
+
+from database import DatabaseService, rebuild_availability, rebuild_lead_stats, seed_initial_data
+
+logger = logging.getLogger(__name__)
+
+# Ordered (version, name, migration). Append new entries, never reorder or
+# renumber applied ones.
+MIGRATIONS: List[Tuple[int, str, Callable[[DatabaseService], Awaitable[None]]]] = [
+    (1, "seed_initial_data", seed_initial_data),
+    (2, "build_availability_calendar", rebuild_availability),
+    (3, "build_lead_stats", rebuild_lead_stats),
+]
+
+LATEST_VERSION = MIGRATIONS[-1][0]
+LOCK_TTL = timedelta(minutes=5)
+LOCK_POLL_SECONDS = 2.0
+
+
+async def applied_version(db_service: DatabaseService) -> int:
+    state = await db_service.db.migrations.find_one({"_id": "schema"}, {"version": 1})
+    return state["version"] if state else 0
+
+
+async def _acquire_lock(db_service: DatabaseService, owner: str) -> bool:
+    now = datetime.utcnow()
+    try:
+        # Matches only a missing or expired lock; otherwise the upsert collides
+        # with the live lock's _id and raises DuplicateKeyError.
+        lock = await db_service.db.migration_locks.find_one_and_update(
+            {"_id": "migrations", "expires_at": {"$lt": now}},
+            {"$set": {"owner": owner, "expires_at": now + LOCK_TTL}},
+            upsert=True,
+            return_document=ReturnDocument.AFTER,
+        )
+    except DuplicateKeyError:
+        return False
+    return lock is not None and lock.get("owner") == owner
+
+
+async def _renew_lock(db_service: DatabaseService, owner: str) -> bool:
+    result = await db_service.db.migration_locks.update_one(
+        {"_id": "migrations", "owner": owner},
+        {"$set": {"expires_at": datetime.utcnow() + LOCK_TTL}},
+    )
+    return result.matched_count > 0
+
+
+async def _keep_lock(db_service: DatabaseService, owner: str) -> None:
+    """Renew the lock well before it expires while a long migration runs."""
+    while True:
+        await asyncio.sleep(LOCK_TTL.total_seconds() / 3)
+        try:
+            await _renew_lock(db_service, owner)
+        except Exception as e:
+            logger.error(f"Failed to renew migration lock: {e}")
+
+
+async def _release_lock(db_service: DatabaseService, owner: str) -> None:
+    await db_service.db.migration_locks.delete_one({"_id": "migrations", "owner": owner})
+
+
+async def run_migrations(db_service: DatabaseService) -> None:
+    """Apply pending migrations once across all workers.
+
+    When everything is applied this is a single lookup by _id. Otherwise one
+    worker takes the Mongo-backed lock and applies the pending migrations in
+    order while the others poll until the schema version catches up.
+    """
+    owner = str(uuid.uuid4())
+    while True:
+        version = await applied_version(db_service)
+        if version >= LATEST_VERSION:
+            return
+        if await _acquire_lock(db_service, owner):
+            break
+        await asyncio.sleep(LOCK_POLL_SECONDS)
+
+    heartbeat = asyncio.create_task(_keep_lock(db_service, owner))
+    try:
+        # Re-read under the lock: another worker may have finished meanwhile
+        version = await applied_version(db_service)
+        for number, name, migration in MIGRATIONS:
+            if number <= version:
+                continue
+            if not await _renew_lock(db_service, owner):
+                raise RuntimeError("Migration lock was lost to another worker")
+            logger.info(f"Applying migration {number}: {name}")
+            await migration(db_service)
+            await db_service.db.migrations.update_one(
+                {"_id": "schema"},
+                {
+                    "$set": {"version": number},
+                    "$push": {"history": {"version": number, "name": name, "applied_at": datetime.utcnow()}},
+                },
+                upsert=True,
+            )
+    finally:
+        heartbeat.cancel()
+        await asyncio.gather(heartbeat, return_exceptions=True)
+        await _release_lock(db_service, owner)
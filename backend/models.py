@@ -4,8 +4,16 @@ from datetime import datetime
 import uuid
 
 
+# Documents updated with optimistic concurrency. ``version`` is bumped by
+# every update; PUT/PATCH responses send it as the ETag and If-Match takes
+# it back. The ETags of GET responses are content hashes, only meant for
+# If-None-Match revalidation.
+class VersionedModel(BaseModel):
+    version: int = 1
+
+
 # Portfolio Models
-class PortfolioItem(BaseModel):
+class PortfolioItem(VersionedModel):
     id: str = Field(default_factory=lambda: str(uuid.uuid4()))
     title: str
     title_en: Optional[str] = None
@@ -38,9 +46,24 @@ class PortfolioItemUpdate(BaseModel):
     featured: Optional[bool] = None
     order: Optional[int] = None
 
+class PortfolioItemBulkUpdate(PortfolioItemUpdate):
+    id: str
+
+# Larger bulk requests are rejected with 422 instead of tying up a worker
+MAX_BULK_ITEMS = 500
+
+class BulkRequest(BaseModel):
+    # Items are validated one by one so every item gets its own result
+    items: List[Dict[str, Any]] = Field(..., max_length=MAX_BULK_ITEMS)
+    ordered: bool = True
+
+class BulkDeleteRequest(BaseModel):
+    ids: List[str] = Field(..., max_length=MAX_BULK_ITEMS)
+    ordered: bool = True
+
 
 # Services Models
-class Service(BaseModel):
+class Service(VersionedModel):
     id: str = Field(default_factory=lambda: str(uuid.uuid4()))
     name: str
     name_en: Optional[str] = None
@@ -84,7 +107,7 @@ class ServiceUpdate(BaseModel):
 
 
 # Testimonials Models
-class Testimonial(BaseModel):
+class Testimonial(VersionedModel):
     id: str = Field(default_factory=lambda: str(uuid.uuid4()))
     name: str
     name_en: Optional[str] = None
@@ -122,7 +145,7 @@ class TestimonialUpdate(BaseModel):
 
 
 # Contact & Booking Models
-class ContactMessage(BaseModel):
+class ContactMessage(VersionedModel):
     id: str = Field(default_factory=lambda: str(uuid.uuid4()))
     name: str
     phone: str
@@ -142,7 +165,7 @@ class ContactMessageCreate(BaseModel):
     event_date: Optional[str] = None  # Frontend sends as string
     message: Optional[str] = None
 
-class BookingRequest(BaseModel):
+class BookingRequest(VersionedModel):
     id: str = Field(default_factory=lambda: str(uuid.uuid4()))
     name: str
     phone: str
@@ -189,6 +212,9 @@ class SettingCreate(BaseModel):
 class SettingUpdate(BaseModel):
     value: Dict[str, Any]
 
+class SettingsBatchUpdate(BaseModel):
+    values: Dict[str, Dict[str, Any]]
+
 
 # Response Models
 class MessageResponse(BaseModel):
@@ -0,0 +1,288 @@
+from contextvars import ContextVar
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+from pymongo import monitoring
+import asyncio
+import functools
+import inspect
+import json
+import logging
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+# Commands that accept explain(); getMore and writes of new documents do not
+EXPLAINABLE = {"find", "aggregate", "count", "distinct", "update", "delete", "findAndModify"}
+# Session and routing fields the driver adds that explain must not carry
+DRIVER_FIELDS = {"lsid", "txnNumber", "autocommit", "startTransaction", "readConcern", "writeConcern"}
+EXPLAIN_INTERVAL = 300.0
+EXAMINED_RATIO = 10
+EXAMINED_MIN = 100
+MAX_SHAPES = 500
+
+# Name of the DatabaseService method a command was issued from. Motor runs
+# commands on its executor with a copy of the caller's context, so listener
+# callbacks can read it.
+current_call: ContextVar[Optional[str]] = ContextVar("current_call", default=None)
+
+
+def query_shape(value: Any) -> Any:
+    """Replace literal values with '?' so queries differing only in values group together."""
+    if isinstance(value, dict):
+        return {k: query_shape(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        shapes = []
+        for item in value:
+            shape = query_shape(item)
+            if shape not in shapes:
+                shapes.append(shape)
+        return shapes
+    return "?"
+
+
+def command_shape(name: str, command: dict) -> dict:
+    if name == "aggregate":
+        stages = []
+        for stage in command.get("pipeline", []):
+            op, spec = next(iter(stage.items()))
+            stages.append({op: query_shape(spec) if op == "$match" else spec if op == "$sort" else "?"})
+        return {"pipeline": stages}
+    if name in ("update", "delete"):
+        key = "updates" if name == "update" else "deletes"
+        statements = command.get(key) or [{}]
+        return {"filter": query_shape(statements[0].get("q", {}))}
+    if name == "distinct":
+        return {"key": command.get("key"), "filter": query_shape(command.get("query", {}))}
+    filter_ = command.get("filter", command.get("query", {}))
+    shape = {"filter": query_shape(filter_ or {})}
+    if command.get("sort"):
+        shape["sort"] = dict(command["sort"])
+    return shape
+
+
+def explainable_command(name: str, command: dict) -> dict:
+    """The command stripped of driver fields, reduced to one statement for writes."""
+    explained = {k: v for k, v in command.items() if not k.startswith("$") and k not in DRIVER_FIELDS}
+    if name == "update":
+        explained["updates"] = explained["updates"][:1]
+    elif name == "delete":
+        explained["deletes"] = explained["deletes"][:1]
+    return explained
+
+
+def _plan_stages(plan: Optional[dict]) -> List[str]:
+    stages = []
+    while plan:
+        if "queryPlan" in plan:  # slot based engine wraps the classic plan
+            plan = plan["queryPlan"]
+            continue
+        stages.append(plan.get("stage", "?"))
+        for child in plan.get("inputStages", []):
+            stages.extend(_plan_stages(child))
+        plan = plan.get("inputStage")
+    return stages
+
+
+def analyze_explain(explain: dict) -> dict:
+    """Summarise an executionStats explain: plan stages, indexes, counters and flags."""
+    planner = explain.get("queryPlanner")
+    stats = explain.get("executionStats", {})
+    for stage in explain.get("stages", []):  # aggregate explain
+        cursor = stage.get("$cursor")
+        if cursor:
+            planner = cursor.get("queryPlanner", planner)
+            stats = cursor.get("executionStats", stats)
+            break
+    stages = _plan_stages((planner or {}).get("winningPlan"))
+
+    examined = stats.get("totalDocsExamined", 0)
+    returned = stats.get("nReturned", 0)
+    flags = []
+    if "COLLSCAN" in stages:
+        flags.append("COLLSCAN")
+    if "SORT" in stages:
+        flags.append("IN_MEMORY_SORT")
+    if examined >= EXAMINED_MIN and examined > max(returned, 1) * EXAMINED_RATIO:
+        flags.append("HIGH_EXAMINED_RATIO")
+    return {
+        "plan": stages,
+        "docs_examined": examined,
+        "keys_examined": stats.get("totalKeysExamined", 0),
+        "returned": returned,
+        "execution_ms": stats.get("executionTimeMillis"),
+        "flags": flags,
+    }
+
+
+class QueryProfiler(monitoring.CommandListener):
+    """Opt-in profiler for DatabaseService.
+
+    ``instrument`` times every public DatabaseService coroutine. As a
+    command listener it groups MongoDB commands by query shape, and any
+    command slower than ``slow_ms`` has its explain(executionStats) run in
+    the background (at most once per shape every EXPLAIN_INTERVAL seconds)
+    and logged with COLLSCAN / in-memory SORT / examined-ratio flags.
+    """
+
+    def __init__(self, slow_ms: float = 100.0, explain: bool = True):
+        self.slow_ms = slow_ms
+        self.explain = explain
+        self.started_at = datetime.utcnow()
+        self._pending: Dict[Tuple[int, object], tuple] = {}
+        self._shapes: Dict[str, dict] = {}
+        self._calls: Dict[str, dict] = {}
+        self._lock = threading.Lock()
+        self._client = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._queue: Optional[asyncio.Queue] = None
+        self._task: Optional[asyncio.Task] = None
+
+    def instrument(self, service) -> None:
+        """Wrap the public coroutine methods of ``service`` with timing."""
+        for name, method in inspect.getmembers(service, inspect.iscoroutinefunction):
+            if not name.startswith("_"):
+                setattr(service, name, self._timed(f"{type(service).__name__}.{name}", method))
+
+    def _timed(self, label: str, method):
+        @functools.wraps(method)
+        async def wrapper(*args, **kwargs):
+            token = current_call.set(label)
+            start = time.perf_counter()
+            try:
+                return await method(*args, **kwargs)
+            finally:
+                current_call.reset(token)
+                self._record_call(label, (time.perf_counter() - start) * 1000)
+        return wrapper
+
+    def _record_call(self, label: str, elapsed_ms: float) -> None:
+        with self._lock:
+            stats = self._calls.setdefault(label, {"method": label, "count": 0, "slow": 0, "total_ms": 0.0, "max_ms": 0.0})
+            stats["count"] += 1
+            stats["total_ms"] += elapsed_ms
+            stats["max_ms"] = max(stats["max_ms"], elapsed_ms)
+            if elapsed_ms >= self.slow_ms:
+                stats["slow"] += 1
+
+    async def start(self, client) -> None:
+        self._client = client
+        self._loop = asyncio.get_running_loop()
+        if self.explain:
+            self._queue = asyncio.Queue(maxsize=100)
+            self._task = asyncio.create_task(self._explain_loop())
+        logger.info(f"Query profiling enabled, slow threshold {self.slow_ms} ms")
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    # CommandListener callbacks run on Motor's executor threads
+
+    def started(self, event):
+        if event.command_name not in EXPLAINABLE:
+            return
+        target = event.command.get(event.command_name)
+        with self._lock:
+            self._pending[(event.request_id, event.connection_id)] = (
+                target if isinstance(target, str) else "", event.database_name, dict(event.command), current_call.get(),
+            )
+
+    def succeeded(self, event):
+        with self._lock:
+            pending = self._pending.pop((event.request_id, event.connection_id), None)
+        if pending is not None:
+            self._record_command(event.command_name, pending, event.duration_micros / 1000)
+
+    def failed(self, event):
+        with self._lock:
+            self._pending.pop((event.request_id, event.connection_id), None)
+
+    def _record_command(self, name: str, pending: tuple, elapsed_ms: float) -> None:
+        collection, database, command, call = pending
+        shape = command_shape(name, command)
+        key = json.dumps([collection, name, shape], default=str)
+        now = time.time()
+        with self._lock:
+            stats = self._shapes.get(key)
+            if stats is None:
+                if len(self._shapes) >= MAX_SHAPES:
+                    del self._shapes[min(self._shapes, key=lambda k: self._shapes[k]["total_ms"])]
+                stats = self._shapes[key] = {
+                    "collection": collection, "command": name, "shape": shape, "calls": [],
+                    "count": 0, "slow": 0, "total_ms": 0.0, "max_ms": 0.0,
+                    "last_seen": None, "explain": None, "explained_at": 0.0,
+                }
+            stats["count"] += 1
+            stats["total_ms"] += elapsed_ms
+            stats["max_ms"] = max(stats["max_ms"], elapsed_ms)
+            stats["last_seen"] = now
+            if call and call not in stats["calls"]:
+                stats["calls"].append(call)
+            slow = elapsed_ms >= self.slow_ms
+            if slow:
+                stats["slow"] += 1
+            needs_explain = slow and self._queue is not None and now - stats["explained_at"] >= EXPLAIN_INTERVAL
+            if needs_explain:
+                stats["explained_at"] = now
+
+        if slow:
+            logger.warning(f"Slow query {elapsed_ms:.1f} ms on {collection}.{name} from {call or 'unknown'}: {shape}")
+        if needs_explain:
+            self._loop.call_soon_threadsafe(self._enqueue, key, database, name, command)
+
+    def _enqueue(self, key: str, database: str, name: str, command: dict) -> None:
+        try:
+            self._queue.put_nowait((key, database, name, command))
+        except asyncio.QueueFull:
+            with self._lock:
+                self._shapes[key]["explained_at"] = 0.0
+
+    async def _explain_loop(self) -> None:
+        while True:
+            key, database, name, command = await self._queue.get()
+            try:
+                explain = await self._client[database].command(
+                    "explain", explainable_command(name, command), verbosity="executionStats",
+                )
+                summary = analyze_explain(explain)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Error explaining slow query: {e}")
+                continue
+            with self._lock:
+                stats = self._shapes.get(key)
+                if stats is not None:
+                    stats["explain"] = summary
+            level = logging.WARNING if summary["flags"] else logging.INFO
+            logger.log(level, f"Explain for {key}: plan {summary['plan']}, examined "
+                              f"{summary['docs_examined']} docs for {summary['returned']} returned, "
+                              f"flags {summary['flags'] or 'none'}")
+
+    def report(self, limit: int = 20, sort: str = "total_ms") -> dict:
+        """Top-N query shapes and DatabaseService methods ordered by ``sort``."""
+        with self._lock:
+            shapes = [dict(stats) for stats in self._shapes.values()]
+            calls = [dict(stats) for stats in self._calls.values()]
+        for stats in shapes + calls:
+            stats["mean_ms"] = round(stats["total_ms"] / stats["count"], 2)
+            stats["total_ms"] = round(stats["total_ms"], 2)
+            stats["max_ms"] = round(stats["max_ms"], 2)
+        for stats in shapes:
+            stats.pop("explained_at")
+            stats["last_seen"] = datetime.utcfromtimestamp(stats["last_seen"])
+        return {
+            "since": self.started_at,
+            "slow_ms": self.slow_ms,
+            "queries": sorted(shapes, key=lambda s: s[sort], reverse=True)[:limit],
+            "methods": sorted(calls, key=lambda s: s[sort], reverse=True)[:limit],
+        }
+
+    def reset(self) -> None:
+        with self._lock:
+            self._shapes.clear()
+            self._calls.clear()
+        self.started_at = datetime.utcnow()
@@ -0,0 +1,114 @@
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple
+from fastapi import HTTPException, Request
+import math
+import os
+import time
+
+# Per-route limits as "requests/seconds", overridable with
+# RATE_LIMIT_<ROUTE> (per client IP) and RATE_LIMIT_<ROUTE>_GLOBAL.
+DEFAULT_LIMITS: Dict[str, Tuple[str, str]] = {
+    "contact": ("5/60", "20/1"),
+    "booking": ("5/60", "20/1"),
+    "testimonials": ("3/60", "10/1"),
+}
+
+# Number of our own proxies / CDN hops in front of the app whose
+# X-Forwarded-For entries are trusted ("true" / "yes" mean one, unset none)
+def _trusted_hops(value: str) -> int:
+    if value.lower() in ('true', 'yes'):
+        return 1
+    return int(value) if value.isdigit() else 0
+
+
+TRUSTED_PROXY_HOPS = _trusted_hops(os.environ.get('RATE_LIMIT_TRUST_PROXY', ''))
+MAX_TRACKED_CLIENTS = 10000
+
+
+def parse_limit(spec: str) -> Tuple[float, float]:
+    """'5/60' -> (refill rate in tokens per second, burst capacity)."""
+    count, seconds = spec.split("/")
+    return float(count) / float(seconds), float(count)
+
+
+class TokenBucket:
+    __slots__ = ("rate", "capacity", "tokens", "updated")
+
+    def __init__(self, rate: float, capacity: float, now: float):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = now
+
+    def refill(self, now: float) -> None:
+        self.tokens = min(self.capacity, self.tokens + max(0.0, now - self.updated) * self.rate)
+        self.updated = now
+
+    def wait_time(self) -> float:
+        """Seconds until one token is available (0 when one is available now)."""
+        return 0.0 if self.tokens >= 1 else (1 - self.tokens) / self.rate
+
+
+class RateLimiter:
+    """A global token bucket plus one bucket per client, both must admit a request."""
+
+    def __init__(self, client_limit: str, global_limit: str, max_clients: int = MAX_TRACKED_CLIENTS):
+        self.client_rate, self.client_capacity = parse_limit(client_limit)
+        global_rate, global_capacity = parse_limit(global_limit)
+        self.global_bucket = TokenBucket(global_rate, global_capacity, time.monotonic())
+        self.max_clients = max_clients
+        self._clients: "OrderedDict[str, TokenBucket]" = OrderedDict()
+
+    def acquire(self, client: str, now: Optional[float] = None) -> float:
+        """Take a token for ``client``; returns 0 if admitted, else seconds to wait."""
+        now = time.monotonic() if now is None else now
+        bucket = self._clients.get(client)
+        if bucket is None:
+            bucket = self._clients[client] = TokenBucket(self.client_rate, self.client_capacity, now)
+            # Idle clients fall off the end; a returning one starts with a full bucket
+            if len(self._clients) > self.max_clients:
+                self._clients.popitem(last=False)
+        else:
+            self._clients.move_to_end(client)
+            bucket.refill(now)
+        self.global_bucket.refill(now)
+
+        wait = max(bucket.wait_time(), self.global_bucket.wait_time())
+        if wait > 0:
+            return wait
+        bucket.tokens -= 1
+        self.global_bucket.tokens -= 1
+        return 0.0
+
+
+def client_address(request: Request) -> str:
+    if TRUSTED_PROXY_HOPS:
+        # Each proxy appends the address it received the request from, so
+        # only the last TRUSTED_PROXY_HOPS entries were written by us; the
+        # leftmost ones are whatever the client chose to send.
+        forwarded = [part.strip() for part in request.headers.get("x-forwarded-for", "").split(",") if part.strip()]
+        if forwarded:
+            return forwarded[-min(TRUSTED_PROXY_HOPS, len(forwarded))]
+    return request.client.host if request.client else "unknown"
+
+
+def rate_limit(route: str):
+    """FastAPI dependency enforcing the configured limits for ``route``."""
+    client_default, global_default = DEFAULT_LIMITS[route]
+    env_name = f"RATE_LIMIT_{route.upper()}"
+    limiter = RateLimiter(
+        os.environ.get(env_name, client_default),
+        os.environ.get(f"{env_name}_GLOBAL", global_default),
+    )
+
+    async def dependency(request: Request):
+        wait = limiter.acquire(client_address(request))
+        if wait > 0:
+            raise HTTPException(
+                status_code=429,
+                detail="Too many requests, please try again later",
+                headers={"Retry-After": str(math.ceil(wait))},
+            )
+
+    dependency.limiter = limiter
+    return dependency
@@ -0,0 +1,145 @@
+from fastapi import Request, Response
+from typing import Any, Awaitable, Callable, Dict, Iterable, Optional
+import hashlib
+import os
+
+import orjson
+
+from cache import TTLCache
+from compression import MIN_COMPRESS_BYTES, compress, negotiate
+
+
+# Cache-Control for public GETs; browsers and the CDN revalidate with the ETag
+# once max-age has passed and may serve stale content while doing so.
+PUBLIC_CACHE_MAX_AGE = int(os.environ.get('PUBLIC_CACHE_MAX_AGE', '60'))
+PUBLIC_CACHE_SWR = int(os.environ.get('PUBLIC_CACHE_SWR', '300'))
+
+
+def public_cache_control() -> str:
+    return f"public, max-age={PUBLIC_CACHE_MAX_AGE}, stale-while-revalidate={PUBLIC_CACHE_SWR}"
+
+
+def make_etag(body: bytes) -> str:
+    return '"' + hashlib.sha256(body).hexdigest()[:32] + '"'
+
+
+def etag_matches(request: Request, etag: str) -> bool:
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    # If-None-Match uses the weak comparison function (RFC 9110 13.1.2)
+    candidates = (tag.strip() for tag in header.split(","))
+    return any(tag.removeprefix("W/") == etag for tag in candidates)
+
+
+def encode_json(payload: Any) -> bytes:
+    # orjson renders naive datetimes and non-ASCII text exactly like
+    # FastAPI's JSONResponse, so clients see the same bytes as before.
+    return orjson.dumps(payload)
+
+
+def localize(value: Any, lang: Optional[str]) -> Any:
+    """Keep one language of bilingual ``field`` / ``field_en`` pairs.
+
+    ``he`` drops the ``*_en`` fields; ``en`` drops the Hebrew field of every
+    pair whose English value is present. Returns new containers, so shared
+    cached documents are never modified.
+    """
+    if lang is None:
+        return value
+    if isinstance(value, list):
+        return [localize(item, lang) for item in value]
+    if not isinstance(value, dict):
+        return value
+
+    localized = {}
+    for key, item in value.items():
+        if lang == "he" and key.endswith("_en"):
+            continue
+        if lang == "en" and value.get(f"{key}_en") is not None:
+            continue
+        localized[key] = localize(item, lang)
+    return localized
+
+
+class Snapshot:
+    """A response body encoded once, together with its ETag.
+
+    Compressed variants are produced on first request for each encoding and
+    kept on the snapshot, so a cached snapshot is compressed only once.
+    """
+
+    __slots__ = ("body", "etag", "compressed")
+
+    def __init__(self, body: bytes):
+        self.body = body
+        self.etag = make_etag(body)
+        self.compressed: Dict[str, bytes] = {}
+
+    @classmethod
+    def of(cls, payload: Any) -> "Snapshot":
+        return cls(encode_json(payload))
+
+    def encoded(self, encoding: str, cached: bool = True) -> bytes:
+        """The body in ``encoding``; ``cached=False`` for a snapshot used once."""
+        body = self.compressed.get(encoding)
+        if body is None:
+            body = self.compressed[encoding] = compress(self.body, encoding, cached=cached)
+        return body
+
+
+def snapshot_response(request: Request, snapshot: Snapshot, cached: bool = True) -> Response:
+    encoding = None
+    if len(snapshot.body) >= MIN_COMPRESS_BYTES:
+        encoding = negotiate(request.headers.get("accept-encoding"))
+    # Each encoding is a different representation and needs its own ETag
+    etag = snapshot.etag if encoding is None else f'{snapshot.etag[:-1]}-{encoding}"'
+    headers = {"ETag": etag, "Cache-Control": public_cache_control(), "Vary": "Accept-Encoding"}
+    if etag_matches(request, etag):
+        return Response(status_code=304, headers=headers)
+    if encoding is None:
+        return Response(content=snapshot.body, media_type="application/json", headers=headers)
+    headers["Content-Encoding"] = encoding
+    return Response(content=snapshot.encoded(encoding, cached), media_type="application/json", headers=headers)
+
+
+def conditional_json(request: Request, payload: Any) -> Response:
+    """Render ``payload`` as JSON with an ETag, answering 304 on a match."""
+    # Built per request, so the slower cached-snapshot quality would not pay off
+    return snapshot_response(request, Snapshot.of(payload), cached=False)
+
+
+async def cached_response(
+    request: Request,
+    cache: TTLCache,
+    key: tuple,
+    loader: Callable[[], Awaitable[Any]],
+    tags: Optional[Iterable[str]] = None,
+) -> Response:
+    """Serve ``{"success": True, "data": ...}`` from a pre-encoded snapshot.
+
+    The snapshot lives in the catalog cache under the same namespaces as the
+    data it was built from, so the writes that invalidate the data also drop
+    the encoded body.
+    """
+    async def payload():
+        return {"success": True, "data": await loader()}
+
+    return await cached_payload_response(request, cache, key, payload, tags)
+
+
+async def cached_payload_response(
+    request: Request,
+    cache: TTLCache,
+    key: tuple,
+    loader: Callable[[], Awaitable[Any]],
+    tags: Optional[Iterable[str]] = None,
+) -> Response:
+    """Like cached_response, for a loader that builds the whole response body."""
+    async def build():
+        return Snapshot.of(await loader())
+
+    snapshot = await cache.get_or_load(key, build, tags=tags)
+    return snapshot_response(request, snapshot)
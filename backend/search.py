@@ -0,0 +1,159 @@
+from bisect import bisect_left, insort
+from collections import defaultdict
+from typing import Dict, List, Optional, Set, Tuple
+import math
+import re
+import unicodedata
+
+# Indexed fields and their weight per searchable collection
+SEARCH_FIELDS: Dict[str, Dict[str, float]] = {
+    "portfolio": {
+        "title": 3, "title_en": 3, "category": 2, "description": 1, "description_en": 1,
+    },
+    "services": {
+        "name": 3, "name_en": 3, "description": 1, "description_en": 1,
+        "duration": 0.5, "duration_en": 0.5, "includes": 1, "includes_en": 1,
+    },
+    "testimonials": {
+        "name": 2, "name_en": 2, "event": 2, "event_en": 2, "text": 1, "text_en": 1,
+    },
+}
+
+# Only what the public endpoints show is searchable
+VISIBLE = {
+    "services": lambda doc: doc.get("active", True),
+    "testimonials": lambda doc: doc.get("approved", False),
+}
+
+FINAL_LETTERS = str.maketrans("ךםןףץ", "כמנפצ")
+# One-letter Hebrew prefixes (and, the, in, to, from, that, as)
+HEBREW_PREFIXES = "והבלמשכ"
+HEBREW_LETTER = re.compile(r"[א-ת]")
+TOKEN = re.compile(r"\w+")
+PREFIX_MATCH_WEIGHT = 0.5
+STRIPPED_PREFIX_WEIGHT = 0.6
+
+DocKey = Tuple[str, str]
+
+
+def normalize(text: str) -> str:
+    """Lowercase, drop niqqud / cantillation / accents and fold Hebrew final letters."""
+    decomposed = unicodedata.normalize("NFKD", text)
+    stripped = "".join(ch for ch in decomposed if unicodedata.category(ch) != "Mn")
+    return stripped.lower().translate(FINAL_LETTERS)
+
+
+def tokenize(text: str) -> List[str]:
+    # Geresh and quotes inside words (צ'ק, בע"מ) are dropped rather than splitting
+    return TOKEN.findall(re.sub(r"[\"'׳״]", "", normalize(text)))
+
+
+def _field_text(value) -> str:
+    if isinstance(value, (list, tuple)):
+        return " ".join(str(v) for v in value if v)
+    return str(value) if value else ""
+
+
+class SearchIndex:
+    """In-memory inverted index over the public catalog.
+
+    Each collection is loaded in full the first time it is searched and
+    kept current with ``update`` as the API writes documents. Collections
+    changed elsewhere (another worker, a bus reconnect) are marked dirty
+    and reloaded by the next search.
+    """
+
+    def __init__(self):
+        self.postings: Dict[str, Dict[DocKey, float]] = defaultdict(dict)
+        self.terms: List[str] = []  # sorted, for prefix lookups
+        self.doc_terms: Dict[DocKey, Set[str]] = {}
+        self.docs: Dict[DocKey, dict] = {}
+        self.dirty: Set[str] = set(SEARCH_FIELDS)
+        self.generation: Dict[str, int] = {collection: 0 for collection in SEARCH_FIELDS}
+
+    def mark_dirty(self, collection: str) -> None:
+        if collection in SEARCH_FIELDS:
+            self.dirty.add(collection)
+            self.generation[collection] += 1
+
+    def load(self, collection: str, docs: List[dict], generation: int) -> None:
+        """Replace ``collection`` with ``docs`` read while at ``generation``."""
+        for key in [key for key in self.docs if key[0] == collection]:
+            self._remove(key)
+        for doc in docs:
+            self._add(collection, doc)
+        if self.generation[collection] == generation:
+            self.dirty.discard(collection)
+
+    def update(self, collection: str, ids: List[str], docs: List[dict]) -> None:
+        """Reindex ``ids`` from their current ``docs``; ids without a doc were deleted."""
+        for item_id in ids:
+            self._remove((collection, item_id))
+        for doc in docs:
+            self._add(collection, doc)
+
+    def _add(self, collection: str, doc: dict) -> None:
+        if "id" not in doc or not VISIBLE.get(collection, lambda d: True)(doc):
+            return
+        key = (collection, doc["id"])
+        weights: Dict[str, float] = defaultdict(float)
+        for field, weight in SEARCH_FIELDS[collection].items():
+            for token in tokenize(_field_text(doc.get(field))):
+                weights[token] += weight
+                # Index בכותל under כותל as well so the bare word matches
+                if len(token) >= 4 and token[0] in HEBREW_PREFIXES and HEBREW_LETTER.match(token[1]):
+                    weights[token[1:]] += weight * STRIPPED_PREFIX_WEIGHT
+        for term, weight in weights.items():
+            postings = self.postings[term]
+            if not postings:
+                insort(self.terms, term)
+            postings[key] = weight
+        self.doc_terms[key] = set(weights)
+        self.docs[key] = doc
+
+    def _remove(self, key: DocKey) -> None:
+        for term in self.doc_terms.pop(key, ()):
+            postings = self.postings[term]
+            postings.pop(key, None)
+            if not postings:
+                del self.postings[term]
+                self.terms.pop(bisect_left(self.terms, term))
+        self.docs.pop(key, None)
+
+    def _matches(self, token: str) -> Dict[DocKey, float]:
+        """Score per document for one query token: exact term plus prefix matches."""
+        total = len(self.docs) or 1
+        scores: Dict[DocKey, float] = defaultdict(float)
+        index = bisect_left(self.terms, token)
+        while index < len(self.terms) and self.terms[index].startswith(token):
+            term = self.terms[index]
+            postings = self.postings[term]
+            idf = math.log(1 + total / len(postings))
+            factor = idf if term == token else idf * PREFIX_MATCH_WEIGHT
+            for key, weight in postings.items():
+                scores[key] = max(scores[key], weight * factor)
+            index += 1
+        return scores
+
+    def search(self, query: str, collections: Optional[List[str]] = None, limit: int = 20) -> List[dict]:
+        """Documents matching every query token (as a word or word prefix), best first."""
+        tokens = list(dict.fromkeys(tokenize(query)))
+        if not tokens:
+            return []
+        scores: Optional[Dict[DocKey, float]] = None
+        for token in tokens:
+            matches = self._matches(token)
+            if scores is None:
+                scores = matches
+            else:
+                scores = {key: score + matches[key] for key, score in scores.items() if key in matches}
+            if not scores:
+                return []
+        ranked = sorted(
+            (item for item in scores.items() if collections is None or item[0][0] in collections),
+            key=lambda item: -item[1],
+        )
+        return [
+            {"type": collection, "id": item_id, "score": round(score, 3), "item": self.docs[(collection, item_id)]}
+            for (collection, item_id), score in ranked[:limit]
+        ]
@@ -1,26 +1,96 @@
-from fastapi import FastAPI, APIRouter, HTTPException
-from fastapi.responses import JSONResponse
+from fastapi import FastAPI, APIRouter, Depends, File, Header, HTTPException, Query, Request, Response, UploadFile
+from fastapi.responses import FileResponse, JSONResponse, StreamingResponse
 from dotenv import load_dotenv
 from starlette.middleware.cors import CORSMiddleware
 from motor.motor_asyncio import AsyncIOMotorClient
-from datetime import datetime
+from datetime import datetime, timedelta
+import asyncio
 import os
 import logging
 from pathlib import Path
-from typing import Optional, List
+from typing import Optional, List, Dict
 
 # Import our models and database service
 from models import *
-from database import DatabaseService, seed_initial_data
+from database import DatabaseService, PUBLIC_FIELDS, VersionConflict
+from cache import TTLCache
+from invalidation import InvalidationBus
+from ingestion import IngestionQueueFull, WriteBehindWriter
+from ratelimit import rate_limit
+from compression import CompressionMiddleware
+from metrics import CommandMetrics, MetricsMiddleware, PoolMetrics, mark_process_dead, metrics_response
+from profiling import QueryProfiler
+from indexes import ensure_indexes, verify_indexes
+from migrations import run_migrations
+from images import ImageStore, MAX_IMAGE_BYTES, MEDIA_TYPES, snap_quality, snap_width
+from bulk import finish_bulk, validate_bulk_items
+from exports import BOOKING_COLUMNS, MESSAGE_COLUMNS, csv_stream, ndjson_stream
+from responses import cached_payload_response, cached_response, conditional_json, localize
 
 ROOT_DIR = Path(__file__).parent
 load_dotenv(ROOT_DIR / '.env')
 
 # MongoDB connection
 mongo_url = os.environ['MONGO_URL']
-client = AsyncIOMotorClient(mongo_url)
+query_profiler = None
+if os.environ.get('DB_PROFILING', '') in ('1', 'true', 'yes'):
+    query_profiler = QueryProfiler(
+        slow_ms=float(os.environ.get('DB_SLOW_MS', '100')),
+        explain=os.environ.get('DB_PROFILING_EXPLAIN', '1') in ('1', 'true', 'yes'),
+    )
+profiler_listeners = [query_profiler] if query_profiler is not None else []
+
+# Writes and admin reads go to the primary. Public catalog reads use their own
+# client and pool, secondary-preferred by default, with bounded staleness.
+primary_pool_size = int(os.environ.get('MONGO_PRIMARY_POOL_SIZE', '100'))
+client = AsyncIOMotorClient(
+    mongo_url,
+    maxPoolSize=primary_pool_size,
+    event_listeners=[CommandMetrics(), PoolMetrics("primary", primary_pool_size), *profiler_listeners],
+)
 db = client[os.environ['DB_NAME']]
-db_service = DatabaseService(db)
+
+public_read_preference = os.environ.get('MONGO_PUBLIC_READ_PREFERENCE', 'secondaryPreferred')
+max_staleness = int(os.environ.get('MONGO_MAX_STALENESS_SECONDS', '90'))
+if public_read_preference == 'primary':
+    read_client = client
+    read_db = db
+else:
+    read_pool_size = int(os.environ.get('MONGO_READ_POOL_SIZE', '100'))
+    read_client = AsyncIOMotorClient(
+        os.environ.get('MONGO_READ_URL', mongo_url),
+        readPreference=public_read_preference,
+        maxStalenessSeconds=max_staleness,
+        maxPoolSize=read_pool_size,
+        event_listeners=[CommandMetrics(), PoolMetrics("public_read", read_pool_size), *profiler_listeners],
+    )
+    read_db = read_client[os.environ['DB_NAME']]
+catalog_cache = TTLCache(
+    maxsize=int(os.environ.get('CATALOG_CACHE_SIZE', '256')),
+    ttl=float(os.environ.get('CATALOG_CACHE_TTL', '300')),
+)
+invalidation_bus = InvalidationBus(db, catalog_cache, mode=os.environ.get('CACHE_BUS_MODE', 'auto'))
+write_behind = None
+if os.environ.get('INGESTION_MODE', 'direct') == 'write_behind':
+    write_behind = WriteBehindWriter(
+        db,
+        max_size=int(os.environ.get('INGESTION_QUEUE_SIZE', '1000')),
+        batch_size=int(os.environ.get('INGESTION_BATCH_SIZE', '100')),
+        flush_interval=float(os.environ.get('INGESTION_FLUSH_MS', '200')) / 1000,
+    )
+db_service = DatabaseService(
+    db, cache=catalog_cache, bus=invalidation_bus, write_behind=write_behind,
+    read_db=read_db, read_after_write_window=max_staleness if read_db is not db else 0.0,
+)
+if query_profiler is not None:
+    query_profiler.instrument(db_service)
+
+# Portfolio image originals and resized variants
+image_store = ImageStore(
+    Path(os.environ.get('IMAGE_DIR', ROOT_DIR / 'media')),
+    cache_bytes=int(os.environ.get('IMAGE_CACHE_MB', '512')) * 1024 * 1024,
+    workers=int(os.environ['IMAGE_WORKERS']) if os.environ.get('IMAGE_WORKERS') else None,
+)
 
 # Create the main app without a prefix
 app = FastAPI()
@@ -46,25 +116,148 @@ def parse_date_string(date_str: Optional[str]) -> Optional[datetime]:
         return None
 
 
+def parse_date_range(date_from: Optional[str], date_to: Optional[str]):
+    created_from = parse_date_string(date_from)
+    created_to = parse_date_string(date_to)
+    if (date_from and not created_from) or (date_to and not created_to):
+        raise HTTPException(status_code=400, detail="Invalid date range")
+    return created_from, created_to
+
+
+def parse_fields(fields: Optional[str], collection: str) -> Optional[tuple]:
+    """?fields=a,b -> sorted tuple of known field names (None for all fields)."""
+    if not fields:
+        return None
+    requested = tuple(sorted({field.strip() for field in fields.split(",") if field.strip()}))
+    unknown = [field for field in requested if field not in PUBLIC_FIELDS[collection]]
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown fields: {', '.join(unknown)}")
+    return requested or None
+
+
+def parse_if_match(if_match: Optional[str]) -> Optional[int]:
+    """If-Match: "<version>" -> expected version (None when absent or *).
+
+    If-Match takes a document version (the ETag of a PUT/PATCH response or
+    the ``version`` field), never the content-hash ETag of a GET.
+    """
+    if if_match is None or if_match.strip() == "*":
+        return None
+    tag = if_match.split(",")[0].strip().removeprefix("W/").strip('"')
+    try:
+        return int(tag)
+    except ValueError:
+        raise HTTPException(status_code=412, detail="If-Match does not match a document version")
+
+
+def versioned(response: Response, doc: dict) -> dict:
+    """Expose the document version as the ETag to send back in If-Match."""
+    response.headers["ETag"] = f'"{doc.get("version", 0)}"'
+    return doc
+
+
+def version_conflict(e: VersionConflict) -> HTTPException:
+    return HTTPException(
+        status_code=412,
+        detail=f"Document was modified (current version {e.current})",
+        headers={"ETag": f'"{e.current}"'},
+    )
+
+
+def export_response(docs, columns: List[str], export_format: str, name: str) -> StreamingResponse:
+    if export_format == "csv":
+        body, media_type = csv_stream(docs, columns), "text/csv; charset=utf-8"
+    else:
+        body, media_type = ndjson_stream(docs), "application/x-ndjson"
+    filename = f"{name}-{datetime.utcnow():%Y%m%d-%H%M%S}.{export_format}"
+    return StreamingResponse(body, media_type=media_type,
+                             headers={"Content-Disposition": f'attachment; filename="{filename}"'})
+
+
 # Portfolio endpoints
 @api_router.get("/portfolio")
-async def get_portfolio(category: Optional[str] = None):
+async def get_portfolio(request: Request, category: Optional[str] = None, fields: Optional[str] = None,
+                        lang: Optional[str] = Query(None, pattern="^(he|en)$")):
+    selected = parse_fields(fields, "portfolio")
     try:
-        items = await db_service.get_portfolio_items(category=category)
-        return {"success": True, "data": items}
+        category = category if category and category != "All" else None
+        return await cached_response(
+            request, db_service.cache, ("portfolio", "response", category, selected, lang),
+            lambda: db_service.get_portfolio_items(category=category, fields=selected, lang=lang),
+        )
     except Exception as e:
         logger.error(f"Error fetching portfolio: {e}")
         raise HTTPException(status_code=500, detail="Failed to fetch portfolio items")
 
 @api_router.get("/portfolio/featured")
-async def get_featured_portfolio():
+async def get_featured_portfolio(request: Request, fields: Optional[str] = None,
+                                 lang: Optional[str] = Query(None, pattern="^(he|en)$")):
+    selected = parse_fields(fields, "portfolio")
     try:
-        items = await db_service.get_portfolio_items(featured=True)
-        return {"success": True, "data": items}
+        return await cached_response(
+            request, db_service.cache, ("portfolio", "featured_response", selected, lang),
+            lambda: db_service.get_portfolio_items(featured=True, fields=selected, lang=lang),
+        )
     except Exception as e:
         logger.error(f"Error fetching featured portfolio: {e}")
         raise HTTPException(status_code=500, detail="Failed to fetch featured portfolio items")
 
+@api_router.post("/portfolio/bulk")
+async def bulk_create_portfolio_items(bulk: BulkRequest):
+    try:
+        valid, results = validate_bulk_items(bulk.items, PortfolioItemCreate, bulk.ordered)
+        docs = [item.dict() for _, item in valid]
+        write_errors = await db_service.bulk_create_portfolio_items(docs, ordered=bulk.ordered) if docs else {}
+        ids = {index: doc["id"] for (index, _), doc in zip(valid, docs)}
+        return finish_bulk(results, [index for index, _ in valid], write_errors, bulk.ordered, "created", ids)
+    except Exception as e:
+        logger.error(f"Error bulk creating portfolio items: {e}")
+        raise HTTPException(status_code=500, detail="Failed to create portfolio items")
+
+@api_router.put("/portfolio/bulk")
+async def bulk_update_portfolio_items(bulk: BulkRequest):
+    try:
+        valid, results = validate_bulk_items(bulk.items, PortfolioItemBulkUpdate, bulk.ordered)
+        updates, sent = [], []
+        for index, item in valid:
+            fields = {k: v for k, v in item.dict().items() if v is not None and k != "id"}
+            if not fields:
+                results[index] = {"index": index, "id": item.id, "status": "invalid",
+                                  "errors": [{"msg": "No fields to update"}]}
+                if bulk.ordered:
+                    break
+                continue
+            updates.append((item.id, fields))
+            sent.append(index)
+
+        write_errors, existing = {}, set()
+        if updates:
+            write_errors, existing = await db_service.bulk_update_portfolio_items(updates, ordered=bulk.ordered)
+        ids = {index: item_id for index, (item_id, _) in zip(sent, updates)}
+        missing = {item_id for item_id, _ in updates} - existing
+        return finish_bulk(results, sent, write_errors, bulk.ordered, "updated", ids, missing)
+    except Exception as e:
+        logger.error(f"Error bulk updating portfolio items: {e}")
+        raise HTTPException(status_code=500, detail="Failed to update portfolio items")
+
+@api_router.delete("/portfolio/bulk")
+async def bulk_delete_portfolio_items(bulk: BulkDeleteRequest):
+    try:
+        write_errors, existing = {}, set()
+        if bulk.ids:
+            write_errors, existing = await db_service.bulk_delete_portfolio_items(bulk.ids, ordered=bulk.ordered)
+        ids = dict(enumerate(bulk.ids))
+        missing = set(bulk.ids) - existing
+        # An ordered batch stops at its first error
+        stop = min(write_errors, default=len(bulk.ids)) if bulk.ordered else len(bulk.ids)
+        for index, item_id in ids.items():
+            if index < stop and index not in write_errors and item_id in existing:
+                image_store.delete(item_id)
+        return finish_bulk([None] * len(bulk.ids), list(ids), write_errors, bulk.ordered, "deleted", ids, missing)
+    except Exception as e:
+        logger.error(f"Error bulk deleting portfolio items: {e}")
+        raise HTTPException(status_code=500, detail="Failed to delete portfolio items")
+
 @api_router.post("/portfolio")
 async def create_portfolio_item(item: PortfolioItemCreate):
     try:
@@ -76,19 +269,22 @@ async def create_portfolio_item(item: PortfolioItemCreate):
         raise HTTPException(status_code=500, detail="Failed to create portfolio item")
 
 @api_router.put("/portfolio/{item_id}")
-async def update_portfolio_item(item_id: str, item: PortfolioItemUpdate):
+async def update_portfolio_item(item_id: str, item: PortfolioItemUpdate, response: Response,
+                                if_match: Optional[str] = Header(None)):
     try:
         update_dict = {k: v for k, v in item.dict().items() if v is not None}
         if not update_dict:
             raise HTTPException(status_code=400, detail="No fields to update")
         
-        success = await db_service.update_portfolio_item(item_id, update_dict)
-        if not success:
+        updated = await db_service.update_portfolio_item(item_id, update_dict, parse_if_match(if_match))
+        if not updated:
             raise HTTPException(status_code=404, detail="Portfolio item not found")
         
-        return {"success": True, "message": "Portfolio item updated successfully"}
+        return {"success": True, "message": "Portfolio item updated successfully", "data": versioned(response, updated)}
     except HTTPException:
         raise
+    except VersionConflict as e:
+        raise version_conflict(e)
     except Exception as e:
         logger.error(f"Error updating portfolio item: {e}")
         raise HTTPException(status_code=500, detail="Failed to update portfolio item")
@@ -99,6 +295,7 @@ async def delete_portfolio_item(item_id: str):
         success = await db_service.delete_portfolio_item(item_id)
         if not success:
             raise HTTPException(status_code=404, detail="Portfolio item not found")
+        image_store.delete(item_id)
         
         return {"success": True, "message": "Portfolio item deleted successfully"}
     except HTTPException:
@@ -108,12 +305,62 @@ async def delete_portfolio_item(item_id: str):
         raise HTTPException(status_code=500, detail="Failed to delete portfolio item")
 
 
+# Image endpoints
+@api_router.get("/images/{item_id}")
+async def get_image(
+    item_id: str,
+    w: int = Query(800, ge=1, le=2560),
+    format: str = Query("webp", pattern="^(webp|jpeg|png)$"),
+    q: int = Query(80, ge=1, le=95),
+):
+    try:
+        if not image_store.has_original(item_id):
+            item = await db_service.get_portfolio_item(item_id)
+            if not item or not image_store.can_import(item.get("image", "")):
+                raise HTTPException(status_code=404, detail="Image not found")
+            await image_store.import_original(item_id, item["image"])
+
+        path = await image_store.get_variant(item_id, snap_width(w), format, snap_quality(q))
+        return FileResponse(path, media_type=MEDIA_TYPES[format], headers={"Cache-Control": "public, max-age=86400"})
+    except HTTPException:
+        raise
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        logger.error(f"Error serving image: {e}")
+        raise HTTPException(status_code=500, detail="Failed to serve image")
+
+@api_router.put("/images/{item_id}")
+async def upload_image(item_id: str, file: UploadFile = File(...)):
+    try:
+        if not await db_service.get_portfolio_item(item_id):
+            raise HTTPException(status_code=404, detail="Portfolio item not found")
+
+        data = await file.read(MAX_IMAGE_BYTES + 1)
+        if len(data) > MAX_IMAGE_BYTES:
+            raise HTTPException(status_code=413, detail="Image is too large")
+
+        await image_store.save_original(item_id, data)
+        return {"success": True, "message": "Image uploaded successfully"}
+    except HTTPException:
+        raise
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        logger.error(f"Error uploading image: {e}")
+        raise HTTPException(status_code=500, detail="Failed to upload image")
+
+
 # Services endpoints
 @api_router.get("/services")
-async def get_services():
+async def get_services(request: Request, fields: Optional[str] = None,
+                       lang: Optional[str] = Query(None, pattern="^(he|en)$")):
+    selected = parse_fields(fields, "services")
     try:
-        services = await db_service.get_services(active_only=True)
-        return {"success": True, "data": services}
+        return await cached_response(
+            request, db_service.cache, ("services", "response", selected, lang),
+            lambda: db_service.get_services(active_only=True, fields=selected, lang=lang),
+        )
     except Exception as e:
         logger.error(f"Error fetching services: {e}")
         raise HTTPException(status_code=500, detail="Failed to fetch services")
@@ -129,19 +376,22 @@ async def create_service(service: ServiceCreate):
         raise HTTPException(status_code=500, detail="Failed to create service")
 
 @api_router.put("/services/{service_id}")
-async def update_service(service_id: str, service: ServiceUpdate):
+async def update_service(service_id: str, service: ServiceUpdate, response: Response,
+                         if_match: Optional[str] = Header(None)):
     try:
         update_dict = {k: v for k, v in service.dict().items() if v is not None}
         if not update_dict:
             raise HTTPException(status_code=400, detail="No fields to update")
         
-        success = await db_service.update_service(service_id, update_dict)
-        if not success:
+        updated = await db_service.update_service(service_id, update_dict, parse_if_match(if_match))
+        if not updated:
             raise HTTPException(status_code=404, detail="Service not found")
         
-        return {"success": True, "message": "Service updated successfully"}
+        return {"success": True, "message": "Service updated successfully", "data": versioned(response, updated)}
     except HTTPException:
         raise
+    except VersionConflict as e:
+        raise version_conflict(e)
     except Exception as e:
         logger.error(f"Error updating service: {e}")
         raise HTTPException(status_code=500, detail="Failed to update service")
@@ -163,24 +413,32 @@ async def delete_service(service_id: str):
 
 # Testimonials endpoints
 @api_router.get("/testimonials")
-async def get_testimonials():
+async def get_testimonials(request: Request, fields: Optional[str] = None,
+                           lang: Optional[str] = Query(None, pattern="^(he|en)$")):
+    selected = parse_fields(fields, "testimonials")
     try:
-        testimonials = await db_service.get_testimonials(approved_only=True)
-        return {"success": True, "data": testimonials}
+        return await cached_response(
+            request, db_service.cache, ("testimonials", "response", selected, lang),
+            lambda: db_service.get_testimonials(approved_only=True, fields=selected, lang=lang),
+        )
     except Exception as e:
         logger.error(f"Error fetching testimonials: {e}")
         raise HTTPException(status_code=500, detail="Failed to fetch testimonials")
 
 @api_router.get("/testimonials/featured")
-async def get_featured_testimonials():
+async def get_featured_testimonials(request: Request, fields: Optional[str] = None,
+                                    lang: Optional[str] = Query(None, pattern="^(he|en)$")):
+    selected = parse_fields(fields, "testimonials")
     try:
-        testimonials = await db_service.get_testimonials(approved_only=True, featured=True)
-        return {"success": True, "data": testimonials}
+        return await cached_response(
+            request, db_service.cache, ("testimonials", "featured_response", selected, lang),
+            lambda: db_service.get_testimonials(approved_only=True, featured=True, fields=selected, lang=lang),
+        )
     except Exception as e:
         logger.error(f"Error fetching featured testimonials: {e}")
         raise HTTPException(status_code=500, detail="Failed to fetch featured testimonials")
 
-@api_router.post("/testimonials")
+@api_router.post("/testimonials", dependencies=[Depends(rate_limit("testimonials"))])
 async def create_testimonial(testimonial: TestimonialCreate):
     try:
         testimonial_dict = testimonial.dict()
@@ -191,19 +449,22 @@ async def create_testimonial(testimonial: TestimonialCreate):
         raise HTTPException(status_code=500, detail="Failed to create testimonial")
 
 @api_router.put("/testimonials/{testimonial_id}")
-async def update_testimonial(testimonial_id: str, testimonial: TestimonialUpdate):
+async def update_testimonial(testimonial_id: str, testimonial: TestimonialUpdate, response: Response,
+                             if_match: Optional[str] = Header(None)):
     try:
         update_dict = {k: v for k, v in testimonial.dict().items() if v is not None}
         if not update_dict:
             raise HTTPException(status_code=400, detail="No fields to update")
         
-        success = await db_service.update_testimonial(testimonial_id, update_dict)
-        if not success:
+        updated = await db_service.update_testimonial(testimonial_id, update_dict, parse_if_match(if_match))
+        if not updated:
             raise HTTPException(status_code=404, detail="Testimonial not found")
         
-        return {"success": True, "message": "Testimonial updated successfully"}
+        return {"success": True, "message": "Testimonial updated successfully", "data": versioned(response, updated)}
     except HTTPException:
         raise
+    except VersionConflict as e:
+        raise version_conflict(e)
     except Exception as e:
         logger.error(f"Error updating testimonial: {e}")
         raise HTTPException(status_code=500, detail="Failed to update testimonial")
@@ -224,7 +485,7 @@ async def delete_testimonial(testimonial_id: str):
 
 
 # Contact & Booking endpoints
-@api_router.post("/contact")
+@api_router.post("/contact", dependencies=[Depends(rate_limit("contact"))])
 async def submit_contact_message(message: ContactMessageCreate):
     try:
         message_dict = message.dict()
@@ -234,11 +495,13 @@ async def submit_contact_message(message: ContactMessageCreate):
         
         message_id = await db_service.create_contact_message(message_dict)
         return {"success": True, "message": "הודעתך נשלחה בהצלחה!", "id": str(message_id)}
+    except IngestionQueueFull:
+        raise HTTPException(status_code=503, detail="Server is busy, please try again", headers={"Retry-After": "1"})
     except Exception as e:
         logger.error(f"Error submitting contact message: {e}")
         raise HTTPException(status_code=500, detail="Failed to submit contact message")
 
-@api_router.post("/booking")
+@api_router.post("/booking", dependencies=[Depends(rate_limit("booking"))])
 async def submit_booking_request(booking: BookingRequestCreate):
     try:
         booking_dict = booking.dict()
@@ -251,52 +514,117 @@ async def submit_booking_request(booking: BookingRequestCreate):
         return {"success": True, "message": "בקשת ההזמנה נשלחה בהצלחה!", "id": str(booking_id)}
     except HTTPException:
         raise
+    except IngestionQueueFull:
+        raise HTTPException(status_code=503, detail="Server is busy, please try again", headers={"Retry-After": "1"})
     except Exception as e:
         logger.error(f"Error submitting booking request: {e}")
         raise HTTPException(status_code=500, detail="Failed to submit booking request")
 
+# Dashboard counters for messages and bookings
+@api_router.get("/stats")
+async def get_stats():
+    try:
+        stats = await db_service.get_lead_stats()
+        month = datetime.utcnow().strftime("%Y-%m")
+        data = {}
+        for name, collection in (("messages", "contact_messages"), ("bookings", "booking_requests")):
+            counters = stats.get(collection, {"total": 0, "status": {}, "event_type": {}, "month": {}})
+            data[name] = {**counters, "this_month": counters["month"].get(month, 0)}
+        return {"success": True, "data": data}
+    except Exception as e:
+        logger.error(f"Error fetching stats: {e}")
+        raise HTTPException(status_code=500, detail="Failed to fetch stats")
+
 @api_router.get("/messages")
-async def get_contact_messages(status: Optional[str] = None):
+async def get_contact_messages(
+    status: Optional[str] = None,
+    limit: int = Query(50, ge=1, le=200),
+    after: Optional[str] = None,
+    include_total: bool = False,
+):
     try:
-        messages = await db_service.get_contact_messages(status=status)
-        return {"success": True, "data": messages}
+        messages, next_cursor = await db_service.get_contact_messages(status=status, limit=limit, after=after)
+        response = {"success": True, "data": messages, "next_cursor": next_cursor}
+        if include_total:
+            response["total"] = await db_service.count_contact_messages(status=status)
+        return response
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         logger.error(f"Error fetching contact messages: {e}")
         raise HTTPException(status_code=500, detail="Failed to fetch contact messages")
 
+@api_router.get("/messages/export")
+async def export_contact_messages(
+    format: str = Query("csv", pattern="^(csv|ndjson)$"),
+    status: Optional[str] = None,
+    date_from: Optional[str] = Query(None, alias="from"),
+    date_to: Optional[str] = Query(None, alias="to"),
+):
+    created_from, created_to = parse_date_range(date_from, date_to)
+    docs = db_service.iter_contact_messages(status=status, created_from=created_from, created_to=created_to)
+    return export_response(docs, MESSAGE_COLUMNS, format, "contact-messages")
+
 @api_router.put("/messages/{message_id}")
-async def update_message_status(message_id: str, status_update: MessageStatusUpdate):
+async def update_message_status(message_id: str, status_update: MessageStatusUpdate, response: Response,
+                                if_match: Optional[str] = Header(None)):
     try:
-        success = await db_service.update_message_status(message_id, status_update.status)
-        if not success:
+        updated = await db_service.update_message_status(message_id, status_update.status, parse_if_match(if_match))
+        if not updated:
             raise HTTPException(status_code=404, detail="Message not found")
         
-        return {"success": True, "message": "Message status updated successfully"}
+        return {"success": True, "message": "Message status updated successfully", "data": versioned(response, updated)}
     except HTTPException:
         raise
+    except VersionConflict as e:
+        raise version_conflict(e)
     except Exception as e:
         logger.error(f"Error updating message status: {e}")
         raise HTTPException(status_code=500, detail="Failed to update message status")
 
 @api_router.get("/bookings")
-async def get_booking_requests(status: Optional[str] = None):
+async def get_booking_requests(
+    status: Optional[str] = None,
+    limit: int = Query(50, ge=1, le=200),
+    after: Optional[str] = None,
+    include_total: bool = False,
+):
     try:
-        bookings = await db_service.get_booking_requests(status=status)
-        return {"success": True, "data": bookings}
+        bookings, next_cursor = await db_service.get_booking_requests(status=status, limit=limit, after=after)
+        response = {"success": True, "data": bookings, "next_cursor": next_cursor}
+        if include_total:
+            response["total"] = await db_service.count_booking_requests(status=status)
+        return response
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         logger.error(f"Error fetching booking requests: {e}")
         raise HTTPException(status_code=500, detail="Failed to fetch booking requests")
 
+@api_router.get("/bookings/export")
+async def export_booking_requests(
+    format: str = Query("csv", pattern="^(csv|ndjson)$"),
+    status: Optional[str] = None,
+    date_from: Optional[str] = Query(None, alias="from"),
+    date_to: Optional[str] = Query(None, alias="to"),
+):
+    created_from, created_to = parse_date_range(date_from, date_to)
+    docs = db_service.iter_booking_requests(status=status, created_from=created_from, created_to=created_to)
+    return export_response(docs, BOOKING_COLUMNS, format, "booking-requests")
+
 @api_router.put("/bookings/{booking_id}")
-async def update_booking_status(booking_id: str, status_update: BookingStatusUpdate):
+async def update_booking_status(booking_id: str, status_update: BookingStatusUpdate, response: Response,
+                                if_match: Optional[str] = Header(None)):
     try:
-        success = await db_service.update_booking_status(booking_id, status_update.status)
-        if not success:
+        updated = await db_service.update_booking_status(booking_id, status_update.status, parse_if_match(if_match))
+        if not updated:
             raise HTTPException(status_code=404, detail="Booking not found")
         
-        return {"success": True, "message": "Booking status updated successfully"}
+        return {"success": True, "message": "Booking status updated successfully", "data": versioned(response, updated)}
     except HTTPException:
         raise
+    except VersionConflict as e:
+        raise version_conflict(e)
     except Exception as e:
         logger.error(f"Error updating booking status: {e}")
         raise HTTPException(status_code=500, detail="Failed to update booking status")
@@ -304,22 +632,40 @@ async def update_booking_status(booking_id: str, status_update: BookingStatusUpd
 
 # Settings endpoints
 @api_router.get("/settings")
-async def get_all_settings():
+async def get_all_settings(request: Request):
+    async def load():
+        snapshot = await db_service.get_settings_snapshot()
+        return {"success": True, "data": snapshot["values"], "version": snapshot["version"]}
+
     try:
-        settings = await db_service.get_all_settings()
-        return {"success": True, "data": settings}
+        return await cached_payload_response(request, db_service.cache, ("settings", "response"), load)
     except Exception as e:
         logger.error(f"Error fetching settings: {e}")
         raise HTTPException(status_code=500, detail="Failed to fetch settings")
 
+@api_router.patch("/settings")
+async def update_settings(update: SettingsBatchUpdate, if_match: Optional[str] = Header(None)):
+    if not update.values:
+        raise HTTPException(status_code=400, detail="No settings to update")
+    if any(key.startswith("_") for key in update.values):
+        raise HTTPException(status_code=400, detail="Setting keys may not start with '_'")
+    try:
+        version = await db_service.update_settings(update.values, expected_version=parse_if_match(if_match))
+        return {"success": True, "message": "Settings updated successfully", "version": version}
+    except VersionConflict as e:
+        raise version_conflict(e)
+    except Exception as e:
+        logger.error(f"Error updating settings: {e}")
+        raise HTTPException(status_code=500, detail="Failed to update settings")
+
 @api_router.get("/settings/{key}")
-async def get_setting(key: str):
+async def get_setting(request: Request, key: str):
     try:
         setting = await db_service.get_setting(key)
         if setting is None:
             raise HTTPException(status_code=404, detail="Setting not found")
         
-        return {"success": True, "data": setting}
+        return conditional_json(request, {"success": True, "data": setting})
     except HTTPException:
         raise
     except Exception as e:
@@ -328,28 +674,142 @@ async def get_setting(key: str):
 
 @api_router.put("/settings/{key}")
 async def update_setting(key: str, setting: SettingUpdate):
+    if key.startswith("_"):
+        raise HTTPException(status_code=400, detail="Setting keys may not start with '_'")
     try:
-        await db_service.update_setting(key, setting.value)
-        return {"success": True, "message": "Setting updated successfully"}
+        version = await db_service.update_setting(key, setting.value)
+        return {"success": True, "message": "Setting updated successfully", "version": version}
     except Exception as e:
         logger.error(f"Error updating setting: {e}")
         raise HTTPException(status_code=500, detail="Failed to update setting")
 
 
+# Homepage bundle endpoint
+@api_router.get("/home")
+async def get_home(request: Request, lang: Optional[str] = Query(None, pattern="^(he|en)$")):
+    async def load():
+        settings, portfolio, services, testimonials = await asyncio.gather(
+            db_service.get_all_settings(),
+            db_service.get_portfolio_items(featured=True, lang=lang),
+            db_service.get_services(active_only=True, lang=lang),
+            db_service.get_testimonials(approved_only=True, featured=True, lang=lang),
+        )
+        # Catalog documents come back already projected to ``lang``
+        return {
+            "settings": localize(settings, lang),
+            "portfolio": portfolio,
+            "services": services,
+            "testimonials": testimonials,
+        }
+
+    try:
+        return await cached_response(
+            request, db_service.cache, ("home", "response", lang), load,
+            tags=("portfolio", "services", "testimonials", "settings"),
+        )
+    except Exception as e:
+        logger.error(f"Error fetching homepage bundle: {e}")
+        raise HTTPException(status_code=500, detail="Failed to fetch homepage data")
+
+
+# Public availability calendar built from booked and quoted booking requests
+MAX_AVAILABILITY_DAYS = 366
+
+
+@api_router.get("/availability")
+async def get_availability(
+    request: Request,
+    date_from: Optional[str] = Query(None, alias="from"),
+    date_to: Optional[str] = Query(None, alias="to"),
+):
+    try:
+        start = datetime.strptime(date_from, "%Y-%m-%d").date() if date_from else datetime.utcnow().date()
+        end = datetime.strptime(date_to, "%Y-%m-%d").date() if date_to else start + timedelta(days=30)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Dates must be YYYY-MM-DD")
+    if end < start or (end - start).days >= MAX_AVAILABILITY_DAYS:
+        raise HTTPException(status_code=400, detail=f"Invalid range (at most {MAX_AVAILABILITY_DAYS} days)")
+
+    try:
+        days = await db_service.get_availability(start, end)
+    except Exception as e:
+        logger.error(f"Error fetching availability: {e}")
+        raise HTTPException(status_code=500, detail="Failed to fetch availability")
+
+    calendar = []
+    for offset in range((end - start).days + 1):
+        day = (start + timedelta(days=offset)).isoformat()
+        counts = days.get(day, {})
+        status = "booked" if counts.get("booked") else "tentative" if counts.get("quoted") else "available"
+        calendar.append({"date": day, "status": status})
+    return conditional_json(request, {"success": True, "data": calendar})
+
+
+# Search across portfolio, services and testimonials (Hebrew and English)
+@api_router.get("/search")
+async def search(
+    q: str = Query(..., min_length=1, max_length=200),
+    type: Optional[str] = Query(None, pattern="^(portfolio|services|testimonials)$"),
+    limit: int = Query(20, ge=1, le=100),
+):
+    try:
+        results = await db_service.search_catalog(q, collections=[type] if type else None, limit=limit)
+        return {"success": True, "query": q, "data": results}
+    except Exception as e:
+        logger.error(f"Error searching catalog: {e}")
+        raise HTTPException(status_code=500, detail="Failed to search")
+
+
+# Admin: slowest query shapes and DatabaseService methods seen by the profiler
+@api_router.get("/admin/slow-queries")
+async def get_slow_queries(
+    limit: int = Query(20, ge=1, le=200),
+    sort: str = Query("total_ms", pattern="^(total_ms|max_ms|mean_ms|count|slow)$"),
+):
+    if query_profiler is None:
+        raise HTTPException(status_code=404, detail="Query profiling is disabled (set DB_PROFILING=1)")
+    return {"success": True, "data": query_profiler.report(limit=limit, sort=sort)}
+
+
+@api_router.delete("/admin/slow-queries")
+async def reset_slow_queries():
+    if query_profiler is None:
+        raise HTTPException(status_code=404, detail="Query profiling is disabled (set DB_PROFILING=1)")
+    query_profiler.reset()
+    return {"success": True, "message": "Query profile reset"}
+
+
 # Health check endpoint
 @api_router.get("/")
 async def root():
     return {"message": "Jewish Event Photography API is running", "status": "healthy"}
 
 
-# Initialize database on startup
+# Initialize database in the background so workers start serving at once
+async def bootstrap_database():
+    try:
+        await ensure_indexes(db)
+        for problem in await verify_indexes(db):
+            logger.warning(f"Index check: {problem}")
+    except Exception as e:
+        logger.error(f"Error ensuring indexes: {e}")
+
+    try:
+        await run_migrations(db_service)
+    except Exception as e:
+        logger.error(f"Error applying migrations: {e}")
+
+
 @app.on_event("startup")
 async def startup_event():
     try:
-        await seed_initial_data(db_service)
-        logger.info("Application started successfully")
+        await invalidation_bus.start()
     except Exception as e:
-        logger.error(f"Error during startup: {e}")
+        logger.error(f"Error starting cache invalidation bus: {e}")
+    if query_profiler is not None:
+        await query_profiler.start(client)
+    app.state.bootstrap_task = asyncio.create_task(bootstrap_database())
+    logger.info("Application started successfully")
 
 
 # Include the router in the main app
@@ -362,7 +822,25 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+app.add_middleware(CompressionMiddleware)
+app.add_middleware(MetricsMiddleware)
+
+
+# Prometheus scrape endpoint
+@app.get("/metrics", include_in_schema=False)
+async def metrics():
+    return metrics_response()
 
 @app.on_event("shutdown")
 async def shutdown_db_client():
+    app.state.bootstrap_task.cancel()
+    await invalidation_bus.stop()
+    if query_profiler is not None:
+        await query_profiler.stop()
+    if write_behind is not None:
+        await write_behind.stop()
+    image_store.shutdown()
+    if read_client is not client:
+        read_client.close()
     client.close()
+    mark_process_dead()
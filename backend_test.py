@@ -402,6 +402,27 @@ class BackendTester:
         except Exception as e:
             self.log_result("Database Photographer Name", False, f"Error: {str(e)}")
     
+    def test_conditional_requests(self):
+        """Test ETag / If-None-Match revalidation on public GET endpoints"""
+        print("\n=== Testing Conditional Requests ===")
+        
+        endpoints = ["/portfolio", "/portfolio/featured", "/services", "/testimonials/featured", "/settings"]
+        for endpoint in endpoints:
+            try:
+                response = requests.get(f"{API_BASE}{endpoint}", timeout=10)
+                etag = response.headers.get("ETag")
+                if response.status_code != 200 or not etag:
+                    self.log_result(f"ETag ({endpoint})", False, f"Status code: {response.status_code}, ETag: {etag}")
+                    continue
+                
+                revalidated = requests.get(f"{API_BASE}{endpoint}", headers={"If-None-Match": etag}, timeout=10)
+                if revalidated.status_code == 304 and not revalidated.content:
+                    self.log_result(f"ETag ({endpoint})", True, "Unchanged content answered with 304")
+                else:
+                    self.log_result(f"ETag ({endpoint})", False, f"Expected 304, got {revalidated.status_code}")
+            except Exception as e:
+                self.log_result(f"ETag ({endpoint})", False, f"Error: {str(e)}")
+    
     def run_all_tests(self):
         """Run all backend API tests"""
         print(f"🚀 Starting Backend API Tests for Jewish Event Photography Website")
@@ -420,6 +441,7 @@ class BackendTester:
         self.test_contact_booking_endpoints()
         self.test_settings_endpoints()
         self.test_database_integration()
+        self.test_conditional_requests()
         
         # Print summary
         print("\n" + "=" * 80)
@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""
+Serialization benchmark for the public list endpoints.
+
+Compares the per-request CPU cost of the previous path (FastAPI running
+jsonable_encoder over every document and rendering a JSONResponse) with
+serving a pre-encoded orjson snapshot from the catalog cache.
+
+Usage: python benchmarks/bench_serialization.py [--items 60] [--iterations 2000]
+"""
+
+import argparse
+import sys
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parent.parent / 'backend'))
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from starlette.requests import Request
+
+from cache import TTLCache
+from responses import Snapshot, snapshot_response
+
+
+def make_portfolio(count):
+    now = datetime.utcnow()
+    return [
+        {
+            "id": str(i),
+            "title": f"בר מצווה של דניאל {i}",
+            "title_en": f"Daniel's Bar Mitzvah {i}",
+            "category": "Bar Mitzvah",
+            "image": "https://images.unsplash.com/photo-1658889849723-0191c8ac8c61?crop=entropy&cs=srgb&fm=jpg&q=85",
+            "description": "חגיגה משפחתית מרגשת בכותל המערבי",
+            "description_en": "A moving family celebration at the Western Wall",
+            "featured": i % 2 == 0,
+            "order": i,
+            "created_at": now - timedelta(days=i),
+            "updated_at": now,
+        }
+        for i in range(count)
+    ]
+
+
+def make_request():
+    return Request({"type": "http", "method": "GET", "path": "/api/portfolio", "headers": []})
+
+
+def cpu_per_call(fn, iterations):
+    fn()
+    start = time.process_time()
+    for _ in range(iterations):
+        fn()
+    return (time.process_time() - start) / iterations
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--items", type=int, default=60)
+    parser.add_argument("--iterations", type=int, default=2000)
+    args = parser.parse_args()
+
+    payload = {"success": True, "data": make_portfolio(args.items)}
+    request = make_request()
+    cache = TTLCache()
+    key = ("portfolio", "response", None)
+    cache.set(key, Snapshot.of(payload))
+
+    def baseline():
+        JSONResponse(jsonable_encoder(payload)).body
+
+    def snapshot_miss():
+        snapshot_response(request, Snapshot.of(payload)).body
+
+    def snapshot_hit():
+        snapshot_response(request, cache.get(key)).body
+
+    assert JSONResponse(jsonable_encoder(payload)).body == Snapshot.of(payload).body
+
+    results = [
+        ("jsonable_encoder + JSONResponse", cpu_per_call(baseline, args.iterations)),
+        ("orjson snapshot (rebuild)", cpu_per_call(snapshot_miss, args.iterations)),
+        ("orjson snapshot (cache hit)", cpu_per_call(snapshot_hit, args.iterations)),
+    ]
+    base = results[0][1]
+    print(f"{args.items} portfolio items, {len(Snapshot.of(payload).body)} bytes, {args.iterations} iterations")
+    for name, seconds in results:
+        print(f"  {name:<34} {seconds * 1e6:10.1f} us/request  {base / seconds:6.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,248 @@
+#!/usr/bin/env python3
+"""
+Synthetic data generator for the load benchmarks.
+
+Seeds a MongoDB database with realistic bilingual (Hebrew / English)
+portfolio items, services, testimonials, contact messages and booking
+requests. The same --seed always produces the same data. Start (or
+restart) the API after seeding so it rebuilds the derived collections.
+
+Usage: python benchmarks/datagen.py --mongo-url mongodb://localhost:27017 --db bench \
+           --portfolio 200 --testimonials 500 --messages 20000 --bookings 5000
+"""
+
+import argparse
+import random
+import uuid
+from datetime import datetime, timedelta
+
+from pymongo import MongoClient
+
+CATEGORIES = [
+    ("Bar Mitzvah", "בר מצווה"),
+    ("Bat Mitzvah", "בת מצווה"),
+    ("Brit Milah", "ברית מילה"),
+    ("Torah Reading", "עלייה לתורה"),
+    ("Family Event", "אירוע משפחתי"),
+]
+FIRST_NAMES = [
+    ("דניאל", "Daniel"), ("שרה", "Sarah"), ("אברהם", "Abraham"), ("רחל", "Rachel"),
+    ("משה", "Moshe"), ("נועה", "Noa"), ("יוסף", "Yosef"), ("תמר", "Tamar"),
+    ("אליהו", "Eliyahu"), ("מרים", "Miriam"), ("דוד", "David"), ("אסתר", "Esther"),
+]
+FAMILIES = [
+    ("כהן", "Cohen"), ("לוי", "Levy"), ("מזרחי", "Mizrahi"), ("פרץ", "Peretz"),
+    ("ביטון", "Biton"), ("אברהם", "Abraham"), ("פרידמן", "Friedman"), ("שפירא", "Shapira"),
+]
+PLACES = [
+    ("בכותל המערבי", "at the Western Wall"), ("בבית הכנסת הגדול", "at the Great Synagogue"),
+    ("בגן האירועים", "at the event garden"), ("בעיר העתיקה", "in the Old City"),
+    ("בבית המשפחה", "at the family home"),
+]
+PHRASES = [
+    ("חגיגה משפחתית מרגשת", "A moving family celebration"),
+    ("רגעים קדושים בבוקר יפהפה", "Sacred moments on a beautiful morning"),
+    ("אב ובן ברגע מיוחד", "Father and son in a special moment"),
+    ("חגיגה אלגנטית עם המשפחה והחברים", "An elegant celebration with family and friends"),
+]
+TESTIMONIAL_TEXT = [
+    ("צילום מקצועי ומרגש, ידע להיות בזמן הנכון במקום הנכון", "Professional and moving photography, always in the right place"),
+    ("תמונות מדהימות שנשמור לכל החיים", "Amazing photos we will keep for life"),
+    ("שירות אישי וחם, התמונות יצאו יפהפיות", "Warm personal service, the photos came out beautiful"),
+]
+MESSAGE_STATUSES = ["new", "contacted", "closed"]
+BOOKING_STATUSES = ["new", "quoted", "booked", "completed", "cancelled"]
+
+
+def person(rng):
+    first_he, first_en = rng.choice(FIRST_NAMES)
+    family_he, family_en = rng.choice(FAMILIES)
+    return f"{first_he} {family_he}", f"{first_en} {family_en}"
+
+
+def phone(rng):
+    return f"05{rng.randint(0, 8)}-{rng.randint(100, 999)}-{rng.randint(1000, 9999)}"
+
+
+def timestamp(rng, now, days=3 * 365):
+    return now - timedelta(seconds=rng.randint(0, days * 86400))
+
+
+def make_portfolio(rng, count, now):
+    items = []
+    for i in range(count):
+        category, category_he = rng.choice(CATEGORIES)
+        name_he, name_en = person(rng)
+        place_he, place_en = rng.choice(PLACES)
+        phrase_he, phrase_en = rng.choice(PHRASES)
+        created = timestamp(rng, now)
+        items.append({
+            "id": f"bench-{i}",
+            "title": f"{category_he} של {name_he.split()[0]}",
+            "title_en": f"{name_en.split()[0]}'s {category}",
+            "category": category,
+            "image": f"https://images.unsplash.com/photo-{1600000000000 + i}?fm=jpg&q=85",
+            "description": f"{phrase_he} {place_he}",
+            "description_en": f"{phrase_en} {place_en}",
+            "featured": rng.random() < 0.2,
+            "order": i,
+            "created_at": created,
+            "updated_at": created,
+        })
+    return items
+
+
+def make_services(rng, count, now):
+    services = []
+    for i in range(count):
+        category, category_he = CATEGORIES[i % len(CATEGORIES)]
+        hours = rng.randint(2, 10)
+        low = rng.randint(10, 30) * 100
+        services.append({
+            "id": f"bench-{i}",
+            "name": category_he,
+            "name_en": category,
+            "description": f"צילום מקצועי של {category_he}",
+            "description_en": f"Professional photography of your {category}",
+            "price": f"₪{low:,} - ₪{low + 2000:,}",
+            "duration": f"{hours} שעות צילום",
+            "duration_en": f"{hours} hours of photography",
+            "includes": ["צילום הטקס", "עריכה מקצועית", f"{hours * 25}+ תמונות ערוכות"],
+            "includes_en": ["Ceremony photography", "Professional editing", f"{hours * 25}+ edited photos"],
+            "active": rng.random() < 0.9,
+            "order": i,
+            "created_at": now,
+            "updated_at": now,
+        })
+    return services
+
+
+def make_testimonials(rng, count, now):
+    testimonials = []
+    for i in range(count):
+        category, category_he = rng.choice(CATEGORIES)
+        family_he, family_en = rng.choice(FAMILIES)
+        text_he, text_en = rng.choice(TESTIMONIAL_TEXT)
+        created = timestamp(rng, now)
+        testimonials.append({
+            "id": f"bench-{i}",
+            "name": f"משפחת {family_he}",
+            "name_en": f"{family_en} Family",
+            "event": category_he,
+            "event_en": category,
+            "text": text_he,
+            "text_en": text_en,
+            "rating": rng.choice([4, 5, 5, 5]),
+            "approved": rng.random() < 0.85,
+            "featured": rng.random() < 0.1,
+            "created_at": created,
+            "updated_at": created,
+        })
+    return testimonials
+
+
+def make_contact_message(rng, now, index=None):
+    name_he, _ = person(rng)
+    category, category_he = rng.choice(CATEGORIES)
+    created = timestamp(rng, now)
+    return {
+        "id": f"bench-{index}" if index is not None else str(uuid.uuid4()),
+        "name": name_he,
+        "phone": phone(rng),
+        "email": f"client{rng.randint(1, 10 ** 6)}@example.com",
+        "event_type": category_he,
+        "event_date": created + timedelta(days=rng.randint(14, 240)),
+        "message": f"שלום, אני מעוניין בצילום {category_he}. האירוע יתקיים {rng.choice(PLACES)[0]}.",
+        "status": rng.choice(MESSAGE_STATUSES),
+        "created_at": created,
+        "updated_at": created,
+    }
+
+
+def make_booking_request(rng, now, index=None):
+    name_he, _ = person(rng)
+    category, category_he = rng.choice(CATEGORIES)
+    created = timestamp(rng, now)
+    low = rng.randint(10, 40) * 100
+    return {
+        "id": f"bench-{index}" if index is not None else str(uuid.uuid4()),
+        "name": name_he,
+        "phone": phone(rng),
+        "email": f"client{rng.randint(1, 10 ** 6)}@example.com",
+        "event_type": category_he,
+        "event_date": (created + timedelta(days=rng.randint(14, 365))).replace(hour=0, minute=0, second=0, microsecond=0),
+        "guest_count": rng.randint(20, 400),
+        "budget": f"₪{low:,} - ₪{low + 1500:,}",
+        "venue": rng.choice(PLACES)[0],
+        "additional_info": "נרצה צילום גם של ההכנות לפני הטקס" if rng.random() < 0.3 else None,
+        "status": rng.choice(BOOKING_STATUSES),
+        "created_at": created,
+        "updated_at": created,
+    }
+
+
+def make_settings(now):
+    values = {
+        "photographer_info": {
+            "name": "ידידיה מלכא", "name_en": "Yedidya Malka",
+            "tagline": "צלם אירועים יהודיים מקצועי", "tagline_en": "Professional Jewish Event Photographer",
+            "location": "ירושלים וסביבותיה", "location_en": "Jerusalem & Surroundings",
+        },
+        "contact_info": {
+            "phone": "050-123-4567", "email": "yedidya@jewishevents.co.il",
+            "address": "ירושלים, ישראל", "address_en": "Jerusalem, Israel",
+        },
+        "social_media": {"instagram": "@yedidya_photography", "facebook": "YedidyaMalkaPhotography"},
+    }
+    return [{"key": key, "value": value, "updated_at": now} for key, value in values.items()]
+
+
+def generate(args):
+    rng = random.Random(args.seed)
+    now = datetime(2025, 1, 1)
+    return {
+        "portfolio": make_portfolio(rng, args.portfolio, now),
+        "services": make_services(rng, args.services, now),
+        "testimonials": make_testimonials(rng, args.testimonials, now),
+        "contact_messages": [make_contact_message(rng, now, i) for i in range(args.messages)],
+        "booking_requests": [make_booking_request(rng, now, i) for i in range(args.bookings)],
+        "settings": make_settings(now),
+    }
+
+
+def seed(args):
+    client = MongoClient(args.mongo_url)
+    db = client[args.db]
+    for collection, docs in generate(args).items():
+        if args.reset:
+            db[collection].delete_many({})
+        for start in range(0, len(docs), 1000):
+            db[collection].insert_many(docs[start:start + 1000], ordered=False)
+        print(f"{collection}: {len(docs)} documents")
+    if args.reset:
+        # Derived from the leads just replaced; rebuilt by the API's migrations
+        db.availability.drop()
+        db.lead_stats.drop()
+    # Mark only the seed migration as applied: the API does not add its own
+    # data, and rebuilds the availability calendar and lead counters from
+    # the seeded leads when it next starts.
+    db.migrations.update_one({"_id": "schema"}, {"$set": {"version": 1}}, upsert=True)
+    client.close()
+
+
+def add_arguments(parser):
+    parser.add_argument("--mongo-url", default="mongodb://localhost:27017")
+    parser.add_argument("--db", default="bench")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--portfolio", type=int, default=200)
+    parser.add_argument("--services", type=int, default=8)
+    parser.add_argument("--testimonials", type=int, default=500)
+    parser.add_argument("--messages", type=int, default=20000)
+    parser.add_argument("--bookings", type=int, default=5000)
+    parser.add_argument("--reset", action="store_true", help="delete existing documents first")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Seed MongoDB with synthetic benchmark data")
+    add_arguments(parser)
+    seed(parser.parse_args())
@@ -0,0 +1,322 @@
+#!/usr/bin/env python3
+"""
+Concurrent load benchmark for every route in backend/server.py.
+
+Each route is driven on its own with --concurrency parallel clients for
+--requests requests, so every route gets its own throughput and
+p50/p95/p99 latency. Results are written as JSON; pass --compare with an
+earlier result file to print the change per route.
+
+Seed the database first (python benchmarks/datagen.py --reset) and start
+the API with rate limits raised high enough for the run, e.g.
+RATE_LIMIT_CONTACT=1000000/1 RATE_LIMIT_CONTACT_GLOBAL=1000000/1 (same for
+BOOKING and TESTIMONIALS), otherwise the write routes mostly measure 429s.
+The /api/admin/slow-queries routes answer 404 unless the API runs with
+DB_PROFILING=1.
+
+Usage: python benchmarks/load_test.py --base-url http://localhost:8001 \
+           --concurrency 32 --requests 2000 --output results/run.json
+"""
+
+import argparse
+import asyncio
+import io
+import json
+import platform
+import random
+import re
+import subprocess
+import sys
+import time
+from collections import Counter
+from datetime import datetime, timedelta
+from pathlib import Path
+
+import httpx
+
+sys.path.append(str(Path(__file__).resolve().parent))
+
+from datagen import CATEGORIES, make_booking_request, make_contact_message
+
+SETTING_KEYS = ["photographer_info", "contact_info", "social_media"]
+SEARCH_TERMS = ["בר מצווה", "Bar Mitzvah", "כותל", "Western Wall", "ברית", "family celebration", "Cohen"]
+IMAGE_WIDTHS = [320, 640, 800, 1280]
+# Portfolio items given an uploaded original by PUT /api/images/{id}
+IMAGE_ITEMS = 10
+
+
+class Upload:
+    """A multipart file body for a scenario request."""
+
+    def __init__(self, filename: str, data: bytes, content_type: str):
+        self.filename = filename
+        self.data = data
+        self.content_type = content_type
+
+
+class Context:
+    """State shared by the scenarios of one run (random source, created ids)."""
+
+    def __init__(self, seed: int, portfolio: int, testimonials: int, messages: int, bookings: int):
+        self.rng = random.Random(seed)
+        self.now = datetime(2025, 1, 1)
+        self.portfolio = portfolio
+        self.testimonials = testimonials
+        self.messages = messages
+        self.bookings = bookings
+        self.created = {"portfolio": [], "portfolio_bulk": [], "services": [], "testimonials": []}
+        self._image = None
+
+    def bench_id(self, count: int) -> str:
+        return f"bench-{self.rng.randrange(max(count, 1))}"
+
+    def image(self) -> Upload:
+        """A 1600x1200 JPEG, generated once per run."""
+        if self._image is None:
+            from PIL import Image  # only needed by the image routes
+
+            buffer = io.BytesIO()
+            Image.new("RGB", (1600, 1200), (180, 150, 120)).save(buffer, format="JPEG", quality=85)
+            self._image = Upload("original.jpg", buffer.getvalue(), "image/jpeg")
+        return self._image
+
+
+def _lead_body(doc):
+    body = {k: v for k, v in doc.items() if k not in ("id", "status", "created_at", "updated_at")}
+    body["event_date"] = (datetime.utcnow() + timedelta(days=30)).date().isoformat()
+    return body
+
+
+def _portfolio_body(ctx, i):
+    category, category_he = ctx.rng.choice(CATEGORIES)
+    return {
+        "title": f"{category_he} {i}", "title_en": f"{category} {i}", "category": category,
+        "image": "https://images.unsplash.com/photo-1658889849723-0191c8ac8c61?fm=jpg&q=85",
+        "description": "חגיגה משפחתית מרגשת", "description_en": "A moving family celebration",
+        "order": 10000 + i,
+    }
+
+
+def _service_body(i):
+    return {
+        "name": f"שירות {i}", "name_en": f"Service {i}", "description": "צילום מקצועי",
+        "price": "₪1,000", "duration": "2 שעות", "includes": ["צילום"], "order": 10000 + i,
+    }
+
+
+def _testimonial_body(i):
+    return {"name": f"משפחת בדיקה {i}", "event": "בר מצווה", "text": "תמונות מדהימות", "rating": 5}
+
+
+def _pop_created(ctx, kind, fallback):
+    return ctx.created[kind].pop() if ctx.created[kind] else fallback
+
+
+def _created_ids(payload):
+    """Ids created by a single or bulk create response."""
+    if "results" in payload:
+        return [result["id"] for result in payload["results"] if result.get("status") == "created"]
+    return [payload["id"]]
+
+
+def _settings_patch(i):
+    return {"values": {
+        "social_media": {"instagram": "@yedidya_photography", "facebook": "YedidyaMalkaPhotography", "run": i},
+        "contact_info": {"phone": "050-123-4567", "email": "yedidya@jewishevents.co.il", "run": i},
+    }}
+
+
+# (name, method, request factory(ctx, i) -> (path, json body, Upload or None), pool for created ids)
+SCENARIOS = [
+    ("GET /api/", "GET", lambda ctx, i: ("/", None), None),
+    ("GET /api/portfolio", "GET", lambda ctx, i: ("/portfolio", None), None),
+    ("GET /api/portfolio?category", "GET",
+     lambda ctx, i: (f"/portfolio?category={ctx.rng.choice(CATEGORIES)[0]}", None), None),
+    ("GET /api/portfolio/featured", "GET", lambda ctx, i: ("/portfolio/featured", None), None),
+    ("GET /api/services", "GET", lambda ctx, i: ("/services", None), None),
+    ("GET /api/testimonials", "GET", lambda ctx, i: ("/testimonials", None), None),
+    ("GET /api/testimonials/featured", "GET", lambda ctx, i: ("/testimonials/featured", None), None),
+    ("GET /api/settings", "GET", lambda ctx, i: ("/settings", None), None),
+    ("GET /api/settings/{key}", "GET", lambda ctx, i: (f"/settings/{ctx.rng.choice(SETTING_KEYS)}", None), None),
+    ("GET /api/home", "GET", lambda ctx, i: ("/home", None), None),
+    ("GET /api/home?lang=en", "GET", lambda ctx, i: ("/home?lang=en", None), None),
+    ("GET /api/search", "GET", lambda ctx, i: (f"/search?q={ctx.rng.choice(SEARCH_TERMS)}", None), None),
+    ("GET /api/availability", "GET", lambda ctx, i: ("/availability", None), None),
+    ("GET /api/availability?from&to", "GET",
+     lambda ctx, i: (f"/availability?from={ctx.now:%Y-%m-%d}&to={ctx.now + timedelta(days=364):%Y-%m-%d}", None), None),
+    ("GET /api/stats", "GET", lambda ctx, i: ("/stats", None), None),
+    ("PUT /api/images/{id}", "PUT",
+     lambda ctx, i: (f"/images/bench-{i % min(IMAGE_ITEMS, ctx.portfolio)}", ctx.image()), None),
+    ("GET /api/images/{id}", "GET",
+     lambda ctx, i: (f"/images/bench-{ctx.rng.randrange(min(IMAGE_ITEMS, ctx.portfolio))}"
+                     f"?w={ctx.rng.choice(IMAGE_WIDTHS)}&format={ctx.rng.choice(['webp', 'jpeg'])}", None), None),
+    ("GET /api/messages", "GET", lambda ctx, i: ("/messages?limit=50", None), None),
+    ("GET /api/messages?status", "GET", lambda ctx, i: ("/messages?status=new&limit=50", None), None),
+    ("GET /api/bookings", "GET", lambda ctx, i: ("/bookings?limit=50", None), None),
+    ("GET /api/messages/export", "GET", lambda ctx, i: ("/messages/export?format=ndjson&status=new", None), None),
+    ("GET /api/bookings/export", "GET", lambda ctx, i: ("/bookings/export?format=csv&status=booked", None), None),
+    ("POST /api/contact", "POST",
+     lambda ctx, i: ("/contact", _lead_body(make_contact_message(ctx.rng, ctx.now))), None),
+    ("POST /api/booking", "POST",
+     lambda ctx, i: ("/booking", _lead_body(make_booking_request(ctx.rng, ctx.now))), None),
+    ("PUT /api/messages/{id}", "PUT",
+     lambda ctx, i: (f"/messages/{ctx.bench_id(ctx.messages)}", {"status": ctx.rng.choice(["new", "contacted"])}), None),
+    ("PUT /api/bookings/{id}", "PUT",
+     lambda ctx, i: (f"/bookings/{ctx.bench_id(ctx.bookings)}", {"status": ctx.rng.choice(["new", "quoted"])}), None),
+    ("POST /api/portfolio", "POST", lambda ctx, i: ("/portfolio", _portfolio_body(ctx, i)), "portfolio"),
+    ("PUT /api/portfolio/{id}", "PUT",
+     lambda ctx, i: (f"/portfolio/{ctx.bench_id(ctx.portfolio)}", {"description_en": f"Updated {i}"}), None),
+    ("POST /api/portfolio/bulk", "POST",
+     lambda ctx, i: ("/portfolio/bulk", {"items": [_portfolio_body(ctx, i * 10 + k) for k in range(10)]}),
+     "portfolio_bulk"),
+    ("PUT /api/portfolio/bulk", "PUT",
+     lambda ctx, i: ("/portfolio/bulk", {"items": [{"id": ctx.bench_id(ctx.portfolio), "order": i} for _ in range(10)]}), None),
+    ("DELETE /api/portfolio/bulk", "DELETE",
+     lambda ctx, i: ("/portfolio/bulk", {"ids": [_pop_created(ctx, "portfolio_bulk", "missing") for _ in range(10)]}),
+     None),
+    ("DELETE /api/portfolio/{id}", "DELETE",
+     lambda ctx, i: (f"/portfolio/{_pop_created(ctx, 'portfolio', 'missing')}", None), None),
+    ("POST /api/services", "POST", lambda ctx, i: ("/services", _service_body(i)), "services"),
+    ("PUT /api/services/{id}", "PUT", lambda ctx, i: (f"/services/bench-{i % 5}", {"order": i % 5}), None),
+    ("DELETE /api/services/{id}", "DELETE",
+     lambda ctx, i: (f"/services/{_pop_created(ctx, 'services', 'missing')}", None), None),
+    ("POST /api/testimonials", "POST", lambda ctx, i: ("/testimonials", _testimonial_body(i)), "testimonials"),
+    ("PUT /api/testimonials/{id}", "PUT",
+     lambda ctx, i: (f"/testimonials/{ctx.bench_id(ctx.testimonials)}", {"rating": 5}), None),
+    ("DELETE /api/testimonials/{id}", "DELETE",
+     lambda ctx, i: (f"/testimonials/{_pop_created(ctx, 'testimonials', 'missing')}", None), None),
+    ("PUT /api/settings/{key}", "PUT",
+     lambda ctx, i: ("/settings/social_media", {"value": {"instagram": "@yedidya_photography", "run": i}}), None),
+    ("PATCH /api/settings", "PATCH", lambda ctx, i: ("/settings", _settings_patch(i)), None),
+    ("GET /api/admin/slow-queries", "GET", lambda ctx, i: ("/admin/slow-queries?limit=20", None), None),
+    ("DELETE /api/admin/slow-queries", "DELETE", lambda ctx, i: ("/admin/slow-queries", None), None),
+]
+
+
+def percentile(sorted_values, pct):
+    if not sorted_values:
+        return None
+    index = max(0, min(len(sorted_values) - 1, round(pct / 100 * len(sorted_values) + 0.5) - 1))
+    return sorted_values[index]
+
+
+async def run_scenario(client, ctx, scenario, requests, concurrency):
+    name, method, factory, created_kind = scenario
+    latencies, statuses = [], Counter()
+    counter = iter(range(requests))
+
+    async def worker():
+        for i in counter:
+            path, body = factory(ctx, i)
+            if isinstance(body, Upload):
+                payload = {"files": {"file": (body.filename, body.data, body.content_type)}}
+            else:
+                payload = {"json": body}
+            start = time.perf_counter()
+            try:
+                response = await client.request(method, path, **payload)
+                await response.aread()
+                statuses[str(response.status_code)] += 1
+                if created_kind and response.status_code == 200:
+                    ctx.created[created_kind].extend(_created_ids(response.json()))
+            except httpx.HTTPError as e:
+                statuses[type(e).__name__] += 1
+            latencies.append(time.perf_counter() - start)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    ms = [value * 1000 for value in latencies]
+    ok = sum(count for status, count in statuses.items() if status.startswith("2") or status == "304")
+    return {
+        "requests": len(latencies),
+        "errors": len(latencies) - ok,
+        "statuses": dict(statuses),
+        "duration_s": round(elapsed, 3),
+        "throughput_rps": round(len(latencies) / elapsed, 1) if elapsed else None,
+        "latency_ms": {
+            "mean": round(sum(ms) / len(ms), 2) if ms else None,
+            "p50": round(percentile(ms, 50), 2) if ms else None,
+            "p95": round(percentile(ms, 95), 2) if ms else None,
+            "p99": round(percentile(ms, 99), 2) if ms else None,
+            "max": round(ms[-1], 2) if ms else None,
+        },
+    }
+
+
+def git_revision():
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], text=True).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def print_report(results, baseline=None):
+    header = f"{'route':<34} {'rps':>9} {'p50':>8} {'p95':>8} {'p99':>8} {'err':>6}"
+    if baseline:
+        header += f" {'Δrps':>8} {'Δp95':>8}"
+    print(header)
+    for name, result in results.items():
+        latency = result["latency_ms"]
+        line = (f"{name:<34} {result['throughput_rps'] or 0:>9.1f} {latency['p50'] or 0:>8.2f} "
+                f"{latency['p95'] or 0:>8.2f} {latency['p99'] or 0:>8.2f} {result['errors']:>6}")
+        previous = (baseline or {}).get(name)
+        if previous and previous["throughput_rps"] and previous["latency_ms"]["p95"]:
+            rps_change = (result["throughput_rps"] / previous["throughput_rps"] - 1) * 100
+            p95_change = (latency["p95"] / previous["latency_ms"]["p95"] - 1) * 100
+            line += f" {rps_change:>+7.1f}% {p95_change:>+7.1f}%"
+        print(line)
+
+
+async def main(args):
+    ctx = Context(args.seed, args.portfolio, args.testimonials, args.messages, args.bookings)
+    scenarios = [s for s in SCENARIOS if not args.routes or re.search(args.routes, s[0])]
+    limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+    results = {}
+    async with httpx.AsyncClient(base_url=f"{args.base_url.rstrip('/')}/api", limits=limits,
+                                 timeout=args.timeout) as client:
+        for scenario in scenarios:
+            results[scenario[0]] = await run_scenario(client, ctx, scenario, args.requests, args.concurrency)
+            print(f"  finished {scenario[0]}", file=sys.stderr)
+
+    report = {
+        "meta": {
+            "started_at": datetime.utcnow().isoformat(),
+            "git_revision": git_revision(),
+            "python": platform.python_version(),
+            "host": platform.node(),
+            "base_url": args.base_url,
+            "concurrency": args.concurrency,
+            "requests_per_route": args.requests,
+            "seed": args.seed,
+        },
+        "results": results,
+    }
+    baseline = None
+    if args.compare:
+        baseline = json.loads(Path(args.compare).read_text())["results"]
+    print_report(results, baseline)
+
+    output = Path(args.output or f"benchmarks/results/{datetime.utcnow():%Y%m%d-%H%M%S}.json")
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(report, indent=2, ensure_ascii=False))
+    print(f"\nResults saved to {output}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Concurrent load benchmark for the API")
+    parser.add_argument("--base-url", default="http://localhost:8001")
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--requests", type=int, default=1000, help="requests per route")
+    parser.add_argument("--timeout", type=float, default=30.0)
+    parser.add_argument("--routes", help="regular expression selecting the routes to run")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--portfolio", type=int, default=200, help="portfolio items seeded by datagen")
+    parser.add_argument("--testimonials", type=int, default=500, help="testimonials seeded by datagen")
+    parser.add_argument("--messages", type=int, default=20000, help="messages seeded by datagen")
+    parser.add_argument("--bookings", type=int, default=5000, help="bookings seeded by datagen")
+    parser.add_argument("--output", help="result file (default benchmarks/results/<timestamp>.json)")
+    parser.add_argument("--compare", help="earlier result file to compare against")
+    asyncio.run(main(parser.parse_args()))
@@ -1,4 +1,4 @@
-import React from 'react';
+import React, { useState, useEffect } from 'react';
 import Header from './components/Header';
 import Hero from './components/Hero';
 import Portfolio from './components/Portfolio';
@@ -7,18 +7,43 @@ import Testimonials from './components/Testimonials';
 import Contact from './components/Contact';
 import Footer from './components/Footer';
 import { Toaster } from './components/ui/toaster';
+import { homeAPI, handleAPIError } from './services/api';
 import './styles/jewish-photography.css';
 
 const JewishPhotographyApp = () => {
+  // Settings, featured portfolio, services and featured testimonials arrive
+  // in one /api/home round trip and are handed to the sections below
+  const [home, setHome] = useState({});
+  const [loading, setLoading] = useState(true);
+  const [error, setError] = useState(null);
+
+  useEffect(() => {
+    fetchHome();
+  }, []);
+
+  const fetchHome = async () => {
+    try {
+      setLoading(true);
+      setError(null);
+      const response = await homeAPI.get();
+      setHome(response.data || {});
+    } catch (err) {
+      console.error('Error fetching homepage data:', err);
+      setError(handleAPIError(err, 'Failed to load page'));
+    } finally {
+      setLoading(false);
+    }
+  };
+
   return (
     <div className="min-h-screen bg-white">
       <Header />
       <main>
-        <Hero />
+        <Hero settings={home.settings} featured={home.portfolio} loading={loading} />
         <Portfolio />
-        <Services />
-        <Testimonials />
-        <Contact />
+        <Services services={home.services} loading={loading} error={error} onRetry={fetchHome} />
+        <Testimonials testimonials={home.testimonials} loading={loading} error={error} onRetry={fetchHome} />
+        <Contact settings={home.settings} loading={loading} />
       </main>
       <Footer />
       <Toaster />
@@ -26,4 +51,4 @@ const JewishPhotographyApp = () => {
   );
 };
 
-export default JewishPhotographyApp;
\ No newline at end of file
+export default JewishPhotographyApp;
@@ -1,14 +1,23 @@
-import React, { useState, useEffect } from 'react';
+import React, { useState } from 'react';
 import { Phone, Mail, MapPin, Instagram, Facebook, Send, Calendar } from 'lucide-react';
-import { contactAPI, settingsAPI, handleAPIError } from '../services/api';
+import { contactAPI, handleAPIError } from '../services/api';
 import { useToast } from '../hooks/use-toast';
 
-const Contact = () => {
+// Contact details come from the settings in the homepage bundle loaded by
+// JewishPhotographyApp
+const Contact = ({ settings, loading }) => {
   const { toast } = useToast();
   const [isSubmitting, setIsSubmitting] = useState(false);
   const [activeForm, setActiveForm] = useState('contact'); // 'contact' or 'booking'
-  const [contactInfo, setContactInfo] = useState(null);
-  const [socialMedia, setSocialMedia] = useState(null);
+  const contactInfo = settings?.contact_info || {
+    phone: "050-123-4567",
+    email: "yedidya@jewishevents.co.il",
+    address: "ירושלים, ישראל"
+  };
+  const socialMedia = settings?.social_media || {
+    instagram: "@yedidya_photography",
+    facebook: "YedidyaMalkaPhotography"
+  };
   
   const [contactForm, setContactForm] = useState({
     name: '',
@@ -31,40 +40,6 @@ const Contact = () => {
     additional_info: ''
   });
 
-  useEffect(() => {
-    fetchContactSettings();
-  }, []);
-
-  const fetchContactSettings = async () => {
-    try {
-      const settingsResponse = await settingsAPI.getAll();
-      const settings = settingsResponse.data || {};
-      
-      setContactInfo(settings.contact_info || {
-        phone: "050-123-4567",
-        email: "yedidya@jewishevents.co.il",
-        address: "ירושלים, ישראל"
-      });
-      
-      setSocialMedia(settings.social_media || {
-        instagram: "@yedidya_photography",
-        facebook: "YedidyaMalkaPhotography"
-      });
-    } catch (error) {
-      console.error('Error fetching contact settings:', error);
-      // Use fallback values
-      setContactInfo({
-        phone: "050-123-4567",
-        email: "yedidya@jewishevents.co.il",
-        address: "ירושלים, ישראל"
-      });
-      setSocialMedia({
-        instagram: "@yedidya_photography",
-        facebook: "YedidyaMalkaPhotography"
-      });
-    }
-  };
-
   const eventTypes = [
     { value: 'bar-mitzvah', label: 'בר מצוה' },
     { value: 'bat-mitzvah', label: 'בת מצוה' },
@@ -147,7 +122,7 @@ const Contact = () => {
     }
   };
 
-  if (!contactInfo || !socialMedia) {
+  if (loading) {
     return (
       <section id="contact" className="section-spacing">
         <div className="container-jewish">
@@ -1,50 +1,19 @@
-import React, { useState, useEffect } from 'react';
+import React from 'react';
 import { Camera, Award, MapPin } from 'lucide-react';
-import { portfolioAPI, settingsAPI, handleAPIError } from '../services/api';
 
-const Hero = () => {
-  const [photographerInfo, setPhotographerInfo] = useState(null);
-  const [featuredImages, setFeaturedImages] = useState([]);
-  const [loading, setLoading] = useState(true);
-
-  useEffect(() => {
-    fetchHeroData();
-  }, []);
-
-  const fetchHeroData = async () => {
-    try {
-      setLoading(true);
-      
-      // Fetch photographer info and featured portfolio items
-      const [settingsResponse, portfolioResponse] = await Promise.all([
-        settingsAPI.getAll(),
-        portfolioAPI.getFeatured()
-      ]);
-
-      const settings = settingsResponse.data || {};
-      setPhotographerInfo(settings.photographer_info || {
-        name: "ידידיה מלכא",
-        tagline: "צלם אירועים יהודיים מקצועי",
-        description: "מתמחה בצילום אירועי מחזור החיים היהודיים - בר/בת מצווה, בריתות, עליות לתורה ואירועים משפחתיים מיוחדים",
-        experience: "15+ שנות ניסיון",
-        location: "ירושלים וסביבותיה"
-      });
+const DEFAULT_PHOTOGRAPHER_INFO = {
+  name: "ידידיה מלכא",
+  tagline: "צלם אירועים יהודיים מקצועי",
+  description: "מתמחה בצילום אירועי מחזור החיים היהודיים - בר/בת מצווה, בריתות, עליות לתורה ואירועים משפחתיים מיוחדים",
+  experience: "15+ שנות ניסיון",
+  location: "ירושלים וסביבותיה"
+};
 
-      setFeaturedImages(portfolioResponse.data?.slice(0, 4) || []);
-    } catch (error) {
-      console.error('Error fetching hero data:', error);
-      // Use fallback data
-      setPhotographerInfo({
-        name: "ידידיה מלכא",
-        tagline: "צלם אירועים יהודיים מקצועי",
-        description: "מתמחה בצילום אירועי מחזור החיים היהודיים - בר/בת מצווה, בריתות, עליות לתורה ואירועים משפחתיים מיוחדים",
-        experience: "15+ שנות ניסיון",
-        location: "ירושלים וסביבותיה"
-      });
-    } finally {
-      setLoading(false);
-    }
-  };
+// Settings and featured portfolio items come from the homepage bundle loaded
+// by JewishPhotographyApp; the defaults above cover a failed load
+const Hero = ({ settings, featured = [], loading }) => {
+  const photographerInfo = settings?.photographer_info || DEFAULT_PHOTOGRAPHER_INFO;
+  const featuredImages = featured.slice(0, 4);
 
   const scrollToPortfolio = () => {
     const element = document.getElementById('portfolio');
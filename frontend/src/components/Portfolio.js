@@ -1,5 +1,5 @@
 import React, { useState, useEffect } from 'react';
-import { portfolioAPI, handleAPIError } from '../services/api';
+import { portfolioAPI, imagesAPI, handleAPIError } from '../services/api';
 
 const Portfolio = () => {
   const [selectedCategory, setSelectedCategory] = useState('All');
@@ -118,11 +118,16 @@ const Portfolio = () => {
               >
                 <div className="aspect-w-4 aspect-h-3 h-80">
                   <img
-                    src={item.image}
+                    src={imagesAPI.url(item.id, { width: 640 })}
                     alt={item.title}
+                    loading="lazy"
                     className="w-full h-full object-cover rounded-lg"
                     onError={(e) => {
-                      e.target.src = 'https://via.placeholder.com/400x300?text=Image+Not+Found';
+                      if (e.target.src !== item.image) {
+                        e.target.src = item.image;
+                      } else {
+                        e.target.src = 'https://via.placeholder.com/400x300?text=Image+Not+Found';
+                      }
                     }}
                   />
                 </div>
@@ -1,29 +1,8 @@
-import React, { useState, useEffect } from 'react';
+import React from 'react';
 import { Camera, Clock, CheckCircle, Star } from 'lucide-react';
-import { servicesAPI, handleAPIError } from '../services/api';
 
-const Services = () => {
-  const [services, setServices] = useState([]);
-  const [loading, setLoading] = useState(true);
-  const [error, setError] = useState(null);
-
-  useEffect(() => {
-    fetchServices();
-  }, []);
-
-  const fetchServices = async () => {
-    try {
-      setLoading(true);
-      setError(null);
-      const response = await servicesAPI.getAll();
-      setServices(response.data || []);
-    } catch (err) {
-      console.error('Error fetching services:', err);
-      setError(handleAPIError(err, 'Failed to load services'));
-    } finally {
-      setLoading(false);
-    }
-  };
+// Services come from the homepage bundle loaded by JewishPhotographyApp
+const Services = ({ services = [], loading, error, onRetry }) => {
 
   if (loading) {
     return (
@@ -62,7 +41,7 @@ const Services = () => {
             <div className="bg-red-50 border border-red-200 rounded-lg p-6 max-w-md mx-auto">
               <p className="text-red-600 hebrew-text">{error}</p>
               <button 
-                onClick={fetchServices}
+                onClick={onRetry}
                 className="btn-primary mt-4"
               >
                 נסה שוב
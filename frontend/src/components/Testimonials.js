@@ -1,29 +1,8 @@
-import React, { useState, useEffect } from 'react';
+import React from 'react';
 import { Star, Quote } from 'lucide-react';
-import { testimonialsAPI, handleAPIError } from '../services/api';
 
-const Testimonials = () => {
-  const [testimonials, setTestimonials] = useState([]);
-  const [loading, setLoading] = useState(true);
-  const [error, setError] = useState(null);
-
-  useEffect(() => {
-    fetchTestimonials();
-  }, []);
-
-  const fetchTestimonials = async () => {
-    try {
-      setLoading(true);
-      setError(null);
-      const response = await testimonialsAPI.getAll();
-      setTestimonials(response.data || []);
-    } catch (err) {
-      console.error('Error fetching testimonials:', err);
-      setError(handleAPIError(err, 'Failed to load testimonials'));
-    } finally {
-      setLoading(false);
-    }
-  };
+// Featured testimonials come from the homepage bundle loaded by JewishPhotographyApp
+const Testimonials = ({ testimonials = [], loading, error, onRetry }) => {
 
   const renderStars = (rating) => {
     return Array.from({ length: 5 }, (_, index) => (
@@ -70,7 +49,7 @@ const Testimonials = () => {
             <div className="bg-red-50 border border-red-200 rounded-lg p-6 max-w-md mx-auto">
               <p className="text-red-600 hebrew-text">{error}</p>
               <button 
-                onClick={fetchTestimonials}
+                onClick={onRetry}
                 className="btn-primary mt-4"
               >
                 נסה שוב
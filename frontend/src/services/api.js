@@ -34,16 +34,25 @@ apiClient.interceptors.response.use(
   }
 );
 
+// If-Match header for optimistic concurrency on updates (version from the last response)
+const ifMatch = (version) => (version != null ? { headers: { 'If-Match': `"${version}"` } } : {});
+
+// Optional sparse fieldset / single-language view for public lists
+const viewParams = ({ fields, lang } = {}) => ({
+  ...(fields && fields.length ? { fields: fields.join(',') } : {}),
+  ...(lang ? { lang } : {})
+});
+
 // Portfolio API
 export const portfolioAPI = {
-  getAll: async (category = null) => {
-    const params = category && category !== 'All' ? { category } : {};
+  getAll: async (category = null, view = {}) => {
+    const params = { ...(category && category !== 'All' ? { category } : {}), ...viewParams(view) };
     const response = await apiClient.get('/portfolio', { params });
     return response.data;
   },
 
-  getFeatured: async () => {
-    const response = await apiClient.get('/portfolio/featured');
+  getFeatured: async (view = {}) => {
+    const response = await apiClient.get('/portfolio/featured', { params: viewParams(view) });
     return response.data;
   },
 
@@ -52,21 +61,51 @@ export const portfolioAPI = {
     return response.data;
   },
 
-  update: async (id, data) => {
-    const response = await apiClient.put(`/portfolio/${id}`, data);
+  update: async (id, data, version = null) => {
+    const response = await apiClient.put(`/portfolio/${id}`, data, ifMatch(version));
     return response.data;
   },
 
   delete: async (id) => {
     const response = await apiClient.delete(`/portfolio/${id}`);
     return response.data;
+  },
+
+  bulkCreate: async (items, ordered = true) => {
+    const response = await apiClient.post('/portfolio/bulk', { items, ordered });
+    return response.data;
+  },
+
+  bulkUpdate: async (items, ordered = true) => {
+    const response = await apiClient.put('/portfolio/bulk', { items, ordered });
+    return response.data;
+  },
+
+  bulkDelete: async (ids, ordered = true) => {
+    const response = await apiClient.delete('/portfolio/bulk', { data: { ids, ordered } });
+    return response.data;
+  }
+};
+
+// Images API
+export const imagesAPI = {
+  url: (id, { width = 800, format = 'webp', quality = 80 } = {}) =>
+    `${API_BASE}/images/${encodeURIComponent(id)}?w=${width}&format=${format}&q=${quality}`,
+
+  upload: async (id, file) => {
+    const formData = new FormData();
+    formData.append('file', file);
+    const response = await apiClient.put(`/images/${id}`, formData, {
+      headers: { 'Content-Type': 'multipart/form-data' },
+    });
+    return response.data;
   }
 };
 
 // Services API
 export const servicesAPI = {
-  getAll: async () => {
-    const response = await apiClient.get('/services');
+  getAll: async (view = {}) => {
+    const response = await apiClient.get('/services', { params: viewParams(view) });
     return response.data;
   },
 
@@ -75,8 +114,8 @@ export const servicesAPI = {
     return response.data;
   },
 
-  update: async (id, data) => {
-    const response = await apiClient.put(`/services/${id}`, data);
+  update: async (id, data, version = null) => {
+    const response = await apiClient.put(`/services/${id}`, data, ifMatch(version));
     return response.data;
   },
 
@@ -88,13 +127,13 @@ export const servicesAPI = {
 
 // Testimonials API
 export const testimonialsAPI = {
-  getAll: async () => {
-    const response = await apiClient.get('/testimonials');
+  getAll: async (view = {}) => {
+    const response = await apiClient.get('/testimonials', { params: viewParams(view) });
     return response.data;
   },
 
-  getFeatured: async () => {
-    const response = await apiClient.get('/testimonials/featured');
+  getFeatured: async (view = {}) => {
+    const response = await apiClient.get('/testimonials/featured', { params: viewParams(view) });
     return response.data;
   },
 
@@ -103,8 +142,8 @@ export const testimonialsAPI = {
     return response.data;
   },
 
-  update: async (id, data) => {
-    const response = await apiClient.put(`/testimonials/${id}`, data);
+  update: async (id, data, version = null) => {
+    const response = await apiClient.put(`/testimonials/${id}`, data, ifMatch(version));
     return response.data;
   },
 
@@ -126,25 +165,30 @@ export const contactAPI = {
     return response.data;
   },
 
-  getMessages: async (status = null) => {
-    const params = status ? { status } : {};
+  getMessages: async (status = null, { limit, after, includeTotal } = {}) => {
+    const params = { ...(status ? { status } : {}), limit, after, include_total: includeTotal };
     const response = await apiClient.get('/messages', { params });
     return response.data;
   },
 
-  updateMessageStatus: async (id, status) => {
-    const response = await apiClient.put(`/messages/${id}`, { status });
+  updateMessageStatus: async (id, status, version = null) => {
+    const response = await apiClient.put(`/messages/${id}`, { status }, ifMatch(version));
     return response.data;
   },
 
-  getBookings: async (status = null) => {
-    const params = status ? { status } : {};
+  getBookings: async (status = null, { limit, after, includeTotal } = {}) => {
+    const params = { ...(status ? { status } : {}), limit, after, include_total: includeTotal };
     const response = await apiClient.get('/bookings', { params });
     return response.data;
   },
 
-  updateBookingStatus: async (id, status) => {
-    const response = await apiClient.put(`/bookings/${id}`, { status });
+  updateBookingStatus: async (id, status, version = null) => {
+    const response = await apiClient.put(`/bookings/${id}`, { status }, ifMatch(version));
+    return response.data;
+  },
+
+  getStats: async () => {
+    const response = await apiClient.get('/stats');
     return response.data;
   }
 };
@@ -164,6 +208,42 @@ export const settingsAPI = {
   update: async (key, value) => {
     const response = await apiClient.put(`/settings/${key}`, { value });
     return response.data;
+  },
+
+  // values: { key: value, ... }; version from getAll() rejects the update if settings changed since
+  updateMany: async (values, version = null) => {
+    const response = await apiClient.patch('/settings', { values }, ifMatch(version));
+    return response.data;
+  }
+};
+
+// Homepage bundle API
+export const homeAPI = {
+  get: async (lang = null) => {
+    const params = lang ? { lang } : {};
+    const response = await apiClient.get('/home', { params });
+    return response.data;
+  }
+};
+
+// Availability API
+export const availabilityAPI = {
+  get: async (from = null, to = null) => {
+    const params = {};
+    if (from) params.from = from;
+    if (to) params.to = to;
+    const response = await apiClient.get('/availability', { params });
+    return response.data;
+  }
+};
+
+// Search API
+export const searchAPI = {
+  search: async (q, { type = null, limit = 20 } = {}) => {
+    const params = { q, limit };
+    if (type) params.type = type;
+    const response = await apiClient.get('/search', { params });
+    return response.data;
   }
 };
 
@@ -0,0 +1,15 @@
+import sys
+from pathlib import Path
+
+import pytest
+
+# Backend modules import each other as top-level modules (``from cache import ...``)
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "backend"))
+
+
+@pytest.fixture
+def db():
+    """An in-memory Motor database (mongomock) for tests of database code."""
+    from mongomock_motor import AsyncMongoMockClient
+
+    return AsyncMongoMockClient()["test"]
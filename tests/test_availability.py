@@ -0,0 +1,44 @@
+import asyncio
+from datetime import date, datetime, timedelta, timezone
+
+from database import DatabaseService, rebuild_availability
+
+
+def test_bookings_move_between_booked_and_quoted_days(db):
+    async def scenario():
+        service = DatabaseService(db)
+        event = datetime(2026, 6, 1, 18, 0)
+        quoted = await service.create_booking_request({"name": "a", "event_date": event, "status": "quoted"})
+        await service.create_booking_request({"name": "b", "event_date": event})
+        # Counted on the UTC day of the event
+        await service.create_booking_request({
+            "name": "c", "status": "booked",
+            "event_date": datetime(2026, 6, 3, 1, 0, tzinfo=timezone(timedelta(hours=3))),
+        })
+
+        await service.update_booking_status(quoted, "booked")
+        days = await service.get_availability(date(2026, 6, 1), date(2026, 6, 30))
+        assert days == {"2026-06-01": {"booked": 1, "quoted": 0}, "2026-06-02": {"booked": 1, "quoted": 0}}
+
+        # Cancelling frees the day again
+        await service.update_booking_status(quoted, "cancelled")
+        days = await service.get_availability(date(2026, 6, 1), date(2026, 6, 30))
+        assert "2026-06-01" not in days
+        assert await service.get_availability(date(2026, 7, 1), date(2026, 7, 31)) == {}
+
+    asyncio.run(scenario())
+
+
+def test_rebuild_matches_the_incremental_calendar(db):
+    async def scenario():
+        service = DatabaseService(db)
+        for i, status in enumerate(["booked", "quoted", "new", "booked"]):
+            await service.create_booking_request({
+                "name": str(i), "status": status, "event_date": datetime(2026, 6, 1 + i % 2),
+            })
+        incremental = await service.get_availability(date(2026, 1, 1), date(2026, 12, 31))
+        await db.availability.insert_one({"_id": "2026-05-01", "booked": 3})  # stale day
+        await rebuild_availability(service)
+        assert await service.get_availability(date(2026, 1, 1), date(2026, 12, 31)) == incremental
+
+    asyncio.run(scenario())
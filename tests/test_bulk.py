@@ -0,0 +1,66 @@
+import pytest
+from pydantic import ValidationError
+
+from bulk import finish_bulk, validate_bulk_items
+from models import MAX_BULK_ITEMS, BulkDeleteRequest, BulkRequest, PortfolioItemCreate
+
+
+def test_unordered_results_report_each_item():
+    results = [None, {"index": 1, "status": "invalid", "errors": [{"msg": "title required"}]}, None, None]
+    body = finish_bulk(results, [0, 2, 3], {1: "duplicate key"}, False, "created", {0: "a", 2: "b", 3: "c"})
+    assert [r["status"] for r in body["results"]] == ["created", "invalid", "failed", "created"]
+    assert body["results"][2] == {"index": 2, "id": "b", "status": "failed", "errors": [{"msg": "duplicate key"}]}
+    assert body["summary"] == {"created": 2, "invalid": 1, "failed": 1}
+    assert body["success"] is False
+
+
+def test_ordered_write_error_skips_the_rest():
+    body = finish_bulk([None] * 4, [0, 1, 2, 3], {1: "duplicate key"}, True, "updated",
+                       {0: "a", 1: "b", 2: "c", 3: "d"})
+    assert [r["status"] for r in body["results"]] == ["updated", "failed", "skipped", "skipped"]
+
+
+def test_items_never_sent_are_skipped():
+    # Ordered validation failure: nothing after item 0 reaches the database
+    body = finish_bulk([None, {"index": 1, "status": "invalid"}, None], [0], {}, True, "created", {0: "a"})
+    assert [r["status"] for r in body["results"]] == ["created", "invalid", "skipped"]
+
+
+def test_missing_ids_are_not_found():
+    body = finish_bulk([None, None], [0, 1], {}, False, "deleted", {0: "a", 1: "b"}, missing={"b"})
+    assert [r["status"] for r in body["results"]] == ["deleted", "not_found"]
+    assert body["success"] is False
+
+
+def test_all_written_is_success():
+    body = finish_bulk([None, None], [0, 1], {}, True, "created", {0: "a", 1: "b"})
+    assert body == {
+        "success": True,
+        "summary": {"created": 2},
+        "results": [{"index": 0, "id": "a", "status": "created"}, {"index": 1, "id": "b", "status": "created"}],
+    }
+
+
+def test_validation_reports_every_invalid_item_when_unordered():
+    items = [{"title": "a", "category": "Bar Mitzvah", "image": "x", "description": "d"}, {"title": "b"}, {"category": "c"}]
+    valid, results = validate_bulk_items(items, PortfolioItemCreate, ordered=False)
+    assert [index for index, _ in valid] == [0]
+    assert results[0] is None
+    assert [results[1]["status"], results[2]["status"]] == ["invalid", "invalid"]
+    assert {"loc": ["image"], "msg": "Field required"} in results[1]["errors"]
+
+
+def test_validation_stops_at_the_first_invalid_item_when_ordered():
+    items = [{"title": "b"}, {"title": "a", "category": "Bar Mitzvah", "image": "x", "description": "d"}]
+    valid, results = validate_bulk_items(items, PortfolioItemCreate, ordered=True)
+    assert valid == []
+    assert results[0]["status"] == "invalid"
+    assert results[1] is None
+
+
+def test_bulk_requests_are_capped():
+    assert len(BulkRequest(items=[{}] * MAX_BULK_ITEMS).items) == MAX_BULK_ITEMS
+    with pytest.raises(ValidationError):
+        BulkRequest(items=[{}] * (MAX_BULK_ITEMS + 1))
+    with pytest.raises(ValidationError):
+        BulkDeleteRequest(ids=["a"] * (MAX_BULK_ITEMS + 1))
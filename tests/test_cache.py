@@ -0,0 +1,138 @@
+import asyncio
+
+import pytest
+
+from cache import SingleFlight, TTLCache
+
+
+def run(coro):
+    return asyncio.run(coro)
+
+
+class Loader:
+    """Loader that blocks until released and records how it ran."""
+
+    def __init__(self, value="value", error=None):
+        self.value = value
+        self.error = error
+        self.calls = 0
+        self.cancelled = False
+        self.release = asyncio.Event()
+
+    async def __call__(self):
+        self.calls += 1
+        try:
+            await self.release.wait()
+        except asyncio.CancelledError:
+            self.cancelled = True
+            raise
+        if self.error is not None:
+            raise self.error
+        return self.value
+
+
+def test_concurrent_misses_share_one_load():
+    async def scenario():
+        cache = TTLCache()
+        loader = Loader()
+        waiters = [asyncio.create_task(cache.get_or_load(("portfolio", "all"), loader)) for _ in range(5)]
+        await asyncio.sleep(0)
+        loader.release.set()
+        results = await asyncio.gather(*waiters)
+        assert results == ["value"] * 5
+        assert loader.calls == 1
+        assert cache.flights.coalesced == 4
+        assert cache.get(("portfolio", "all")) == "value"
+
+    run(scenario())
+
+
+def test_cancelled_waiter_does_not_cancel_the_others():
+    async def scenario():
+        flights = SingleFlight()
+        loader = Loader()
+        first = asyncio.create_task(flights.do("key", loader))
+        second = asyncio.create_task(flights.do("key", loader))
+        await asyncio.sleep(0)
+        first.cancel()
+        await asyncio.sleep(0)
+        loader.release.set()
+        assert await second == "value"
+        assert first.cancelled()
+        assert not loader.cancelled
+        assert loader.calls == 1
+
+    run(scenario())
+
+
+def test_last_waiter_leaving_cancels_the_load():
+    async def scenario():
+        flights = SingleFlight()
+        loader = Loader()
+        waiter = asyncio.create_task(flights.do("key", loader))
+        await asyncio.sleep(0)
+        waiter.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await waiter
+        await asyncio.sleep(0)
+        assert loader.cancelled
+        assert len(flights) == 0
+
+    run(scenario())
+
+
+def test_caller_after_last_waiter_left_starts_a_new_load():
+    async def scenario():
+        flights = SingleFlight()
+        abandoned, fresh = Loader("abandoned"), Loader("fresh")
+        waiter = asyncio.create_task(flights.do("key", abandoned))
+        await asyncio.sleep(0)
+        waiter.cancel()
+        await asyncio.sleep(0)  # the waiter leaves and cancels the load...
+        assert waiter.cancelled()
+        assert not abandoned.cancelled  # ...which has not wound down yet
+        fresh.release.set()
+        assert await flights.do("key", fresh) == "fresh"
+        assert fresh.calls == 1
+
+    run(scenario())
+
+
+def test_errors_reach_every_waiter_and_are_not_cached():
+    async def scenario():
+        cache = TTLCache()
+        loader = Loader(error=RuntimeError("database down"))
+        waiters = [asyncio.create_task(cache.get_or_load(("services", "all"), loader)) for _ in range(3)]
+        await asyncio.sleep(0)
+        loader.release.set()
+        results = await asyncio.gather(*waiters, return_exceptions=True)
+        assert all(isinstance(result, RuntimeError) for result in results)
+        assert loader.calls == 1
+        assert cache.get(("services", "all")) is None
+
+        loader.error = None
+        assert await cache.get_or_load(("services", "all"), loader) == "value"
+        assert loader.calls == 2
+
+    run(scenario())
+
+
+def test_load_invalidated_midway_is_not_cached_or_joined():
+    async def scenario():
+        cache = TTLCache()
+        stale, fresh = Loader("stale"), Loader("fresh")
+        first = asyncio.create_task(cache.get_or_load(("testimonials", "all"), stale))
+        await asyncio.sleep(0)
+        cache.invalidate("testimonials")
+        # A caller arriving after the write must not join the older load
+        second = asyncio.create_task(cache.get_or_load(("testimonials", "all"), fresh))
+        await asyncio.sleep(0)
+        stale.release.set()
+        assert await first == "stale"
+        assert cache.get(("testimonials", "all")) is None
+        fresh.release.set()
+        assert await second == "fresh"
+        assert cache.get(("testimonials", "all")) == "fresh"
+        assert (stale.calls, fresh.calls) == (1, 1)
+
+    run(scenario())
@@ -0,0 +1,102 @@
+import gzip
+
+import brotli
+from fastapi import FastAPI, Request
+from fastapi.responses import PlainTextResponse, StreamingResponse
+from fastapi.testclient import TestClient
+
+from compression import CompressionMiddleware, negotiate
+from responses import Snapshot, snapshot_response
+
+LARGE = "שלום עולם " * 500
+
+app = FastAPI()
+app.add_middleware(CompressionMiddleware, minimum_size=1024)
+
+
+@app.get("/small")
+async def small():
+    return {"data": "x"}
+
+
+@app.get("/large")
+async def large():
+    return {"data": LARGE}
+
+
+@app.get("/stream")
+async def stream():
+    async def chunks():
+        for _ in range(3):
+            yield LARGE.encode()
+    return StreamingResponse(chunks(), media_type="application/x-ndjson")
+
+
+@app.get("/binary")
+async def binary():
+    return PlainTextResponse(LARGE, media_type="image/png")
+
+
+SNAPSHOT = Snapshot.of({"data": LARGE})
+
+
+@app.get("/snapshot")
+async def snapshot(request: Request):
+    return snapshot_response(request, SNAPSHOT)
+
+
+client = TestClient(app)
+
+
+def test_negotiate_prefers_brotli_and_honours_q_values():
+    assert negotiate("gzip, deflate, br") == "br"
+    assert negotiate("br;q=0.5, gzip") == "gzip"
+    assert negotiate("br;q=0, gzip;q=0") is None
+    assert negotiate("*") == "br"
+    assert negotiate("identity") is None
+    assert negotiate(None) is None
+
+
+def test_small_bodies_are_sent_uncompressed():
+    response = client.get("/small", headers={"Accept-Encoding": "br"})
+    assert "content-encoding" not in response.headers
+    assert response.headers["vary"] == "Accept-Encoding"
+
+
+def test_large_json_is_compressed_per_accept_encoding():
+    br = client.get("/large", headers={"Accept-Encoding": "br"})
+    assert br.headers["content-encoding"] == "br"
+    assert br.json() == {"data": LARGE}  # the test client decodes it
+
+    gz = client.get("/large", headers={"Accept-Encoding": "gzip"})
+    assert gz.headers["content-encoding"] == "gzip"
+    assert gz.json() == {"data": LARGE}
+
+    plain = client.get("/large", headers={"Accept-Encoding": "identity"})
+    assert "content-encoding" not in plain.headers
+
+
+def test_streamed_bodies_are_compressed_incrementally():
+    response = client.get("/stream", headers={"Accept-Encoding": "gzip"})
+    assert response.headers["content-encoding"] == "gzip"
+    assert "content-length" not in response.headers
+    assert response.text == LARGE * 3
+
+
+def test_non_text_media_passes_through():
+    response = client.get("/binary", headers={"Accept-Encoding": "br"})
+    assert "content-encoding" not in response.headers
+
+
+def test_snapshots_are_precompressed_once_with_a_per_encoding_etag():
+    br = client.get("/snapshot", headers={"Accept-Encoding": "br"})
+    assert br.headers["content-encoding"] == "br"
+    assert br.headers["etag"] == SNAPSHOT.etag[:-1] + '-br"'
+    assert brotli.decompress(SNAPSHOT.compressed["br"]) == SNAPSHOT.body
+
+    gz = client.get("/snapshot", headers={"Accept-Encoding": "gzip"})
+    assert gz.headers["etag"] == SNAPSHOT.etag[:-1] + '-gzip"'
+    assert gzip.decompress(SNAPSHOT.compressed["gzip"]) == SNAPSHOT.body
+
+    revalidated = client.get("/snapshot", headers={"Accept-Encoding": "br", "If-None-Match": br.headers["etag"]})
+    assert revalidated.status_code == 304
@@ -0,0 +1,43 @@
+import asyncio
+import logging
+from datetime import datetime
+
+from database import DatabaseService, rebuild_lead_stats
+
+
+def test_new_leads_and_status_moves_update_the_counters(db):
+    async def scenario():
+        service = DatabaseService(db)
+        first = await service.create_contact_message({"name": "a", "event_type": "wedding"})
+        await service.create_contact_message({"name": "b", "event_type": "bar.mitzvah"})
+        await service.update_message_status(first, "read", expected_version=1)
+        # Setting the same status again is not a move
+        await service.update_message_status(first, "read")
+
+        stats = (await service.get_lead_stats())["contact_messages"]
+        assert stats["total"] == 2
+        assert stats["status"] == {"new": 1, "read": 1}
+        assert stats["event_type"] == {"wedding": 1, "bar.mitzvah": 1}
+        assert stats["month"] == {f"{datetime.utcnow():%Y-%m}": 2}
+
+        # The incremental counters agree with a full rebuild
+        await rebuild_lead_stats(service)
+        assert (await service.get_lead_stats())["contact_messages"] == stats
+
+    asyncio.run(scenario())
+
+
+def test_counter_failures_are_logged_not_raised(db, caplog):
+    async def scenario():
+        service = DatabaseService(db)
+
+        async def broken(*args, **kwargs):
+            raise ConnectionError("lead_stats unavailable")
+
+        service._count_leads = broken
+        message_id = await service.create_contact_message({"name": "a"})
+        assert await db.contact_messages.count_documents({"id": message_id}) == 1
+
+    with caplog.at_level(logging.ERROR):
+        asyncio.run(scenario())
+    assert "Failed to update counters" in caplog.text
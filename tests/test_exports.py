@@ -0,0 +1,50 @@
+import asyncio
+import csv
+import io
+from datetime import datetime
+
+from exports import MESSAGE_COLUMNS, csv_stream, ndjson_stream
+
+
+async def _docs(docs):
+    for doc in docs:
+        yield doc
+
+
+def export_csv(docs, columns=MESSAGE_COLUMNS):
+    async def collect():
+        return b"".join([chunk async for chunk in csv_stream(_docs(docs), columns)])
+
+    text = asyncio.run(collect()).decode()
+    assert text.startswith("\ufeff")
+    return list(csv.reader(io.StringIO(text[1:])))
+
+
+def test_csv_neutralizes_formula_cells():
+    rows = export_csv([{
+        "id": "1", "name": '=HYPERLINK("http://x")', "phone": "+972501234567", "email": "@evil",
+        "message": "-1+1", "event_type": "\tcmd", "status": "\rnew",
+    }])
+    row = dict(zip(rows[0], rows[1]))
+    assert row["name"] == '\'=HYPERLINK("http://x")'
+    assert row["phone"] == "'+972501234567"
+    assert row["email"] == "'@evil"
+    assert row["message"] == "'-1+1"
+    assert row["event_type"] == "'\tcmd"
+    assert row["status"] == "'\rnew"
+
+
+def test_csv_renders_dates_and_leaves_plain_text_alone():
+    created = datetime(2025, 1, 2, 3, 4, 5)
+    rows = export_csv([{"id": "1", "name": "משפחת כהן", "created_at": created, "event_date": None}])
+    row = dict(zip(rows[0], rows[1]))
+    assert row["name"] == "משפחת כהן"
+    assert row["created_at"] == "2025-01-02T03:04:05"
+    assert row["event_date"] == ""
+
+
+def test_ndjson_writes_one_document_per_line():
+    async def collect():
+        return b"".join([chunk async for chunk in ndjson_stream(_docs([{"id": "1"}, {"id": "2"}]))])
+
+    assert asyncio.run(collect()) == b'{"id":"1"}\n{"id":"2"}\n'
@@ -0,0 +1,61 @@
+import os
+
+import images
+from images import ImageStore, VariantCache, snap_quality, snap_width
+
+
+def write_variant(cache, name, size, mtime):
+    path = cache.directory / name
+    path.write_bytes(b"x" * size)
+    os.utime(path, (mtime, mtime))
+    cache.add(name, size)
+
+
+def test_snapping():
+    assert snap_width(1) == 160
+    assert snap_width(700) == 800
+    assert snap_width(10000) == 2560
+    assert snap_quality(83) == 85
+    assert snap_quality(100) == 95
+
+
+def test_budget_covers_variants_written_by_other_workers(tmp_path, monkeypatch):
+    first = VariantCache(tmp_path, max_bytes=250)
+    second = VariantCache(tmp_path, max_bytes=250)
+    write_variant(first, "a.1.w160q80.webp", 100, 1000)
+    write_variant(second, "b.1.w160q80.webp", 100, 2000)
+
+    # The first worker sees the second one's file after its next rescan
+    monkeypatch.setattr(images, "RESCAN_SECONDS", 0.0)
+    write_variant(first, "c.1.w160q80.webp", 100, 3000)
+    assert sorted(path.name for path in tmp_path.iterdir()) == ["b.1.w160q80.webp", "c.1.w160q80.webp"]
+    assert first.total_bytes == 200
+
+
+def test_hits_are_shared_through_mtimes(tmp_path, monkeypatch):
+    monkeypatch.setattr(images, "RESCAN_SECONDS", 0.0)
+    first = VariantCache(tmp_path, max_bytes=250)
+    second = VariantCache(tmp_path, max_bytes=250)
+    write_variant(first, "a.1.w160q80.webp", 100, 1000)
+    write_variant(first, "b.1.w160q80.webp", 100, 2000)
+    # A hit in another worker makes "a" the most recently used variant
+    assert second.lookup("a.1.w160q80.webp") is not None
+    write_variant(first, "c.1.w160q80.webp", 100, 3000)
+    assert not (tmp_path / "b.1.w160q80.webp").exists()
+    assert (tmp_path / "a.1.w160q80.webp").exists()
+    assert first.lookup("b.1.w160q80.webp") is None
+
+
+def test_deleting_an_item_removes_its_original_and_variants(tmp_path):
+    store = ImageStore(tmp_path)
+    other = VariantCache(store.variants.directory, max_bytes=1000)
+    store.original_path("item-1").write_bytes(b"original")
+    write_variant(store.variants, "item-1.5.w160q80.webp", 10, 1000)
+    write_variant(other, "item-1.5.w320q80.webp", 10, 1000)
+    write_variant(store.variants, "item-10.5.w160q80.webp", 10, 1000)
+
+    store.delete("item-1")
+    assert not store.has_original("item-1")
+    assert [path.name for path in store.variants.directory.iterdir()] == ["item-10.5.w160q80.webp"]
+    assert store.variants.total_bytes == 10
+    store.delete("../escape")  # ids that could never be stored are ignored
@@ -0,0 +1,118 @@
+import asyncio
+
+from pymongo.errors import BulkWriteError
+
+import ingestion
+from ingestion import IngestionQueueFull, WriteBehindWriter
+
+
+class FlakyCollection:
+    """Fails the first ``failures`` insert_many calls, recording every batch."""
+
+    def __init__(self, failures=0, error=None):
+        self.failures = failures
+        self.error = error or ConnectionError("primary stepped down")
+        self.batches = []
+        self.docs = []
+
+    async def insert_many(self, docs, ordered=True):
+        self.batches.append(list(docs))
+        if self.failures:
+            self.failures -= 1
+            raise self.error
+        self.docs.extend(docs)
+
+    async def insert_one(self, doc):
+        self.docs.append(doc)
+
+
+def test_batches_are_written_with_insert_many_and_reported(db):
+    async def scenario():
+        writer = WriteBehindWriter(db, batch_size=10, flush_interval=0.01)
+        seen = []
+
+        async def listener(collection, docs):
+            seen.append((collection, [doc["id"] for doc in docs]))
+
+        writer.subscribe(listener)
+        for i in range(25):
+            await writer.submit("contact_messages", {"id": str(i)})
+        await writer.stop()
+        assert await db.contact_messages.count_documents({}) == 25
+        assert [len(ids) for _, ids in seen] == [10, 10, 5]
+
+        # After stop, submissions are written through instead of dropped
+        await writer.submit("contact_messages", {"id": "late"})
+        assert await db.contact_messages.count_documents({"id": "late"}) == 1
+        assert seen[-1] == ("contact_messages", ["late"])
+
+    asyncio.run(scenario())
+
+
+def test_failed_flushes_are_retried(monkeypatch):
+    monkeypatch.setattr(ingestion.asyncio, "sleep", _no_sleep)
+    collection = FlakyCollection(failures=2)
+
+    async def scenario():
+        writer = WriteBehindWriter({"leads": collection}, flush_interval=0.01)
+        await writer.submit("leads", {"id": "1"})
+        await writer.stop()
+
+    asyncio.run(scenario())
+    assert len(collection.batches) == 3
+    assert collection.docs == [{"id": "1"}]
+
+
+def test_partial_bulk_errors_retry_only_unwritten_docs(monkeypatch):
+    monkeypatch.setattr(ingestion.asyncio, "sleep", _no_sleep)
+    error = BulkWriteError({"writeErrors": [
+        {"index": 0, "code": 11000},  # already stored by an earlier attempt
+        {"index": 2, "code": 91},
+    ]})
+    collection = FlakyCollection(failures=1, error=error)
+    written = []
+
+    async def scenario():
+        writer = WriteBehindWriter({"leads": collection}, flush_interval=0.01)
+
+        async def listener(name, docs):
+            written.extend(doc["id"] for doc in docs)
+
+        writer.subscribe(listener)
+        for i in range(3):
+            await writer.submit("leads", {"id": str(i)})
+        await writer.stop()
+
+    asyncio.run(scenario())
+    assert collection.batches[1] == [{"id": "2"}]
+    assert sorted(written) == ["0", "1", "2"]
+
+
+def test_full_queue_raises_so_callers_can_shed_load():
+    async def never_written(*args, **kwargs):
+        await asyncio.Event().wait()
+
+    collection = FlakyCollection()
+    collection.insert_many = never_written
+
+    async def scenario():
+        writer = WriteBehindWriter({"leads": collection}, max_size=1, batch_size=1, submit_timeout=0.01)
+        await writer.submit("leads", {"id": "1"})  # taken by the flush task
+        await asyncio.sleep(0)
+        await writer.submit("leads", {"id": "2"})  # fills the queue
+        try:
+            await writer.submit("leads", {"id": "3"})
+        except IngestionQueueFull:
+            pass
+        else:
+            raise AssertionError("expected IngestionQueueFull")
+        await writer.stop(timeout=0.01)
+
+    asyncio.run(scenario())
+
+
+_real_sleep = asyncio.sleep
+
+
+async def _no_sleep(delay):
+    await _real_sleep(0)
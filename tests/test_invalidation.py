@@ -0,0 +1,84 @@
+import asyncio
+
+from bson import ObjectId
+
+from cache import TTLCache
+from invalidation import InvalidationBus
+
+
+class FakeCursor:
+    def __init__(self, docs):
+        self.docs = list(docs)
+        self.alive = True
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        if not self.docs:
+            self.alive = False
+            raise StopAsyncIteration
+        return self.docs.pop(0)
+
+
+class FakeCappedCollection:
+    """Messages in insertion order; ``arriving`` ones are inserted once tailing starts."""
+
+    def __init__(self, docs, arriving=()):
+        self.docs = list(docs)
+        self.arriving = list(arriving)
+
+    async def find_one(self, query, projection=None, sort=None):
+        assert sort == [("$natural", -1)]
+        return self.docs[-1] if self.docs else None
+
+    def find(self, query, sort=None, cursor_type=None):
+        assert query == {} and sort == [("$natural", 1)]
+        return FakeCursor(self.docs + self.arriving)
+
+
+def message(object_id, namespace, ids=None, origin="other"):
+    return {"_id": ObjectId(object_id), "namespace": namespace, "ids": ids, "origin": origin}
+
+
+def tail(collection):
+    bus = InvalidationBus({"cache_invalidations": collection}, TTLCache(), mode="capped")
+    received = []
+    bus.subscribe(lambda namespace, ids: received.append((namespace, ids)))
+    try:
+        asyncio.run(bus._tail_capped())
+    except RuntimeError as e:
+        received.append(str(e))
+    return bus, received
+
+
+def test_resumes_after_the_newest_message_in_insertion_order():
+    # A worker whose clock runs behind publishes smaller ObjectIds
+    collection = FakeCappedCollection(
+        [message("6" * 24, "services"), message("5" * 24, "portfolio")],
+        arriving=[message("4" * 24, "testimonials", ["t1"]), message("7" * 24, "settings")],
+    )
+    bus, received = tail(collection)
+    assert received == [("testimonials", ["t1"]), ("settings", None)]
+    assert bus.cache.version("testimonials") == 1
+    assert bus.cache.version("services") == 0
+
+
+def test_own_and_placeholder_messages_are_ignored():
+    bus = InvalidationBus(None, TTLCache(), mode="capped")
+    collection = FakeCappedCollection(
+        [message("1" * 24, None)],
+        arriving=[message("2" * 24, "portfolio", origin=bus.origin), message("3" * 24, "services")],
+    )
+    bus.db = {"cache_invalidations": collection}
+    received = []
+    bus.subscribe(lambda namespace, ids: received.append(namespace))
+    asyncio.run(bus._tail_capped())
+    assert received == ["services"]
+
+
+def test_overwritten_start_position_forces_a_resync():
+    collection = FakeCappedCollection([message("1" * 24, "services")])
+    collection.find = lambda query, sort=None, cursor_type=None: FakeCursor([message("2" * 24, "portfolio")])
+    _, received = tail(collection)
+    assert received == ["Invalidation bus position was overwritten"]
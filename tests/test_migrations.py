@@ -0,0 +1,77 @@
+import asyncio
+from datetime import datetime, timedelta
+
+import migrations
+from database import DatabaseService
+from migrations import LATEST_VERSION, applied_version, run_migrations
+
+
+def test_migrations_run_once_and_record_history(db):
+    async def scenario():
+        service = DatabaseService(db)
+        await run_migrations(service)
+        assert await applied_version(service) == LATEST_VERSION
+        state = await db.migrations.find_one({"_id": "schema"})
+        assert [entry["version"] for entry in state["history"]] == list(range(1, LATEST_VERSION + 1))
+        assert await db.migration_locks.count_documents({}) == 0
+
+        services = await db.services.count_documents({})
+        assert services > 0
+        await run_migrations(service)
+        assert await db.services.count_documents({}) == services
+
+    asyncio.run(scenario())
+
+
+def test_seeding_leaves_existing_data_alone(db):
+    async def scenario():
+        await db.services.insert_one({"id": "mine", "title": "Custom"})
+        await run_migrations(DatabaseService(db))
+        assert [doc["id"] async for doc in db.services.find()] == ["mine"]
+        assert await db.portfolio.count_documents({}) > 0
+
+    asyncio.run(scenario())
+
+
+def test_lock_is_exclusive_until_it_expires(db):
+    async def scenario():
+        service = DatabaseService(db)
+        assert await migrations._acquire_lock(service, "a")
+        assert not await migrations._acquire_lock(service, "b")
+        assert await migrations._renew_lock(service, "a")
+        assert not await migrations._renew_lock(service, "b")
+
+        await db.migration_locks.update_one(
+            {"_id": "migrations"}, {"$set": {"expires_at": datetime.utcnow() - timedelta(seconds=1)}}
+        )
+        assert await migrations._acquire_lock(service, "b")
+        assert not await migrations._renew_lock(service, "a")
+
+        await migrations._release_lock(service, "a")
+        assert await db.migration_locks.count_documents({"owner": "b"}) == 1
+
+    asyncio.run(scenario())
+
+
+def test_a_worker_that_lost_the_lock_stops(db, monkeypatch):
+    async def steal_lock(service):
+        await db.migration_locks.update_one({"_id": "migrations"}, {"$set": {"owner": "other"}})
+
+    monkeypatch.setattr(migrations, "MIGRATIONS", [(1, "steal", steal_lock), (2, "never", _never)])
+    monkeypatch.setattr(migrations, "LATEST_VERSION", 2)
+
+    async def scenario():
+        service = DatabaseService(db)
+        try:
+            await run_migrations(service)
+        except RuntimeError:
+            pass
+        else:
+            raise AssertionError("expected the lost lock to stop the run")
+        assert await applied_version(service) == 1
+
+    asyncio.run(scenario())
+
+
+async def _never(service):
+    raise AssertionError("ran without holding the lock")
@@ -0,0 +1,44 @@
+import asyncio
+from datetime import datetime
+
+import pytest
+
+from database import DatabaseService, decode_cursor, encode_cursor
+
+
+def test_cursor_round_trip():
+    created_at = datetime(2025, 3, 1, 12, 30, 15, 123000)
+    cursor = encode_cursor({"created_at": created_at, "id": "abc-123"})
+    assert "=" not in cursor
+    assert decode_cursor(cursor) == (created_at, "abc-123")
+
+
+def test_cursor_without_id_decodes_to_empty_id():
+    created_at = datetime(2025, 1, 1)
+    assert decode_cursor(encode_cursor({"created_at": created_at})) == (created_at, "")
+
+
+@pytest.mark.parametrize("cursor", ["not-a-cursor", "", "WyJ4Il0"])
+def test_invalid_cursor_raises_value_error(cursor):
+    with pytest.raises(ValueError):
+        decode_cursor(cursor)
+
+
+def test_pages_walk_ties_on_created_at_without_gaps(db):
+    async def scenario():
+        service = DatabaseService(db)
+        same_time = datetime(2025, 1, 1)
+        await db.contact_messages.insert_many(
+            [{"id": f"m{i:02d}", "status": "new", "created_at": same_time} for i in range(5)]
+            + [{"id": "older", "status": "new", "created_at": datetime(2024, 12, 31)},
+               {"id": "closed", "status": "closed", "created_at": datetime(2025, 1, 2)}]
+        )
+        seen, after = [], None
+        while True:
+            items, after = await service.get_contact_messages(status="new", limit=2, after=after)
+            seen.extend(item["id"] for item in items)
+            if after is None:
+                break
+        return seen
+
+    assert asyncio.run(scenario()) == ["m04", "m03", "m02", "m01", "m00", "older"]
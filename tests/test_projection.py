@@ -0,0 +1,35 @@
+from database import catalog_projection
+
+
+def test_no_fields_and_no_language_returns_whole_documents():
+    assert catalog_projection("portfolio") == {"_id": 0}
+
+
+def test_fields_always_include_id():
+    assert catalog_projection("portfolio", ("title",)) == {"_id": 0, "id": 1, "title": 1}
+
+
+def test_hebrew_drops_english_fields():
+    projection = catalog_projection("portfolio", ("description", "title"), "he")
+    assert projection == {"_id": 0, "id": 1, "description": 1, "title": 1}
+    assert "title_en" not in catalog_projection("portfolio", None, "he")
+
+
+def test_english_prefers_the_translation_and_falls_back_to_hebrew():
+    projection = catalog_projection("portfolio", ("title",), "en")
+    assert projection["title_en"] == 1
+    # The Hebrew title is kept only when the document has no English one
+    assert projection["title"] == {"$cond": [
+        {"$eq": [{"$ifNull": ["$title_en", None]}, None]}, "$title", "$$REMOVE",
+    ]}
+
+
+def test_explicitly_requested_english_fields_are_kept():
+    projection = catalog_projection("services", ("name_en",), "en")
+    assert projection == {"_id": 0, "id": 1, "name_en": 1}
+
+
+def test_all_fields_in_english_cover_every_public_field():
+    projection = catalog_projection("services", None, "en")
+    assert projection["name_en"] == 1 and "$cond" in projection["name"]
+    assert projection["price"] == 1
@@ -0,0 +1,72 @@
+from fastapi import Depends, FastAPI
+from fastapi.testclient import TestClient
+from starlette.requests import Request
+
+import ratelimit
+from ratelimit import RateLimiter, client_address, parse_limit, rate_limit
+
+
+def make_request(forwarded=None, host="10.0.0.1"):
+    headers = [(b"x-forwarded-for", forwarded.encode())] if forwarded else []
+    return Request({"type": "http", "headers": headers, "client": (host, 1234)})
+
+
+def test_parse_limit():
+    assert parse_limit("5/60") == (5 / 60, 5.0)
+
+
+def test_client_bucket_bursts_then_refills():
+    limiter = RateLimiter("2/10", "100/1")
+    assert limiter.acquire("a", now=0) == 0
+    assert limiter.acquire("a", now=0) == 0
+    assert limiter.acquire("a", now=0) == 5.0
+    # Another client has its own bucket
+    assert limiter.acquire("b", now=0) == 0
+    assert limiter.acquire("a", now=5) == 0
+
+
+def test_global_bucket_limits_all_clients():
+    limiter = RateLimiter("10/1", "2/1")
+    assert limiter.acquire("a", now=0) == 0
+    assert limiter.acquire("b", now=0) == 0
+    assert limiter.acquire("c", now=0) > 0
+
+
+def test_idle_clients_are_evicted():
+    limiter = RateLimiter("1/60", "100/1", max_clients=2)
+    for client in ("a", "b", "c"):
+        limiter.acquire(client, now=0)
+    assert list(limiter._clients) == ["b", "c"]
+
+
+def test_client_address_ignores_forwarded_for_unless_trusted(monkeypatch):
+    request = make_request("6.6.6.6, 1.2.3.4")
+    monkeypatch.setattr(ratelimit, "TRUSTED_PROXY_HOPS", 0)
+    assert client_address(request) == "10.0.0.1"
+    monkeypatch.setattr(ratelimit, "TRUSTED_PROXY_HOPS", 1)
+    assert client_address(request) == "1.2.3.4"
+    monkeypatch.setattr(ratelimit, "TRUSTED_PROXY_HOPS", 2)
+    assert client_address(request) == "6.6.6.6"
+    monkeypatch.setattr(ratelimit, "TRUSTED_PROXY_HOPS", 5)
+    assert client_address(make_request("1.2.3.4")) == "1.2.3.4"
+
+
+def test_trusted_hops_parsing():
+    assert ratelimit._trusted_hops("") == 0
+    assert ratelimit._trusted_hops("true") == 1
+    assert ratelimit._trusted_hops("2") == 2
+
+
+def test_dependency_returns_429_with_retry_after(monkeypatch):
+    monkeypatch.setenv("RATE_LIMIT_CONTACT", "1/30")
+    app = FastAPI()
+
+    @app.post("/contact", dependencies=[Depends(rate_limit("contact"))])
+    async def contact():
+        return {"success": True}
+
+    client = TestClient(app)
+    assert client.post("/contact").status_code == 200
+    response = client.post("/contact")
+    assert response.status_code == 429
+    assert response.headers["retry-after"] == "30"
@@ -0,0 +1,60 @@
+from fastapi import FastAPI, Request
+from fastapi.testclient import TestClient
+
+from responses import conditional_json, etag_matches, localize, make_etag
+
+
+app = FastAPI()
+PAYLOAD = {"success": True, "data": [{"id": "1", "title": "בר מצווה"}]}
+
+
+@app.get("/items")
+async def items(request: Request):
+    return conditional_json(request, PAYLOAD)
+
+
+client = TestClient(app)
+
+
+class FakeRequest:
+    def __init__(self, if_none_match=None):
+        self.headers = {"if-none-match": if_none_match} if if_none_match is not None else {}
+
+
+def test_etag_depends_only_on_the_body():
+    assert make_etag(b"abc") == make_etag(b"abc")
+    assert make_etag(b"abc") != make_etag(b"abd")
+
+
+def test_if_none_match_uses_weak_comparison_and_lists():
+    etag = make_etag(b"abc")
+    assert etag_matches(FakeRequest(etag), etag)
+    assert etag_matches(FakeRequest(f'"other", W/{etag}'), etag)
+    assert etag_matches(FakeRequest("*"), etag)
+    assert not etag_matches(FakeRequest('"other"'), etag)
+    assert not etag_matches(FakeRequest(), etag)
+
+
+def test_matching_if_none_match_gets_304_without_body():
+    first = client.get("/items")
+    assert first.status_code == 200
+    assert first.json() == PAYLOAD
+    assert first.headers["cache-control"].startswith("public, max-age=")
+
+    second = client.get("/items", headers={"If-None-Match": first.headers["etag"]})
+    assert second.status_code == 304
+    assert second.content == b""
+    assert second.headers["etag"] == first.headers["etag"]
+
+    assert client.get("/items", headers={"If-None-Match": '"stale"'}).status_code == 200
+
+
+
+def test_localize_keeps_one_language_without_touching_the_original():
+    doc = {"title": "בר מצווה", "title_en": "Bar Mitzvah", "note": "רק עברית", "note_en": None,
+           "items": [{"name": "א", "name_en": "A"}]}
+    assert localize(doc, "he") == {"title": "בר מצווה", "note": "רק עברית", "items": [{"name": "א"}]}
+    assert localize(doc, "en") == {"title_en": "Bar Mitzvah", "note": "רק עברית", "note_en": None,
+                                   "items": [{"name_en": "A"}]}
+    assert localize(doc, None) is doc
+    assert doc["title"] == "בר מצווה" and "name" in doc["items"][0]
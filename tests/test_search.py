@@ -0,0 +1,79 @@
+import asyncio
+
+from cache import TTLCache
+from database import DatabaseService
+from invalidation import InvalidationBus
+from search import SearchIndex, normalize, tokenize
+
+
+def index_with(collection, docs):
+    index = SearchIndex()
+    index.load(collection, docs, index.generation[collection])
+    return index
+
+
+def test_normalize_strips_niqqud_and_folds_final_letters():
+    assert normalize("שָׁלוֹם") == "שלומ"
+    assert normalize("Café") == "cafe"
+
+
+def test_tokenize_keeps_geresh_words_whole():
+    assert tokenize("צ'ק בע\"מ") == ["צק", "בעמ"]
+
+
+def test_search_matches_prefixes_hebrew_prefixes_and_both_languages():
+    index = index_with("portfolio", [
+        {"id": "1", "title": "בר מצווה בכותל", "title_en": "Bar Mitzvah at the Kotel", "category": "Bar Mitzvah"},
+        {"id": "2", "title": "ברית מילה", "title_en": "Brit Milah", "category": "Brit Milah"},
+    ])
+    assert [hit["id"] for hit in index.search("כותל")] == ["1"]
+    assert [hit["id"] for hit in index.search("mitz")] == ["1"]
+    assert [hit["id"] for hit in index.search("ברית מילה")] == ["2"]
+    assert index.search("wedding") == []
+
+
+def test_search_ranks_title_matches_first_and_filters_by_collection():
+    index = SearchIndex()
+    index.load("portfolio", [
+        {"id": "p1", "title": "Family", "description": "Kotel morning"},
+        {"id": "p2", "title": "Kotel celebration", "description": ""},
+    ], 0)
+    index.load("testimonials", [{"id": "t1", "name": "Cohen", "text": "Kotel photos", "approved": True}], 0)
+    assert [hit["id"] for hit in index.search("kotel", ["portfolio"])] == ["p2", "p1"]
+    assert {hit["type"] for hit in index.search("kotel")} == {"portfolio", "testimonials"}
+
+
+def test_update_reindexes_and_removes_documents():
+    index = index_with("services", [{"id": "s1", "name": "Album", "active": True}])
+    index.update("services", ["s1"], [{"id": "s1", "name": "Video", "active": True}])
+    assert index.search("album") == []
+    assert [hit["id"] for hit in index.search("video")] == ["s1"]
+    index.update("services", ["s1"], [])
+    assert index.search("video") == []
+
+
+def test_hidden_documents_are_not_searchable():
+    index = index_with("testimonials", [{"id": "t1", "name": "Levy", "text": "Great", "approved": False}])
+    assert index.search("levy") == []
+
+
+def test_bus_invalidation_reindexes_only_the_changed_ids(db):
+    async def scenario():
+        cache = TTLCache()
+        bus = InvalidationBus(db, cache, mode="off")
+        service = DatabaseService(db, cache=cache, bus=bus)
+        await service.create_portfolio_item({"title": "Kotel morning", "category": "Bar Mitzvah", "image": "x"})
+        assert len(await service.search_catalog("kotel")) == 1
+
+        # Written by another worker and announced with its id
+        await db.portfolio.insert_one({"id": "remote", "title": "Kotel evening", "category": "Bar Mitzvah"})
+        bus._apply("portfolio", ["remote"])
+        await asyncio.sleep(0.01)
+        assert "portfolio" not in service.search.dirty
+        assert {hit["id"] for hit in await service.search_catalog("kotel")} >= {"remote"}
+
+        # Without ids the collection is reloaded on the next search
+        bus._apply("portfolio", None)
+        assert "portfolio" in service.search.dirty
+
+    asyncio.run(scenario())
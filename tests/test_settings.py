@@ -0,0 +1,61 @@
+import asyncio
+
+import pytest
+
+from database import DatabaseService, VersionConflict
+from indexes import ensure_indexes
+
+
+def run(db, scenario):
+    async def main():
+        await ensure_indexes(db)
+        await scenario(DatabaseService(db))
+
+    asyncio.run(main())
+
+
+def test_each_write_bumps_the_version(db):
+    async def scenario(service):
+        assert await service.get_settings_snapshot() == {"version": 0, "values": {}}
+        assert await service.update_settings({"site": {"name": "a"}}, expected_version=0) == 1
+        assert await service.update_setting("theme", {"dark": True}) == 2
+        snapshot = await service.get_settings_snapshot()
+        assert snapshot == {"version": 2, "values": {"site": {"name": "a"}, "theme": {"dark": True}}}
+        assert await db.settings.count_documents({"key": "_version"}) == 1
+
+    run(db, scenario)
+
+
+def test_stale_version_conflicts_before_any_value_is_written(db):
+    async def scenario(service):
+        await service.update_settings({"site": {"name": "a"}}, expected_version=0)
+        for stale in (0, 5):
+            with pytest.raises(VersionConflict) as conflict:
+                await service.update_settings({"site": {"name": "b"}}, expected_version=stale)
+            assert conflict.value.current == 1
+        assert await service.get_setting("site") == {"name": "a"}
+        assert await db.settings.count_documents({"key": "_version"}) == 1
+        assert await service.update_settings({"site": {"name": "c"}}, expected_version=1) == 2
+
+    run(db, scenario)
+
+
+def test_snapshot_is_reused_until_settings_change(db):
+    async def scenario(service):
+        await service.update_settings({"site": {"name": "a"}})
+        first = await service.get_settings_snapshot()
+        assert await service.get_settings_snapshot() is first
+        # Filling the catalog cache does not evict the settings snapshot
+        for i in range(service.cache.maxsize + 1):
+            service.cache.set(("portfolio", i), [])
+        assert await service.get_settings_snapshot() is first
+
+        await service.update_settings({"site": {"name": "b"}})
+        assert (await service.get_settings_snapshot())["values"]["site"] == {"name": "b"}
+
+        # Another worker's write arrives as an invalidation of the namespace
+        await db.settings.update_one({"key": "site"}, {"$set": {"value": {"name": "c"}}})
+        service.cache.invalidate("settings")
+        assert (await service.get_settings_snapshot())["values"]["site"] == {"name": "c"}
+
+    run(db, scenario)
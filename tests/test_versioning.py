@@ -0,0 +1,25 @@
+import asyncio
+
+import pytest
+
+from database import DatabaseService, VersionConflict
+from models import PortfolioItem
+
+
+def test_models_start_at_version_one():
+    item = PortfolioItem(title="t", category="c", image="i", description="d")
+    assert item.version == 1
+
+
+def test_stale_if_match_is_rejected(db):
+    async def scenario():
+        service = DatabaseService(db)
+        item_id = await service.create_portfolio_item({"title": "a", "category": "c", "image": "i"})
+        assert await service.update_portfolio_item(item_id, {"title": "b"}) is not None
+        with pytest.raises(VersionConflict) as conflict:
+            await service.update_portfolio_item(item_id, {"title": "c"}, expected_version=1)
+        assert conflict.value.current == 2
+        assert (await service.get_portfolio_item(item_id))["title"] == "b"
+        assert await service.update_portfolio_item("missing", {"title": "c"}, expected_version=1) is None
+
+    asyncio.run(scenario())